@@ -0,0 +1,39 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+
+from backend.app import models  # noqa: F401  (registers the tables)
+from backend.app.db import Base, engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # the full-text index (FTS5 tables, the tsvector column) belongs to services.search, not to migrations
+    if type_ == "table":
+        return not name.startswith("tools_fts")
+    return not (type_ == "column" and name == "search_vector")
+
+def run_migrations_offline():
+    context.configure(url=engine.url.render_as_string(hide_password=False), target_metadata=Base.metadata,
+                      literal_binds=True, render_as_batch=True, include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # the app's engine, so DATABASE_URL and the pool settings apply here too
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=Base.metadata, render_as_batch=True,
+                          include_object=include_object)
+        with context.begin_transaction():
+            if connection.dialect.name == "postgresql":
+                # several workers start at once; one migrates, the others wait and find nothing to do
+                connection.execute(text("SELECT pg_advisory_xact_lock(7210)"))
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
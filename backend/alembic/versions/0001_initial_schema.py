@@ -0,0 +1,71 @@
+"""initial schema: tools, tool_terms, tool_facets
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created by the old create_all() startup are stamped at this revision instead
+(see db.migrate), after the same catch-up it used to do.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+FLAGS = ["api_available", "zapier", "make", "n8n", "webhooks"]
+COMPLIANCE = ["gdpr", "soc2", "hipaa", "oauth", "sso", "rbac"]
+SCORES = ["accuracy_score", "speed_score", "cost_efficiency_score", "integrations_score", "data_control_score",
+          "learning_curve_score", "longevity_score", "total_score"]
+
+def upgrade():
+    text = lambda name: sa.Column(name, sa.String())
+    op.create_table(
+        "tools",
+        sa.Column("tool_id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("slug", sa.String(), nullable=False),
+        *map(text, ["homepage_url", "description_short", "description_long", "category", "subcategory",
+                    "tags_csv", "pricing_model"]),
+        sa.Column("price_low_usd", sa.Float()),
+        sa.Column("price_high_usd", sa.Float()),
+        sa.Column("free_tier", sa.Boolean()),
+        sa.Column("trial_days", sa.Integer()),
+        text("plan_notes"),
+        *[sa.Column(f, sa.Boolean()) for f in FLAGS],
+        text("integrations_csv"),
+        *[sa.Column(f, sa.Boolean()) for f in COMPLIANCE],
+        *[sa.Column(f, sa.Float()) for f in SCORES],
+        *map(text, ["score_version", "score_notes", "best_use_cases_csv", "buyer_personas_csv",
+                    "ideal_industries_csv", "reviewer_citations_csv", "reviewer_urls_csv", "affiliate_link"]),
+        sa.Column("last_verified_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_tools_tool_id", "tools", ["tool_id"])
+    op.create_index("ix_tools_name", "tools", ["name"])
+    op.create_index("ix_tools_slug", "tools", ["slug"], unique=True)
+    op.create_index("ix_tools_category", "tools", ["category"])
+    op.create_index("ix_tools_subcategory", "tools", ["subcategory"])
+    op.create_index("ix_tools_total_score_tool_id", "tools", ["total_score", "tool_id"])
+
+    op.create_table(
+        "tool_terms",
+        sa.Column("tool_id", sa.String(), sa.ForeignKey("tools.tool_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("kind", sa.String(), primary_key=True),
+        sa.Column("term", sa.String(), primary_key=True),
+    )
+    op.create_index("ix_tool_terms_kind_term", "tool_terms", ["kind", "term", "tool_id"])
+
+    op.create_table(
+        "tool_facets",
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("facet", sa.String(), primary_key=True),
+        sa.Column("value", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table("tool_facets")
+    op.drop_table("tool_terms")
+    op.drop_table("tools")
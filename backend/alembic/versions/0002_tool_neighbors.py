@@ -0,0 +1,28 @@
+"""tool_neighbors: precomputed similar tools
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Filled by /admin/reindex (services.similar.rebuild_neighbors) and kept current by writes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "tool_neighbors",
+        sa.Column("tool_id", sa.String(), sa.ForeignKey("tools.tool_id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("rank", sa.Integer(), primary_key=True),
+        sa.Column("neighbor_id", sa.String(), sa.ForeignKey("tools.tool_id", ondelete="CASCADE"), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+    )
+    op.create_index("ix_tool_neighbors_neighbor_id", "tool_neighbors", ["neighbor_id"])
+
+def downgrade():
+    op.drop_table("tool_neighbors")
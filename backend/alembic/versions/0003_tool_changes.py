@@ -0,0 +1,32 @@
+"""tool_changes: change log behind GET /tools/changes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Existing tools get one entry each, in tool_id order, so a reader starting from since=0 sees the
+whole catalog as created.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "tool_changes",
+        sa.Column("seq", sa.Integer(), primary_key=True),
+        sa.Column("tool_id", sa.String(), nullable=False),
+        sa.Column("created_seq", sa.Integer()),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index("ix_tool_changes_tool_id", "tool_changes", ["tool_id"], unique=True)
+    op.execute("INSERT INTO tool_changes (tool_id, deleted) SELECT tool_id, false FROM tools ORDER BY tool_id")
+
+def downgrade():
+    op.drop_table("tool_changes")
@@ -0,0 +1,22 @@
+"""tools.content_hash: skip writes that change nothing
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Existing rows start without a hash; each is written once more by the next write that covers it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("tools", sa.Column("content_hash", sa.String()))
+
+def downgrade():
+    with op.batch_alter_table("tools") as batch:
+        batch.drop_column("content_hash")
@@ -8,6 +8,22 @@ class Settings(BaseSettings):
     DEFAULT_TIMEZONE: str = os.getenv("DEFAULT_TIMEZONE", "UTC")
     ALLOWED_ORIGINS: str = os.getenv("ALLOWED_ORIGINS", "*")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "info")
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+    RECOMMEND_CACHE_SIZE: int = int(os.getenv("RECOMMEND_CACHE_SIZE", "512"))
+    RECOMMEND_BATCH_MAX: int = int(os.getenv("RECOMMEND_BATCH_MAX", "10000"))
+    RECOMMEND_SWEEP_MAX_POINTS: int = int(os.getenv("RECOMMEND_SWEEP_MAX_POINTS", "1000"))
+    HTTP_CACHE_SIZE: int = int(os.getenv("HTTP_CACHE_SIZE", "256"))  # serialized GET bodies kept; 0 = off
+    HTTP_CACHE_MAX_AGE: int = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))  # 0 = clients revalidate every time
+    GZIP_MIN_BYTES: int = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+    CATALOG_SNAPSHOT_PATH: str = os.getenv("CATALOG_SNAPSHOT_PATH", "")  # shared mmap snapshot; "" = per process
+    CATALOG_SYNC_SECONDS: float = float(os.getenv("CATALOG_SYNC_SECONDS", "1"))  # how often readers check for other processes' writes
+    KEEPALIVE_SECONDS: float = float(os.getenv("KEEPALIVE_SECONDS", "240"))  # 0 disables the self-ping
+    OPTIMIZER_TIME_BUDGET_MS: float = float(os.getenv("OPTIMIZER_TIME_BUDGET_MS", "15"))
 
 @lru_cache
 def get_settings():
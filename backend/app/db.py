@@ -1,17 +1,135 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
-import os
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from typing import Callable, TypeVar
+import functools, inspect, os
+
+import anyio.from_thread
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+
+from .config import get_settings
+from .services.metrics import instrument_engine
+from .services.pool_metrics import TimedAsyncQueuePool, TimedQueuePool
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "..", "alembic")
+BASELINE_REVISION = "0001"
+BASELINE_TABLES = ["tools", "tool_terms", "tool_facets"]  # what create_all() made before migrations
+LATER_COLUMNS = {"tools.content_hash"}  # added to those tables by later revisions
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     # SQLite fallback for local dev
     DATABASE_URL = "sqlite:///./toolstack.db"
 
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
+# driver used for each backend in async mode
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+settings = get_settings()
+T = TypeVar("T")
+
+def _engine_args(url: str, poolclass) -> dict:
+    args = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() == "sqlite":
+        if make_url(url).database in (None, "", ":memory:"):
+            return args  # one shared in-memory connection; pool settings don't apply
+        args["connect_args"] = {"check_same_thread": False}
+    args.update(poolclass=poolclass, pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT, pool_recycle=settings.DB_POOL_RECYCLE)
+    return args
+
+def async_url(url: str) -> str:
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return u.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+engine = create_engine(DATABASE_URL, **_engine_args(DATABASE_URL, TimedQueuePool))
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def init_db():
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    async_engine = create_async_engine(async_url(DATABASE_URL), **_engine_args(DATABASE_URL, TimedAsyncQueuePool))
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=True)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def session_route(fn):
+    """Serve a sync `def route(..., db: Session)` from an AsyncSession when DB_ASYNC is on.
+
+    The route body still runs on a threadpool worker; only what it passes to run_db() runs on the
+    event loop, through the async driver. Such a route must not touch `db` any other way.
+    """
+    if not settings.DB_ASYNC:
+        return fn
+    sig = inspect.signature(fn)
+    params = [p.replace(default=Depends(get_async_db)) if p.name == "db" else p for p in sig.parameters.values()]
+
+    @functools.wraps(fn)
+    async def endpoint(**kwargs):
+        return await run_in_threadpool(functools.partial(fn, **kwargs))
+
+    endpoint.__signature__ = sig.replace(parameters=params)
+    return endpoint
+
+def run_db(db, load: Callable[[Session], T]) -> T:
+    """`load(session)` for a session_route body: called directly on a Session, or through
+    AsyncSession.run_sync on the event loop. Keep `load` to queries; do the rest of the work outside."""
+    if isinstance(db, Session):
+        return load(db)
+    return anyio.from_thread.run(db.run_sync, load)
+
+def _catch_up():
+    # what startup did before migrations: create missing tables, nullable columns and indexes
+    tables = [Base.metadata.tables[name] for name in BASELINE_TABLES]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    existing = sa_inspect(engine)
+    for table in tables:
+        have = {c["name"] for c in existing.get_columns(table.name)}
+        for column in table.columns:
+            if f"{table.name}.{column.name}" in LATER_COLUMNS:
+                continue
+            if column.name not in have and column.nullable and column.server_default is None:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                                      f"{column.type.compile(engine.dialect)}"))
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def migrate():
+    """Upgrade the schema to the latest Alembic revision (backend/alembic).
+
+    A database created by create_all() before migrations existed has tables but no
+    alembic_version; it gets the old catch-up and is stamped at the baseline revision first.
+    """
+    from alembic import command
+    from alembic.config import Config
     from . import models  # noqa
-    Base.metadata.create_all(bind=engine)
+    cfg = Config()
+    cfg.set_main_option("script_location", MIGRATIONS)
+    tables = set(sa_inspect(engine).get_table_names())
+    if "tools" in tables and "alembic_version" not in tables:
+        _catch_up()
+        command.stamp(cfg, BASELINE_REVISION)
+    command.upgrade(cfg, "head")
+
+def init_db():
+    """Migrate, then set up what the database maintains itself (search index, term index, facet tallies,
+    similar-tool lists)."""
+    from .services.facets import ensure_facets
+    from .services.search import ensure_search_index
+    from .services.similar import ensure_neighbors
+    from .services.terms import ensure_terms
+    migrate()
+    ensure_search_index(engine)
+    ensure_terms(engine)
+    ensure_facets(engine)
+    ensure_neighbors(engine)
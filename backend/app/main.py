@@ -1,16 +1,49 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from contextlib import asynccontextmanager
 from pathlib import Path
-import os, asyncio, urllib.request
+import os, asyncio, time, urllib.request
 
 from .config import get_settings
 from .db import init_db
-from .routes import health, questionnaire, tools, recommend, ingest
+from .routes import health, questionnaire, tools, recommend, ingest, admin, metrics
+from .services import warmup
+from .services.metrics import PROCESS_STARTED, STARTUP, MetricsMiddleware
 
 settings = get_settings()
-app = FastAPI(title=settings.APP_NAME)
+
+# Keep-alive (prevents Railway auto-sleep) — stdlib only, run in a worker thread so it never blocks the loop
+def _ping(url: str):
+    with urllib.request.urlopen(urllib.request.Request(url, method="GET"), timeout=5):
+        pass
+
+async def _keepalive_loop():
+    port = int(os.getenv("PORT", "8000"))
+    url = f"http://127.0.0.1:{port}/health"
+    while True:
+        await asyncio.sleep(settings.KEEPALIVE_SECONDS)
+        try:
+            await asyncio.to_thread(_ping, url)
+        except Exception:
+            pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    STARTUP.set("import", value=time.time() - PROCESS_STARTED)
+    t0 = time.perf_counter()
+    await asyncio.to_thread(init_db)  # the schema has to be current before the first request
+    STARTUP.set("migrate", value=time.perf_counter() - t0)
+    # serve /health right away; /ready flips once the warm-up is done
+    tasks = [asyncio.create_task(warmup.run())]
+    if settings.KEEPALIVE_SECONDS > 0:
+        tasks.append(asyncio.create_task(_keepalive_loop()))
+    yield
+    for t in tasks:
+        t.cancel()
+
+app = FastAPI(title=settings.APP_NAME, default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # CORS
 origins = [o.strip() for o in settings.ALLOWED_ORIGINS.split(",")] if getattr(settings, "ALLOWED_ORIGINS", None) else ["*"]
@@ -22,8 +55,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# DB
-init_db()
+# Metrics (outermost, so latency covers CORS too)
+app.add_middleware(MetricsMiddleware)
 
 # Static + favicon
 app.mount("/static", StaticFiles(directory="backend/app/static"), name="static")
@@ -38,26 +71,5 @@ app.include_router(questionnaire.router)
 app.include_router(tools.router)
 app.include_router(recommend.router)
 app.include_router(ingest.router)
-
-# Keep-alive (prevents Railway auto-sleep) — stdlib only
-async def _keepalive_loop():
-    port = int(os.getenv("PORT", "8000"))
-    url = f"http://127.0.0.1:{port}/health"
-    while True:
-        try:
-            req = urllib.request.Request(url, method="GET")
-            with urllib.request.urlopen(req, timeout=5):
-                pass
-        except Exception:
-            pass
-        await asyncio.sleep(240)  # every 4 minutes
-
-@app.on_event("startup")
-async def _startup():
-    app.state._keepalive_task = asyncio.create_task(_keepalive_loop())
-
-@app.on_event("shutdown")
-async def _shutdown():
-    t = getattr(app.state, "_keepalive_task", None)
-    if t:
-        t.cancel()
+app.include_router(admin.router)
+app.include_router(metrics.router)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, JSON
+from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from .db import Base
@@ -44,7 +44,9 @@ class Tool(Base):
     learning_curve_score = Column(Float, default=0)
     longevity_score = Column(Float, default=0)
     total_score = Column(Float, default=0)
+    score_version = Column(String)  # weights profile version total_score was computed with
     score_notes = Column(String)
+    content_hash = Column(String)  # writes.content_hash() of what the last write supplied; unchanged rewrites are skipped
 
     best_use_cases_csv = Column(String)
     buyer_personas_csv = Column(String)
@@ -55,3 +57,49 @@ class Tool(Base):
     affiliate_link = Column(String)
 
     last_verified_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # keyset pagination: ORDER BY total_score DESC, tool_id DESC walks this backwards
+    __table_args__ = (Index("ix_tools_total_score_tool_id", "total_score", "tool_id"),)
+
+class ToolTerm(Base):
+    """One normalized token of a Tool's *_csv list fields (see services.terms)."""
+    __tablename__ = "tool_terms"
+    tool_id = Column(String, ForeignKey("tools.tool_id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)
+    term = Column(String, primary_key=True)
+    __table_args__ = (Index("ix_tool_terms_kind_term", "kind", "term", "tool_id"),)
+
+class ToolFacet(Base):
+    """Running count of tools per (category, facet, value), kept in step with writes (see services.facets)."""
+    __tablename__ = "tool_facets"
+    category = Column(String, primary_key=True)  # "" for tools without one
+    facet = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class ToolNeighbor(Base):
+    """One of a Tool's top-k most similar tools (see services.similar)."""
+    __tablename__ = "tool_neighbors"
+    tool_id = Column(String, ForeignKey("tools.tool_id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    neighbor_id = Column(String, ForeignKey("tools.tool_id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)
+    __table_args__ = (Index("ix_tool_neighbors_neighbor_id", "neighbor_id"),)
+
+class ToolChange(Base):
+    """The latest write to one tool, in the order of GET /tools/changes (see services.changes)."""
+    __tablename__ = "tool_changes"
+    seq = Column(Integer, primary_key=True)
+    tool_id = Column(String, nullable=False)
+    created_seq = Column(Integer)  # seq of the entry that created the tool; NULL when it is this one
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # seq is never reused (AUTOINCREMENT on SQLite), so a reader's cursor stays valid across deletes
+    __table_args__ = (Index("ix_tool_changes_tool_id", "tool_id", unique=True), {"sqlite_autoincrement": True})
+
+class CatalogVersion(Base):
+    """A single row counting committed catalog writes, so every process can tell when its cached copy
+    went stale (see services.catalog.sync)."""
+    __tablename__ = "catalog_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
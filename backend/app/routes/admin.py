@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal, async_engine, engine
+from ..services import http_cache
+from ..services.facets import check_facets, rebuild_facets
+from ..services.pool_metrics import pool_stats
+from ..services.recommender import cache_stats
+from ..services.reindex import reindex_catalog
+from ..utils.scoring import UnknownProfile, get_profile, list_profiles
+
+router = APIRouter(prefix="/admin")
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@router.get("/weights")
+def weight_profiles():
+    out = []
+    for name in list_profiles():
+        try:
+            p = get_profile(name)
+        except UnknownProfile:
+            continue
+        out.append({"name": p.name, "version": p.version, "weights": p.weights})
+    return {"profiles": out}
+
+@router.post("/reindex")
+def reindex(profile: str = "default", batch_size: int = 1000, db: Session = Depends(get_db)):
+    try:
+        weights = get_profile(profile)
+    except UnknownProfile:
+        raise HTTPException(status_code=404, detail=f"Unknown weights profile: {profile}")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be positive.")
+    return reindex_catalog(db, weights, batch_size=batch_size)
+
+@router.get("/facets/check")
+def facet_check(db: Session = Depends(get_db)):
+    return check_facets(db)
+
+@router.post("/facets/rebuild")
+def facet_rebuild(db: Session = Depends(get_db)):
+    return {"tallies": rebuild_facets(db)}
+
+@router.get("/cache")
+def recommend_cache():
+    return {"recommend": cache_stats(), "http": http_cache.stats()}
+
+@router.get("/pool")
+def connection_pools():
+    out = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        out["async"] = pool_stats(async_engine.sync_engine)
+    return out
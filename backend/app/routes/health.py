@@ -1,7 +1,17 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from ..services.warmup import state
 
 router = APIRouter()
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    # 503 until the startup warm-up (catalog, weights, questionnaire) has finished
+    if not state.ready:
+        return ORJSONResponse({"status": "starting", "error": state.error}, status_code=503)
+    return {"status": "ready", "warmup_ms": {k: round(v * 1000, 1) for k, v in state.phases.items()}}
@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..db import async_engine, engine
+from ..services import metrics
+from ..services.pool_metrics import BUCKETS, pool_stats
+from ..services.recommender import cache_stats
+
+router = APIRouter()
+
+def _pool_lines():
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    pools = {p: pool_stats(e) for p, e in engines.items()}
+    out = []
+    for name, help, key, kind in (
+        ("db_pool_connections_in_use", "Connections checked out.", "in_use", "gauge"),
+        ("db_pool_connections_idle", "Connections idle in the pool.", "idle", "gauge"),
+        ("db_pool_overflow", "Connections open beyond pool_size.", "overflow", "gauge"),
+        ("db_pool_checkouts_total", "Connection checkouts.", "checkouts", "counter"),
+        ("db_pool_waits_total", "Checkouts that found the pool exhausted.", "waits", "counter"),
+        ("db_pool_timeouts_total", "Checkouts that timed out.", "timeouts", "counter"),
+    ):
+        samples = {(("pool", p),): s[key] for p, s in pools.items() if s.get(key) is not None}
+        out += metrics.gauge_lines(name, help, samples, kind)
+    checkouts = {(("pool", p),): e.pool.metrics.histogram() for p, e in engines.items() if hasattr(e.pool, "metrics")}
+    out += metrics.histogram_lines("db_pool_checkout_duration_seconds", "Time to check out a connection.",
+                                   BUCKETS, checkouts)
+    return out
+
+def _cache_lines():
+    s = cache_stats()
+    out = metrics.gauge_lines("recommend_cache_entries", "Cached /recommend results.", {(): s["size"]})
+    out += metrics.gauge_lines("recommend_cache_lookups_total", "/recommend cache lookups by outcome.",
+                               {(("outcome", k),): s[k] for k in ("hits", "misses", "coalesced")}, "counter")
+    return out
+
+metrics.COLLECTORS += [_pool_lines, _cache_lines]
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
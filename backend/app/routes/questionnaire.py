@@ -1,14 +1,12 @@
-# backend/app/routes/questionnaire.py
-import json
-from pathlib import Path
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
-router = APIRouter()
+from ..services import http_cache
+from ..services.questionnaire import get_questionnaire
 
-# File actually lives at: backend/data/questionnaire_sample.json
-DATA_PATH = Path(__file__).resolve().parents[2] / "data" / "questionnaire_sample.json"
+router = APIRouter()
 
 @router.get("/questionnaire")
-def get_questionnaire():
-    with DATA_PATH.open("r", encoding="utf-8") as f:
-        return json.load(f)
+def questionnaire(request: Request):
+    # compiled and serialized once per version of backend/data/questionnaire_sample.json
+    q = get_questionnaire()
+    return http_cache.respond(request, http_cache.cached(("questionnaire", q.etag), lambda: q.body))
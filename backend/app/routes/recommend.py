@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, Body
+from fastapi import APIRouter, Depends, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import Any, Dict, List
 from sqlalchemy.orm import Session
+import json, math
 
-from ..db import SessionLocal
-from ..services.recommender import recommend
+from ..config import get_settings
+from ..db import SessionLocal, run_db, session_route
+from ..services import catalog
+from ..services.recommender import load_inputs, recommend_batch, recommend_cached, sweep
+from ..utils.scoring import UnknownProfile, get_profile
 
 router = APIRouter()
 
@@ -14,38 +19,169 @@ def get_db():
     finally:
         db.close()
 
+def _number(payload: Dict[str, Any], key: str, cast, default=None):
+    """payload[key] as an int or a finite float (None stays None); HTTP 400 otherwise."""
+    value = payload.get(key, default)
+    if value is None:
+        return None
+    try:
+        out = cast(value)
+    except (TypeError, ValueError, OverflowError):
+        out = None
+    if out is None or isinstance(value, bool) or not math.isfinite(out):
+        raise HTTPException(status_code=400, detail=f"{key} must be a number.")
+    return out
+
+def parse_request(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """A /recommend payload → recommend() keyword arguments (HTTP 400 on bad input)."""
+    answers: Dict[str, Any] = payload.get("answers") or {}
+    budget_monthly = _number(payload, "budget_monthly", float)
+    must_integrate_with: List[str] = payload.get("must_integrate_with", []) or []
+    prefer_self_hostable = bool(payload.get("prefer_self_hostable", False))
+    max_tool_count = _number(payload, "max_tool_count", int)
+    max_tool_count = 8 if max_tool_count is None else max_tool_count
+    try:
+        profile = get_profile(payload.get("weights_profile") or "default")
+    except UnknownProfile:
+        raise HTTPException(status_code=400, detail="Unknown weights_profile.")
+    mode = payload.get("mode") or "greedy"
+    if mode not in ("greedy", "optimal"):
+        raise HTTPException(status_code=400, detail="mode must be 'greedy' or 'optimal'.")
+    # the optimizer defaults to one tool per category; greedy keeps its historical behaviour
+    max_per_category = _number(payload, "max_per_category", int, 1 if mode == "optimal" else None)
+    time_budget_ms = _number(payload, "time_budget_ms", float)
+    return {
+        "answers": answers,
+        "budget_monthly": budget_monthly,
+        "must_integrate_with": must_integrate_with,
+        "prefer_self_hostable": prefer_self_hostable,
+        "max_tool_count": max_tool_count,
+        "profile": profile,
+        "mode": mode,
+        "max_per_category": max_per_category,
+        "time_budget_ms": time_budget_ms,
+    }
+
+def to_item(t):
+    return {
+        "tool_id": t.tool_id,
+        "name": t.name,
+        "category": t.category,
+        "price_low_usd": t.price_low_usd,
+        "total_score": t.total_score,
+    }
+
+def to_response(rec, profile) -> Dict[str, Any]:
+    alternates = [to_item(t) for t in rec.alternates]
+    for item, pick in zip(alternates, rec.alternate_for or ()):
+        item["alternate_for"] = pick
+    out = {
+        "tools": [to_item(t) for t in rec.picked],
+        "alternates": alternates,
+        "total_monthly_estimate": rec.cost,
+        "rationale": rec.rationale,
+        "weights_version": profile.version,
+    }
+    if rec.solver is not None:
+        out["solver"] = rec.solver
+    return out
+
 @router.post("/recommend")
+@session_route
 def get_recommendation(
     payload: Dict[str, Any] = Body(...),
     db: Session = Depends(get_db),
 ):
-    answers: Dict[str, Any] = payload.get("answers") or {}
-    budget_monthly = payload.get("budget_monthly")
-    must_integrate_with: List[str] = payload.get("must_integrate_with", []) or []
-    prefer_self_hostable = bool(payload.get("prefer_self_hostable", False))
-    max_tool_count = int(payload.get("max_tool_count", 8))
-
-    picked, alternates, cost, rationale = recommend(
-        db=db,
-        answers=answers,
-        budget_monthly=budget_monthly,
-        must_integrate_with=must_integrate_with,
-        prefer_self_hostable=prefer_self_hostable,
-        max_tool_count=max_tool_count,
-    )
-
-    def to_item(t):
-        return {
-            "tool_id": t.tool_id,
-            "name": t.name,
-            "category": t.category,
-            "price_low_usd": t.price_low_usd,
-            "total_score": t.total_score,
-        }
+    kwargs = parse_request(payload)
+    rec = recommend_cached(run_db(db, load_inputs), **kwargs)
+    return to_response(rec, kwargs["profile"])
+
+@router.post("/recommend/batch")
+@session_route
+def get_recommendations(
+    payload: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db),
+):
+    """Score many questionnaires against one catalog load.
+
+    Body: {"requests": [<recommend payload>, ...], "format": "json" | "ndjson"}. Each result
+    carries its position as "index" and echoes the request's "id", if any.
+    """
+    requests = payload.get("requests")
+    if not isinstance(requests, list) or not requests:
+        raise HTTPException(status_code=400, detail="requests must be a non-empty list.")
+    limit = get_settings().RECOMMEND_BATCH_MAX
+    if len(requests) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} requests per batch.")
+    fmt = payload.get("format") or "json"
+    if fmt not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'.")
+    parsed = []
+    for i, r in enumerate(requests):
+        if not isinstance(r, dict):
+            raise HTTPException(status_code=400, detail=f"requests[{i}] must be an object.")
+        try:
+            parsed.append(parse_request(r))
+        except HTTPException as exc:
+            raise HTTPException(status_code=400, detail=f"requests[{i}]: {exc.detail}")
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail=f"requests[{i}]: invalid value.")
+    # the only DB work: done before streaming starts, while the session is ours
+    _, snap, neighbors = run_db(db, load_inputs)
+
+    def results():
+        for i, (r, rec) in enumerate(zip(requests, recommend_batch(snap, parsed, neighbors=neighbors))):
+            item = {"index": i, **to_response(rec, parsed[i]["profile"])}
+            if "id" in r:
+                item["id"] = r["id"]
+            yield item
+
+    if fmt == "ndjson":
+        return StreamingResponse((json.dumps(item) + "\n" for item in results()),
+                                 media_type="application/x-ndjson")
+    return {"results": list(results())}
+
+def parse_budgets(payload: Dict[str, Any]) -> List[float]:
+    """"budgets": [50, 100, ...] or "budget_range": {"start": 0, "stop": 500, "step": 50} (stop included)."""
+    limit = get_settings().RECOMMEND_SWEEP_MAX_POINTS
+    try:
+        if payload.get("budgets") is not None:
+            budgets = [float(b) for b in payload["budgets"]]
+        elif payload.get("budget_range") is not None:
+            r = payload["budget_range"]
+            start, stop, step = float(r.get("start", 0)), float(r["stop"]), float(r["step"])
+            if step <= 0:
+                raise HTTPException(status_code=400, detail="budget_range.step must be positive.")
+            count = int((stop - start) / step + 1e-9) + 1
+            budgets = [round(start + i * step, 2) for i in range(min(count, limit + 1))]
+        else:
+            raise HTTPException(status_code=400, detail="budgets or budget_range is required.")
+    except (TypeError, ValueError, KeyError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid budgets.")
+    if not budgets or any(b < 0 for b in budgets):
+        raise HTTPException(status_code=400, detail="Budgets must be a non-empty list of amounts >= 0.")
+    if len(budgets) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} budget points.")
+    return budgets
+
+@router.post("/recommend/sweep")
+@session_route
+def sweep_recommendations(
+    payload: Dict[str, Any] = Body(...),
+    db: Session = Depends(get_db),
+):
+    """The greedy /recommend stack at many budgets, from one catalog load and one ranking.
 
+    Body: a /recommend payload (budget_monthly ignored) plus "budgets" or "budget_range".
+    """
+    kwargs = parse_request(payload)
+    if kwargs["mode"] != "greedy":
+        raise HTTPException(status_code=400, detail="sweep supports mode 'greedy' only.")
+    budgets = parse_budgets(payload)
+    points = sweep(None, budgets, kwargs["answers"], kwargs["must_integrate_with"], kwargs["prefer_self_hostable"],
+                   kwargs["max_tool_count"], kwargs["profile"], snapshot=run_db(db, catalog.get_snapshot))
     return {
-        "tools": [to_item(t) for t in picked],
-        "alternates": [to_item(t) for t in alternates],
-        "total_monthly_estimate": cost,
-        "rationale": rationale,
+        "points": [{"budget_monthly": p.budget, "tools": [to_item(t) for t in p.picked],
+                    "total_monthly_estimate": p.cost, "total_utility": p.utility} for p in points],
+        "weights_version": kwargs["profile"].version,
     }
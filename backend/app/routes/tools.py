@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import exists, tuple_
 from sqlalchemy.orm import Session
-from slugify import slugify
-from ..db import SessionLocal
+from typing import Literal
+import base64, json
+import numpy as np
+from ..db import SessionLocal, run_db, session_route
 from .. import models, schemas
+from ..services import catalog, changes, counts, export, facets, http_cache, search, similar, terms, writes
 
 router = APIRouter()
 
@@ -14,59 +19,230 @@ def get_db():
         db.close()
 
 @router.get("/tools")
-def list_tools(q: str | None = None,
+@session_route
+def list_tools(request: Request,
+               q: str | None = None,
                category: str | None = None,
                min_score: float | None = None,
+               tags: list[str] | None = Query(None),
+               persona: str | None = None,
+               industry: str | None = None,
                page: int = 1, page_size: int = 20,
+               cursor: str | None = None,
+               count: Literal["exact", "cached", "none"] = "cached",
+               fields: str | None = None,
                db: Session = Depends(get_db)):
-    query = db.query(models.Tool)
-    if q:
-        like = f"%{q.lower()}%"
-        query = query.filter(models.Tool.name.ilike(like) | models.Tool.description_short.ilike(like))
+    run_db(db, catalog.sync)
+    body = http_cache.cached(http_cache.request_key(request), lambda: http_cache.json_bytes(run_db(
+        db, lambda s: _tools_page(s, q, category, min_score, tags, persona, industry, page, page_size, cursor,
+                                  count, fields))))
+    return http_cache.respond(request, body)
+
+def _tools_page(db: Session, q, category, min_score, tags, persona, industry, page, page_size, cursor, count,
+                fields) -> dict:
+    Tool = models.Tool
+    fields = _parse_fields(fields)
+    query = _projected(db, fields)
+    order = [Tool.total_score.desc().nulls_last(), Tool.tool_id.desc()]
+    if q and cursor is None:
+        query, relevance = search.apply_search(query, q)
+        order = relevance + order
+    elif q:
+        # cursor pages walk the (total_score, tool_id) order, so only the match filter applies
+        query, _ = search.apply_search(query, q)
     if category:
         query = query.filter(models.Tool.category == category)
     if min_score is not None:
         query = query.filter(models.Tool.total_score >= min_score)
-    total = query.count()
-    items = query.order_by(models.Tool.total_score.desc()).offset((page-1)*page_size).limit(page_size).all()
-    return {"total": total, "page": page, "page_size": page_size, "items": [tool_to_dict(t) for t in items]}
+    wanted = _wanted_terms(tags, persona, industry)
+    for kind, term in wanted:
+        query = query.filter(exists().where(models.ToolTerm.tool_id == models.Tool.tool_id,
+                                            models.ToolTerm.kind == kind, models.ToolTerm.term == term))
+
+    if count == "none":
+        total = None
+    elif count == "exact":
+        total = query.count()
+    else:
+        key = (q, category, min_score, tuple(wanted))
+        total = counts.cached_count(db, key, query.count)
+
+    if cursor is not None:
+        items, next_cursor = _keyset_page(query, _decode_cursor(cursor), page_size)
+        return {"total": total, "page_size": page_size, "next_cursor": next_cursor, "items": _row_dicts(items, fields)}
+    items = query.order_by(*order).offset((page-1)*page_size).limit(page_size).all()
+    out = {"total": total, "page": page, "page_size": page_size, "items": _row_dicts(items, fields)}
+    if not q and len(items) == page_size:
+        out["next_cursor"] = _encode_cursor(items[-1])
+    return out
+
+def _wanted_terms(tags: list[str] | None, persona: str | None, industry: str | None) -> list:
+    """(kind, term) pairs that must all match, exactly (normalized), through the tool_terms index."""
+    wanted = [("tag", t) for tag in tags or [] for t in terms.split_terms(tag)]
+    wanted += [(kind, terms.normalize_term(v)) for kind, v in (("persona", persona), ("industry", industry)) if v]
+    return wanted
+
+@router.get("/tools/facets")
+@session_route
+def tool_facets(q: str | None = None,
+                category: str | None = None,
+                min_score: float | None = None,
+                tags: list[str] | None = Query(None),
+                persona: str | None = None,
+                industry: str | None = None,
+                db: Session = Depends(get_db)):
+    wanted = _wanted_terms(tags, persona, industry)
+    if not (q or wanted or min_score is not None):
+        return ORJSONResponse({**run_db(db, lambda s: facets.from_tallies(s, category or None)), "source": "tallies"})
+    # narrower filters: count over the in-memory snapshot instead
+    snap, matched = run_db(db, lambda s: (
+        catalog.get_snapshot(s), search.apply_search(s.query(models.Tool.tool_id), q)[0].all() if q else None))
+    rows = facets.snapshot_rows(snap, category, min_score, wanted)
+    if q:
+        positions = sorted({snap.index[i] for (i,) in matched if i in snap.index})
+        rows = np.intersect1d(rows, np.array(positions, dtype=np.int32), assume_unique=True)
+    return ORJSONResponse({**facets.from_snapshot(snap, rows), "source": "snapshot"})
+
+@router.get("/tools/export")
+def export_tools(format: Literal["csv", "ndjson"] = "csv"):
+    """The whole catalog, streamed in the column layout of ai_tools_schema_template.csv.
+
+    A CSV export can be uploaded to /tools/ingest as is.
+    """
+    return StreamingResponse(export.stream_catalog(format), media_type=export.FORMATS[format],
+                             headers={"Content-Disposition": f'attachment; filename="tools.{format}"'})
+
+@router.get("/tools/changes")
+@session_route
+def tool_changes(since: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=5000),
+                 fields: str | None = None, db: Session = Depends(get_db)):
+    """Tools created, updated or deleted after change `since`, oldest first; poll again with `next_since`."""
+    fields = _parse_fields(fields)
+    entries = run_db(db, lambda s: changes.feed(s, since, limit + 1, fields))
+    items = [{"seq": e.seq, "tool_id": e.tool_id, "op": e.op,
+              "tool": None if e.row is None else _row_dicts([e.row], fields)[0]} for e in entries[:limit]]
+    return ORJSONResponse({"since": since, "next_since": items[-1]["seq"] if items else since,
+                           "has_more": len(entries) > limit, "items": items})
+
+def _encode_cursor(t: models.Tool) -> str:
+    raw = json.dumps([t.total_score, t.tool_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> tuple | None:
+    """'' starts a keyset walk; otherwise the (total_score, tool_id) of the last row seen."""
+    if not cursor:
+        return None
+    try:
+        score, tool_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (None if score is None else float(score)), str(tool_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def _keyset_page(query, after: tuple | None, limit: int):
+    """Rows after `after` in (total_score DESC NULLS LAST, tool_id DESC) order, plus the next cursor.
+
+    Scored rows come from a range scan of ix_tools_total_score_tool_id; rows without a score
+    are walked separately afterwards, since NULL doesn't take part in row-value comparisons.
+    """
+    Tool = models.Tool
+    items = []
+    if after is None or after[0] is not None:
+        scored = query.filter(Tool.total_score.isnot(None))
+        if after is not None:
+            scored = scored.filter(tuple_(Tool.total_score, Tool.tool_id) < after)
+        items = scored.order_by(Tool.total_score.desc(), Tool.tool_id.desc()).limit(limit + 1).all()
+    if len(items) <= limit:
+        unscored = query.filter(Tool.total_score.is_(None))
+        if after is not None and after[0] is None:
+            unscored = unscored.filter(Tool.tool_id < after[1])
+        items += unscored.order_by(Tool.tool_id.desc()).limit(limit + 1 - len(items)).all()
+    if len(items) > limit:
+        return items[:limit], _encode_cursor(items[limit - 1])
+    return items, None
 
 @router.get("/tools/{tool_id}")
-def get_tool(tool_id: str, db: Session = Depends(get_db)):
-    t = db.query(models.Tool).filter(models.Tool.tool_id == tool_id).first()
-    if not t:
+@session_route
+def get_tool(tool_id: str, request: Request, fields: str | None = None, db: Session = Depends(get_db)):
+    def render():
+        wanted = _parse_fields(fields)
+        t = run_db(db, lambda s: _projected(s, wanted).filter(models.Tool.tool_id == tool_id).first())
+        if not t:
+            raise HTTPException(status_code=404, detail="Tool not found")
+        return http_cache.json_bytes(_row_dicts([t], wanted)[0])
+    run_db(db, catalog.sync)
+    return http_cache.respond(request, http_cache.cached(http_cache.request_key(request), render))
+
+# writes stay on the sync engine (like /tools/ingest): similar.update() scores inside the transaction
+@router.delete("/tools/{tool_id}", status_code=204)
+def delete_tool(tool_id: str, db: Session = Depends(get_db)):
+    if not writes.delete_tools(db, [tool_id]):
+        raise HTTPException(status_code=404, detail="Tool not found")
+    return Response(status_code=204)
+
+@router.get("/tools/{tool_id}/similar")
+@session_route
+def similar_tools(tool_id: str, k: int = Query(similar.K, ge=1, le=similar.K), db: Session = Depends(get_db)):
+    snap, table = run_db(db, lambda s: (catalog.get_snapshot(s), similar.get_table(s)))
+    if tool_id not in snap.index:
         raise HTTPException(status_code=404, detail="Tool not found")
-    return tool_to_dict(t)
+    items = []
+    for neighbor_id, score in table.of(tool_id)[:k]:
+        i = snap.index.get(neighbor_id)
+        if i is not None:
+            items.append({**snap.refs[i]._asdict(), "similarity": score})
+    return ORJSONResponse({"tool_id": tool_id, "items": items})
 
 @router.post("/tools", response_model=schemas.ToolOut)
 def upsert_tool(payload: schemas.ToolIn, db: Session = Depends(get_db)):
-    t = db.query(models.Tool).filter(models.Tool.tool_id == payload.tool_id).first()
-    if not t:
-        t = models.Tool(tool_id=payload.tool_id, slug=slugify(payload.name))
-    for k, v in payload.model_dump().items():
-        setattr(t, k, v)
-    db.add(t); db.commit(); db.refresh(t)
-    return payload
-
-def tool_to_dict(t: models.Tool):
-    return {
-        "tool_id": t.tool_id, "name": t.name, "slug": t.slug,
-        "homepage_url": t.homepage_url,
-        "description_short": t.description_short,
-        "description_long": t.description_long,
-        "category": t.category, "subcategory": t.subcategory,
-        "tags_csv": t.tags_csv, "pricing_model": t.pricing_model,
-        "price_low_usd": t.price_low_usd, "price_high_usd": t.price_high_usd,
-        "free_tier": t.free_tier, "trial_days": t.trial_days, "plan_notes": t.plan_notes,
-        "api_available": t.api_available, "zapier": t.zapier, "make": t.make, "n8n": t.n8n, "webhooks": t.webhooks,
-        "integrations_csv": t.integrations_csv,
-        "gdpr": t.gdpr, "soc2": t.soc2, "hipaa": t.hipaa,
-        "oauth": t.oauth, "sso": t.sso, "rbac": t.rbac,
-        "accuracy_score": t.accuracy_score, "speed_score": t.speed_score, "cost_efficiency_score": t.cost_efficiency_score,
-        "integrations_score": t.integrations_score, "data_control_score": t.data_control_score,
-        "learning_curve_score": t.learning_curve_score, "longevity_score": t.longevity_score,
-        "total_score": t.total_score, "score_notes": t.score_notes,
-        "best_use_cases_csv": t.best_use_cases_csv, "buyer_personas_csv": t.buyer_personas_csv, "ideal_industries_csv": t.ideal_industries_csv,
-        "reviewer_citations_csv": t.reviewer_citations_csv, "reviewer_urls_csv": t.reviewer_urls_csv,
-        "affiliate_link": t.affiliate_link, "last_verified_at": str(t.last_verified_at)
-    }
+    try:
+        values = writes.coerce_row(payload.model_dump())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    written = writes.write_tools(db, {payload.tool_id: values})
+    if payload.tool_id in written.rejected:
+        raise HTTPException(status_code=409, detail=written.rejected[payload.tool_id])
+    return {**payload.model_dump(), "total_score": written.totals[payload.tool_id]}
+
+# response keys, in order; each is a Tool column of the same name
+TOOL_FIELDS = [
+    "tool_id", "name", "slug", "homepage_url", "description_short", "description_long",
+    "category", "subcategory", "tags_csv", "pricing_model", "price_low_usd", "price_high_usd",
+    "free_tier", "trial_days", "plan_notes", "api_available", "zapier", "make", "n8n", "webhooks",
+    "integrations_csv", "gdpr", "soc2", "hipaa", "oauth", "sso", "rbac",
+    "accuracy_score", "speed_score", "cost_efficiency_score", "integrations_score", "data_control_score",
+    "learning_curve_score", "longevity_score", "total_score", "score_version", "score_notes",
+    "best_use_cases_csv", "buyer_personas_csv", "ideal_industries_csv",
+    "reviewer_citations_csv", "reviewer_urls_csv", "affiliate_link", "last_verified_at",
+]
+
+def _parse_fields(fields: str | None) -> list:
+    if not fields:
+        return TOOL_FIELDS
+    out = []
+    for f in (f.strip() for f in fields.split(",")):
+        if f and f not in out:
+            out.append(f)
+    unknown = [f for f in out if f not in TOOL_FIELDS]
+    if not out:
+        return TOOL_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return out
+
+def _projected(db: Session, fields: list):
+    """A query for just `fields` (plus the keyset columns, selected last) as plain rows, no ORM objects."""
+    extra = [f for f in ("total_score", "tool_id") if f not in fields]
+    return db.query(*[getattr(models.Tool, f) for f in fields + extra])
+
+def _row_dicts(rows, fields: list) -> list:
+    out = [dict(zip(fields, row)) for row in rows]  # zip drops the trailing keyset columns
+    if "last_verified_at" in fields:
+        for d in out:
+            d["last_verified_at"] = str(d["last_verified_at"])
+    return out
+
+def tool_to_dict(t: models.Tool, fields: list = TOOL_FIELDS):
+    out = {f: getattr(t, f) for f in fields}
+    if "last_verified_at" in out:
+        out["last_verified_at"] = str(out["last_verified_at"])
+    return out
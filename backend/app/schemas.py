@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 
 class ToolIn(BaseModel):
     tool_id: str
@@ -53,9 +53,15 @@ class RecommendRequest(BaseModel):
     must_integrate_with: list[str] = Field(default_factory=list)
     prefer_self_hostable: bool = False
     max_tool_count: int = 8
+    weights_profile: str = "default"
+    mode: Literal["greedy", "optimal"] = "greedy"
+    max_per_category: int | None = None  # defaults to 1 in "optimal" mode
+    time_budget_ms: float | None = None
 
 class RecommendResponse(BaseModel):
     tools: list[dict]
     alternates: dict
     total_monthly_estimate: float
     rationale: str
+    weights_version: str
+    solver: dict | None = None
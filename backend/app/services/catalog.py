@@ -0,0 +1,423 @@
+# backend/app/services/catalog.py
+from __future__ import annotations
+import os, threading, time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from . import terms as term_index
+from ..config import get_settings
+from ..models import CatalogVersion, Tool
+from ..utils.scoring import SCORE_FIELDS, score_columns
+
+FLAG_FIELDS = ["free_tier", "api_available", "zapier", "make", "n8n", "webhooks",
+               "gdpr", "soc2", "hipaa", "oauth", "sso", "rbac"]
+FLAG_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(FLAG_FIELDS)}
+# low-cardinality text columns kept as codes into a per-column vocabulary
+CODED_FIELDS = ["subcategory", "pricing_model", "score_version"]
+PATCH_MAX_ROWS = 100
+
+COLUMNS = ["tool_id", "name", "category", "price_low_usd", "total_score", *SCORE_FIELDS, *FLAG_FIELDS,
+           *CODED_FIELDS]
+
+_NO_ROWS = np.empty(0, dtype=np.int32)
+
+class ToolRef(NamedTuple):
+    """The slice of a Tool that recommend() hands back to the route."""
+    tool_id: str
+    name: str | None
+    category: str | None
+    price_low_usd: float | None
+    total_score: float | None
+
+class CatalogSnapshot:
+    """Column-oriented, read-only copy of the tools table.
+
+    Rows keep the order of an unordered SELECT (table order), so stable sorts over the
+    snapshot break ties exactly like the ORM path did.
+    """
+
+    def __init__(self, refs: List[ToolRef], categories: List[str], cat_codes: np.ndarray,
+                 price: np.ndarray, scores: np.ndarray, flags: np.ndarray,
+                 row_terms: Dict[str, List[Tuple[str, ...]]],
+                 postings: Optional[Dict[str, Dict[str, np.ndarray]]] = None,
+                 vocab: Optional[Dict[str, List[str]]] = None, codes: Optional[Dict[str, np.ndarray]] = None):
+        self.refs = refs
+        self.index = {r.tool_id: i for i, r in enumerate(refs)}
+        self.categories = categories
+        self.cat_codes = cat_codes
+        self.price = price
+        self.scores = scores
+        self.flags = flags
+        self.vocab = vocab or {f: [] for f in CODED_FIELDS}  # CODED_FIELDS column → values ("" for NULL)
+        self.codes = codes or {f: np.zeros(len(refs), dtype=np.int32) for f in CODED_FIELDS}
+        self.row_terms = row_terms  # kind → per-row normalized terms
+        self._postings = postings or {}  # kind → term → sorted row positions, built lazily
+        self._base_cache: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.refs)
+
+    @classmethod
+    def load(cls, db: Session) -> "CatalogSnapshot":
+        rows = db.execute(select(*[getattr(Tool, c) for c in COLUMNS])).all()
+        by_tool: Dict[str, Dict[str, List[str]]] = {}
+        for tool_id, kind, term in term_index.load_terms(db):
+            by_tool.setdefault(tool_id, {}).setdefault(kind, []).append(term)
+        row_terms = {kind: [tuple(by_tool.get(r.tool_id, {}).get(kind, ())) for r in rows]
+                     for kind in term_index.KINDS}
+        return cls.from_rows(rows, row_terms=row_terms)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable, categories: Optional[List[str]] = None,
+                  row_terms: Optional[Dict[str, List[Tuple[str, ...]]]] = None,
+                  vocab: Optional[Dict[str, List[str]]] = None) -> "CatalogSnapshot":
+        # rows may be Core rows or ORM objects; both expose the columns as attributes.
+        # Without row_terms the terms are tokenized from the ORM objects' *_csv fields.
+        rows = list(rows)
+        n = len(rows)
+        categories = list(categories or [])
+        codes_by_cat = {c: i for i, c in enumerate(categories)}
+        refs: List[ToolRef] = []
+        cat_codes = np.empty(n, dtype=np.int32)
+        price = np.empty(n, dtype=np.float64)
+        scores = np.empty((n, len(SCORE_FIELDS)), dtype=np.float64)
+        flags = np.zeros(n, dtype=np.uint16)
+        vocab = {f: list((vocab or {}).get(f, ())) for f in CODED_FIELDS}
+        code_of = {f: {v: i for i, v in enumerate(values)} for f, values in vocab.items()}
+        codes = {f: np.empty(n, dtype=np.int32) for f in CODED_FIELDS}
+        if row_terms is None:
+            row_terms = {kind: [] for kind in term_index.KINDS}
+            for r in rows:
+                for kind, values in term_index.tool_terms(r).items():
+                    row_terms[kind].append(values)
+        for i, r in enumerate(rows):
+            refs.append(ToolRef(r.tool_id, r.name, r.category, r.price_low_usd, r.total_score))
+            cat = r.category or ""
+            if cat not in codes_by_cat:
+                codes_by_cat[cat] = len(categories)
+                categories.append(cat)
+            cat_codes[i] = codes_by_cat[cat]
+            price[i] = float(r.price_low_usd or 0.0)
+            scores[i] = [float(getattr(r, k) or 0) for k in SCORE_FIELDS]
+            bits = 0
+            for name in FLAG_FIELDS:
+                if getattr(r, name):
+                    bits |= FLAG_BITS[name]
+            flags[i] = bits
+            for f in CODED_FIELDS:
+                v = getattr(r, f, None) or ""
+                if v not in code_of[f]:
+                    code_of[f][v] = len(vocab[f])
+                    vocab[f].append(v)
+                codes[f][i] = code_of[f][v]
+        return cls(refs, categories, cat_codes, price, scores, flags, row_terms, vocab=vocab, codes=codes)
+
+    def patched(self, rows: Iterable) -> "CatalogSnapshot":
+        """Copy of this snapshot with `rows` updated in place (by tool_id) or appended."""
+        rows = list({r.tool_id: r for r in rows}.values())  # last write wins
+        delta = CatalogSnapshot.from_rows(rows, categories=self.categories, vocab=self.vocab)
+        refs = list(self.refs)
+        row_terms = {kind: list(values) for kind, values in self.row_terms.items()}
+        changed: Dict[int, int] = {}  # position in the new snapshot → row in delta
+        cat_codes = self.cat_codes.copy()
+        price = self.price.copy()
+        scores = self.scores.copy()
+        flags = self.flags.copy()
+        codes = {f: c.copy() for f, c in self.codes.items()}
+        appended: List[int] = []
+        for j, ref in enumerate(delta.refs):
+            i = self.index.get(ref.tool_id)
+            if i is None:
+                changed[len(refs) + len(appended)] = j
+                appended.append(j)
+                continue
+            changed[i] = j
+            refs[i] = ref
+            for kind in row_terms:
+                row_terms[kind][i] = delta.row_terms[kind][j]
+            cat_codes[i] = delta.cat_codes[j]
+            price[i] = delta.price[j]
+            scores[i] = delta.scores[j]
+            flags[i] = delta.flags[j]
+            for f in codes:
+                codes[f][i] = delta.codes[f][j]
+        if appended:
+            refs.extend(delta.refs[j] for j in appended)
+            for kind in row_terms:
+                row_terms[kind].extend(delta.row_terms[kind][j] for j in appended)
+            cat_codes = np.concatenate([cat_codes, delta.cat_codes[appended]])
+            price = np.concatenate([price, delta.price[appended]])
+            scores = np.concatenate([scores, delta.scores[appended]])
+            flags = np.concatenate([flags, delta.flags[appended]])
+            codes = {f: np.concatenate([c, delta.codes[f][appended]]) for f, c in codes.items()}
+        postings = {kind: self._patched_postings(kind, {i: delta.row_terms[kind][j] for i, j in changed.items()})
+                    for kind in self._postings}
+        return CatalogSnapshot(refs, delta.categories, cat_codes, price, scores, flags, row_terms, postings,
+                               vocab=delta.vocab, codes=codes)
+
+    def _patched_postings(self, kind: str, changed: Dict[int, Tuple[str, ...]]) -> Dict[str, np.ndarray]:
+        postings = dict(self._postings[kind])
+        positions = np.array(sorted(changed), dtype=np.int32)
+        affected = set()
+        for i, values in changed.items():
+            if i < len(self.refs):
+                affected.update(self.row_terms[kind][i])
+            affected.update(values)
+        for term in affected:
+            rows = postings.get(term, _NO_ROWS)
+            rows = rows[~np.isin(rows, positions)]
+            added = [i for i, values in changed.items() if term in values]
+            rows = np.union1d(rows, np.array(added, dtype=np.int32)).astype(np.int32)
+            if len(rows):
+                postings[term] = rows
+            else:
+                postings.pop(term, None)
+        return postings
+
+    def profile_scores(self, profile) -> np.ndarray:
+        """Totals under a WeightProfile: the stored total_score when every row was written with its
+        version (see services.writes), otherwise computed from the score columns."""
+        key = ("stored", profile.version)
+        stored = self._base_cache.get(key)
+        if stored is None:
+            vocab = self.vocab["score_version"]
+            code = vocab.index(profile.version) if profile.version in vocab else -1
+            stored = self._base_cache[key] = bool(len(self)) and bool(np.all(self.codes["score_version"] == code))
+        return self.totals() if stored else self.base_scores(profile.weights)
+
+    def base_scores(self, weights: dict) -> np.ndarray:
+        key = tuple(weights.items())
+        base = self._base_cache.get(key)
+        if base is None:
+            base = score_columns(self.scores, weights)
+            self._base_cache[key] = base
+        return base
+
+    def totals(self) -> np.ndarray:
+        """Stored total_score per row (NaN where NULL), built once per snapshot."""
+        totals = self._base_cache.get("totals")
+        if totals is None:
+            totals = np.array([np.nan if r.total_score is None else r.total_score for r in self.refs],
+                              dtype=np.float64)
+            self._base_cache["totals"] = totals
+        return totals
+
+    def flag_mask(self, *names: str) -> np.ndarray:
+        bits = 0
+        for name in names:
+            bits |= FLAG_BITS[name]
+        return (self.flags & bits) != 0
+
+    def postings(self, kind: str) -> Dict[str, np.ndarray]:
+        postings = self._postings.get(kind)
+        if postings is None:
+            lists: Dict[str, List[int]] = {}
+            for i, values in enumerate(self.row_terms[kind]):
+                for term in values:
+                    lists.setdefault(term, []).append(i)
+            postings = {term: np.array(rows, dtype=np.int32) for term, rows in lists.items()}
+            self._postings[kind] = postings
+        return postings
+
+    def term_rows(self, kind: str, values: Iterable[str]) -> np.ndarray:
+        """Sorted positions of rows carrying every one of `values` (already normalized)."""
+        postings = self.postings(kind)
+        lists = [postings.get(v, _NO_ROWS) for v in values]
+        if not lists:
+            return np.arange(len(self), dtype=np.int32)
+        lists.sort(key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+_lock = threading.Lock()
+_snapshot: Optional[CatalogSnapshot] = None
+_generation = 0
+
+# version() only counts writes made through this process (or, with a shared snapshot, through
+# processes that share it). Writers also bump the catalog_version row in their transaction, and
+# readers sync() against it, so writes from seed, other workers or other hosts are noticed too:
+# _db_seen is the row's value the local state reflects (with a shared snapshot, the version file
+# records it instead).
+SYNC_SECONDS = get_settings().CATALOG_SYNC_SECONDS
+_versions = CatalogVersion.__table__
+_db_seen: Optional[int] = None
+_db_checked = 0.0
+
+# With CATALOG_SNAPSHOT_PATH set, worker processes share one snapshot file (see snapshot_file):
+# <path>.version holds the generation, bumped by every write; a worker whose mapping is older
+# maps the file again, and whoever finds the file older than the version rebuilds it, under
+# <path>.lock so that only one process loads from the database.
+SHARED_PATH = get_settings().CATALOG_SNAPSHOT_PATH or None
+# (stat of <path>.version, its generation, the catalog_version it reflects)
+_version_seen: Tuple[Optional[tuple], int, Optional[int]] = (None, 0, None)
+
+def _shared_state() -> Tuple[int, Optional[int]]:
+    global _version_seen
+    try:
+        st = os.stat(SHARED_PATH + ".version")
+    except FileNotFoundError:
+        return 0, None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    seen = _version_seen
+    if seen[0] == key:
+        return seen[1], seen[2]
+    try:
+        with open(SHARED_PATH + ".version") as f:
+            parts = f.read().split()
+        state = int(parts[0]), (int(parts[1]) if len(parts) > 1 else None)
+    except (OSError, ValueError, IndexError):
+        return seen[1], seen[2]  # replaced while we read it; the next call sees the new one
+    _version_seen = (key, *state)
+    return state
+
+def _shared_generation() -> int:
+    return _shared_state()[0]
+
+@contextmanager
+def _file_lock():
+    import fcntl
+    with open(SHARED_PATH + ".lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _shared_snapshot(db: Session) -> CatalogSnapshot:
+    global _snapshot
+    from . import snapshot_file
+    generation = _shared_generation()
+    snap = _snapshot
+    if snap is not None and snap.generation == generation:
+        return snap
+    if snapshot_file.read_generation(SHARED_PATH) != generation:
+        with _file_lock():
+            generation = _shared_generation()
+            if snapshot_file.read_generation(SHARED_PATH) != generation:
+                snapshot_file.dump(CatalogSnapshot.load(db), SHARED_PATH, generation)
+    snap = snapshot_file.load(SHARED_PATH)
+    with _lock:
+        if _snapshot is None or _snapshot.generation < snap.generation:
+            _snapshot = snap
+    return snap
+
+def _shared_bump(rows: Optional[list] = None, db_versions: Sequence[int] = (), db_version: Optional[int] = None):
+    """Move the shared generation on, patching `rows` into the file when it is current. `db_versions`
+    are this process's committed bumps; `db_version` is the row's value when sync() found it moved."""
+    from . import snapshot_file
+    with _file_lock():
+        generation, seen = _shared_state()
+        if db_versions:
+            if not _continues(seen, db_versions):
+                rows = None
+            seen = max(db_versions)
+        elif db_version is not None:
+            if db_version == seen:
+                return  # another worker noticed first
+            rows, seen = None, db_version
+        if rows is not None and snapshot_file.read_generation(SHARED_PATH) == generation:
+            snapshot_file.dump(snapshot_file.load(SHARED_PATH).patched(rows), SHARED_PATH, generation + 1)
+        tmp = f"{SHARED_PATH}.version.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(f"{generation + 1} {seen}" if seen is not None else str(generation + 1))
+        os.replace(tmp, SHARED_PATH + ".version")
+
+def _continues(seen: Optional[int], db_versions: Sequence[int]) -> bool:
+    """Whether `db_versions` directly follow `seen`, i.e. no other process wrote in between."""
+    return seen is not None and sorted(db_versions) == list(range(seen + 1, seen + 1 + len(db_versions)))
+
+def _db_version(db: Session) -> Optional[int]:
+    return db.execute(select(_versions.c.version)).scalar()
+
+def bump(db: Session) -> int:
+    """Count a write to the catalog, in the writer's transaction; hand the result to refresh() or
+    invalidate() once committed."""
+    if not db.execute(update(_versions).values(version=_versions.c.version + 1)).rowcount:
+        db.execute(insert(_versions).values(id=1, version=1))  # a schema made by create_all()
+    return _db_version(db)
+
+def sync(db: Session, max_age: Optional[float] = None):
+    """Drop what this process derived from the catalog if another process wrote since, as told by
+    the catalog_version row; checked at most every `max_age` seconds (default CATALOG_SYNC_SECONDS)."""
+    global _db_seen, _db_checked, _generation, _snapshot
+    now = time.monotonic()
+    if now - _db_checked < (SYNC_SECONDS if max_age is None else max_age):
+        return
+    current = _db_version(db)
+    _db_checked = now
+    if SHARED_PATH:
+        if current != _shared_state()[1]:
+            _shared_bump(db_version=current)
+        return
+    with _lock:
+        if current != _db_seen:
+            _generation += 1
+            _snapshot = None
+            _db_seen = current
+
+def get_snapshot(db: Session) -> CatalogSnapshot:
+    global _snapshot
+    sync(db)
+    if SHARED_PATH:
+        return _shared_snapshot(db)
+    snap = _snapshot
+    if snap is not None:
+        return snap
+    generation = _generation
+    snap = CatalogSnapshot.load(db)
+    with _lock:
+        # a write that landed while we were loading wins; serve this copy but don't keep it
+        if generation == _generation and _snapshot is None:
+            _snapshot = snap
+    return snap
+
+def version() -> int:
+    """Bumped by every write that goes through invalidate()/patch(); keys derived caches."""
+    return _shared_generation() if SHARED_PATH else _generation
+
+def invalidate(db_versions: Sequence[int] = ()):
+    """Drop the snapshot; the next reader rebuilds it. Use after bulk writes, with what bump() returned."""
+    global _snapshot, _generation, _db_seen
+    if SHARED_PATH:
+        _shared_bump(db_versions=db_versions)
+        return
+    with _lock:
+        _generation += 1
+        _snapshot = None
+        if db_versions:
+            _db_seen = max(db_versions)
+
+def refresh(db: Session, tool_ids: List[str], db_versions: Sequence[int] = ()):
+    """After a committed write: patch the written rows into the live snapshot, or drop it for large writes."""
+    if not tool_ids:
+        return
+    if len(tool_ids) > PATCH_MAX_ROWS or (_snapshot is None and not SHARED_PATH):
+        invalidate(db_versions)
+        return
+    cols = [getattr(Tool, c) for c in COLUMNS + list(term_index.TERM_FIELDS)]
+    patch(db.execute(select(*cols).where(Tool.tool_id.in_(tool_ids))).all(), db_versions)
+
+def patch(rows: Iterable, db_versions: Sequence[int] = ()):
+    """Apply a handful of freshly committed rows to the live snapshot; if another process wrote
+    since it was current, drop it instead."""
+    global _snapshot, _generation, _db_seen
+    rows = list(rows)
+    if SHARED_PATH:
+        _shared_bump(rows, db_versions)
+        return
+    with _lock:
+        _generation += 1
+        if db_versions and not _continues(_db_seen, db_versions):
+            _snapshot = None
+        elif _snapshot is not None and rows:
+            _snapshot = _snapshot.patched(rows)
+        if db_versions:
+            _db_seen = max(db_versions)
@@ -0,0 +1,56 @@
+# backend/app/services/changes.py
+"""Change log behind GET /tools/changes: one entry per tool (a tombstone once deleted), replaced
+under a new, ever-growing `seq` on every write."""
+from __future__ import annotations
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from ..models import Tool, ToolChange
+
+_changes = ToolChange.__table__
+_tools = Tool.__table__
+
+class Change(NamedTuple):
+    seq: int
+    tool_id: str
+    op: str  # "created" | "updated" | "deleted", relative to the reader's `since`
+    row: Optional[tuple]  # the requested columns; None for deletes
+
+def record(db: Session, tool_ids: Iterable[str], deleted: bool = False):
+    """Log a write of `tool_ids` (in the caller's transaction); call it before touching their rows."""
+    ids = list(dict.fromkeys(tool_ids))
+    if not ids:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # seqs must become visible in order, or a reader past a later one never sees an earlier one
+        db.execute(text("LOCK TABLE tool_changes IN EXCLUSIVE MODE"))
+    prior = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for r in db.execute(select(_changes.c.tool_id, _changes.c.seq, _changes.c.created_seq, _changes.c.deleted)
+                            .where(_changes.c.tool_id.in_(chunk))):
+            prior[r.tool_id] = r
+        db.execute(delete(_changes).where(_changes.c.tool_id.in_(chunk)))
+    rows = []
+    for tool_id in ids:
+        p = prior.get(tool_id)
+        live = p is not None and not p.deleted
+        rows.append({"tool_id": tool_id, "created_seq": (p.created_seq or p.seq) if live else None, "deleted": deleted})
+    db.execute(insert(_changes), rows)
+
+def feed(db: Session, since: int, limit: int, columns: Sequence[str]) -> List[Change]:
+    """Up to `limit` entries after `since`, oldest first, with `columns` of each live tool."""
+    stmt = (select(_changes.c.seq, _changes.c.tool_id, _changes.c.created_seq, _changes.c.deleted,
+                   *[_tools.c[c] for c in columns])
+            .select_from(_changes.outerjoin(_tools, _tools.c.tool_id == _changes.c.tool_id))
+            .where(_changes.c.seq > since).order_by(_changes.c.seq).limit(limit))
+    out = []
+    for r in db.execute(stmt):
+        if r.deleted:
+            op = "deleted"
+        else:
+            op = "created" if r.created_seq is None or r.created_seq > since else "updated"
+        out.append(Change(r.seq, r.tool_id, op, None if r.deleted else tuple(r[4:])))
+    return out
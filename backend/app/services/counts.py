@@ -0,0 +1,33 @@
+# backend/app/services/counts.py
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from sqlalchemy.orm import Session
+
+from . import catalog
+
+MAX_ENTRIES = 1024
+
+_counts: "OrderedDict[Hashable, tuple[int, int]]" = OrderedDict()
+_lock = threading.Lock()
+
+def cached_count(db: Session, key: Hashable, compute: Callable[[], int]) -> int:
+    """Row count for a filter set, reused until the next catalog write from any process (LRU-bounded)."""
+    catalog.sync(db)
+    version = catalog.version()
+    with _lock:
+        hit = _counts.get(key)
+        if hit and hit[0] == version:
+            _counts.move_to_end(key)
+            return hit[1]
+    total = compute()
+    with _lock:
+        if catalog.version() != version:
+            return total  # a write landed meanwhile: don't keep a count that may predate it
+        _counts[key] = (version, total)
+        _counts.move_to_end(key)
+        while len(_counts) > MAX_ENTRIES:
+            _counts.popitem(last=False)
+    return total
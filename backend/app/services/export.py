@@ -0,0 +1,56 @@
+# backend/app/services/export.py
+from __future__ import annotations
+import csv, io, os
+from typing import Iterator, List
+
+import orjson
+from sqlalchemy import Boolean, select
+
+from ..db import SessionLocal
+from ..models import Tool
+
+TEMPLATE_CSV = os.path.join(os.path.dirname(__file__), "..", "..", "data", "ai_tools_schema_template.csv")
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+def template_columns() -> List[str]:
+    with open(TEMPLATE_CSV, newline="") as f:
+        return next(csv.reader(f))
+
+COLUMNS = template_columns()
+_BOOLEAN = {c for c in COLUMNS if isinstance(Tool.__table__.c[c].type, Boolean)}
+
+def _csv_value(column: str, value) -> str:
+    if value is None:
+        return ""
+    if column in _BOOLEAN:
+        return "true" if value else "false"  # what writes.coerce_row reads back
+    return str(value)
+
+def _csv_lines(lines) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(lines)
+    return buf.getvalue().encode()
+
+def _csv_chunk(rows) -> bytes:
+    return _csv_lines([_csv_value(c, v) for c, v in zip(COLUMNS, row)] for row in rows)
+
+def _ndjson_chunk(rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(COLUMNS, row))) + b"\n" for row in rows)
+
+def stream_catalog(fmt: str, chunk_rows: int = 1000) -> Iterator[bytes]:
+    """The whole catalog in the template's column layout, in tool_id order, one chunk per
+    `chunk_rows` rows fetched from a server-side cursor, so memory doesn't grow with the catalog.
+
+    Opens its own session: a StreamingResponse body runs after the request's session is closed.
+    """
+    encode = _csv_chunk if fmt == "csv" else _ndjson_chunk
+    db = SessionLocal()
+    try:
+        stmt = select(*[Tool.__table__.c[c] for c in COLUMNS]).order_by(Tool.tool_id)
+        result = db.execute(stmt.execution_options(yield_per=chunk_rows))
+        if fmt == "csv":
+            yield _csv_lines([COLUMNS])
+        for rows in result.partitions():
+            yield encode(rows)
+    finally:
+        db.close()
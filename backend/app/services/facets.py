@@ -0,0 +1,150 @@
+# backend/app/services/facets.py
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .catalog import FLAG_BITS, FLAG_FIELDS, CatalogSnapshot
+from ..models import Tool, ToolFacet
+
+# value facets are counted per value; flag facets count the tools with the flag set
+FACET_FIELDS = ["category", "subcategory", "pricing_model"]
+FLAG_VALUE = "true"
+MAX_MISMATCHES = 100
+
+Key = Tuple[str, str, str]  # (category, facet, value), "" standing in for NULL
+
+_facets = ToolFacet.__table__
+
+def tool_keys(values: Mapping) -> List[Key]:
+    """The tallies one tool (column → value) counts towards."""
+    cat = values.get("category") or ""
+    keys = [(cat, f, values.get(f) or "") for f in FACET_FIELDS]
+    keys += [(cat, f, FLAG_VALUE) for f in FLAG_FIELDS if values.get(f)]
+    return keys
+
+def apply(db: Session, before: Iterable[Key], after: Iterable[Key]):
+    """Move tallies from the `before` keys to the `after` keys (in the caller's transaction)."""
+    delta = Counter(after)
+    delta.subtract(before)
+    rows = [{"category": c, "facet": f, "value": v, "count": n} for (c, f, v), n in delta.items() if n]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(_facets)
+        stmt = stmt.on_conflict_do_update(index_elements=[_facets.c.category, _facets.c.facet, _facets.c.value],
+                                          set_={"count": _facets.c.count + stmt.excluded["count"]})
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        tally = db.get(ToolFacet, (row["category"], row["facet"], row["value"]))
+        if tally is None:
+            db.add(ToolFacet(**row))
+        else:
+            tally.count += row["count"]
+
+def recount(db: Session) -> Dict[Key, int]:
+    """Tallies computed from scratch with GROUP BY over the tools table."""
+    out: Dict[Key, int] = {}
+    cat = func.coalesce(Tool.category, "")
+    for f in FACET_FIELDS:
+        value = func.coalesce(getattr(Tool, f), "")
+        for c, v, n in db.execute(select(cat, value, func.count()).group_by(cat, value)):
+            out[(c, f, v)] = out.get((c, f, v), 0) + n
+    sums = [func.sum(case((getattr(Tool, f), 1), else_=0)) for f in FLAG_FIELDS]
+    for c, *ns in db.execute(select(cat, *sums).group_by(cat)):
+        for f, n in zip(FLAG_FIELDS, ns):
+            if n:
+                out[(c, f, FLAG_VALUE)] = out.get((c, f, FLAG_VALUE), 0) + int(n)
+    return out
+
+def stored(db: Session) -> Dict[Key, int]:
+    rows = db.execute(select(ToolFacet.category, ToolFacet.facet, ToolFacet.value, ToolFacet.count)
+                      .where(ToolFacet.count != 0))
+    return {(c, f, v): n for c, f, v, n in rows}
+
+def rebuild_facets(db: Session) -> int:
+    """Replace every tally with a full recount; returns the number of tallies written."""
+    counts = recount(db)
+    db.execute(delete(ToolFacet))
+    if counts:
+        db.execute(insert(ToolFacet), [{"category": c, "facet": f, "value": v, "count": n}
+                                       for (c, f, v), n in counts.items()])
+    db.commit()
+    return len(counts)
+
+def check_facets(db: Session) -> dict:
+    """Compare the tallies against a full recount."""
+    actual, tallies = recount(db), stored(db)
+    mismatches = []
+    for key in sorted(set(actual) | set(tallies)):
+        if actual.get(key, 0) != tallies.get(key, 0):
+            mismatches.append(key)
+    return {"ok": not mismatches, "tallies": len(tallies), "mismatched": len(mismatches),
+            "mismatches": [{"category": c, "facet": f, "value": v, "tally": tallies.get((c, f, v), 0),
+                            "actual": actual.get((c, f, v), 0)} for c, f, v in mismatches[:MAX_MISMATCHES]]}
+
+def ensure_facets(engine: Engine):
+    """Backfill the tallies for a catalog written before tool_facets existed."""
+    with Session(engine) as db:
+        if db.scalar(select(ToolFacet.facet).limit(1)) is None and db.scalar(select(Tool.tool_id).limit(1)):
+            rebuild_facets(db)
+
+# ---- reads ----
+
+def _summary(counts: Iterable[Tuple[str, str, int]]) -> dict:
+    values: Dict[str, List[dict]] = {f: [] for f in FACET_FIELDS}
+    flags = {f: 0 for f in FLAG_FIELDS}
+    for facet, value, n in counts:
+        if facet in values:
+            values[facet].append({"value": value or None, "count": n})
+        elif facet in flags:
+            flags[facet] += n
+    for items in values.values():
+        items.sort(key=lambda d: (-d["count"], d["value"] or ""))
+    return {"total": sum(d["count"] for d in values["category"]), "facets": values, "flags": flags}
+
+def from_tallies(db: Session, category: Optional[str] = None) -> dict:
+    """Facet counts for the whole catalog, or one category, straight from the tallies."""
+    q = (select(ToolFacet.facet, ToolFacet.value, func.sum(ToolFacet.count))
+         .where(ToolFacet.count != 0).group_by(ToolFacet.facet, ToolFacet.value))
+    if category is not None:
+        q = q.where(ToolFacet.category == category)
+    return _summary((f, v, int(n)) for f, v, n in db.execute(q) if n)
+
+def snapshot_rows(snap: CatalogSnapshot, category: Optional[str] = None, min_score: Optional[float] = None,
+                  wanted: Iterable[Tuple[str, str]] = ()) -> np.ndarray:
+    """Positions of the snapshot rows passing the /tools filters (all but q)."""
+    by_kind: Dict[str, List[str]] = {}
+    for kind, term in wanted:
+        by_kind.setdefault(kind, []).append(term)
+    rows = np.arange(len(snap), dtype=np.int32)
+    for kind, values in by_kind.items():
+        rows = np.intersect1d(rows, snap.term_rows(kind, values), assume_unique=True)
+    if category:
+        if category not in snap.categories:
+            return rows[:0]
+        rows = rows[snap.cat_codes[rows] == snap.categories.index(category)]
+    if min_score is not None:
+        rows = rows[snap.totals()[rows] >= min_score]
+    return rows
+
+def from_snapshot(snap: CatalogSnapshot, rows: np.ndarray) -> dict:
+    """Facet counts over the given snapshot rows."""
+    counts = []
+    for facet, values, codes in [("category", snap.categories, snap.cat_codes),
+                                 *[(f, snap.vocab[f], snap.codes[f]) for f in FACET_FIELDS[1:]]]:
+        tally = np.bincount(codes[rows], minlength=len(values))
+        counts.extend((facet, values[i], int(tally[i])) for i in np.flatnonzero(tally))
+    flags = snap.flags[rows]
+    counts.extend((f, FLAG_VALUE, int(np.count_nonzero(flags & FLAG_BITS[f]))) for f in FLAG_FIELDS)
+    return _summary(counts)
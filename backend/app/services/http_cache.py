@@ -0,0 +1,78 @@
+# backend/app/services/http_cache.py
+"""Serialized GET bodies with strong ETags, kept until the catalog version moves: 304s and gzip
+for GET /tools, /tools/{tool_id} and /questionnaire."""
+from __future__ import annotations
+import gzip, hashlib
+from typing import Callable, Hashable, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from .result_cache import ResultCache
+from ..config import get_settings
+
+settings = get_settings()
+CACHE_CONTROL = f"public, max-age={settings.HTTP_CACHE_MAX_AGE}" if settings.HTTP_CACHE_MAX_AGE > 0 else "no-cache"
+
+class Body:
+    """A serialized response and its strong ETag; the gzip copy is made on first use."""
+    __slots__ = ("data", "etag", "_gzipped")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.etag = '"' + hashlib.blake2b(data, digest_size=12).hexdigest() + '"'
+        self._gzipped: Optional[bytes] = None
+
+    def compressible(self) -> bool:
+        return len(self.data) >= settings.GZIP_MIN_BYTES
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.data, compresslevel=6, mtime=0)
+        return self._gzipped
+
+_cache = ResultCache(settings.HTTP_CACHE_SIZE)
+
+def json_bytes(content) -> bytes:
+    """What ORJSONResponse would send."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def request_key(request: Request, *extra: Hashable) -> tuple:
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())), *extra)
+
+def cached(key: Hashable, render: Callable[[], bytes]) -> Body:
+    """The body for `key` as of the current catalog version (catalog.sync() first when it is read from
+    the catalog); `render` runs on a miss."""
+    return _cache.get_or_compute(key, lambda: Body(render()))
+
+def _accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if coding.lower() in ("gzip", "*"):
+            try:
+                return all(float(p[2:]) > 0 for p in params if p.startswith("q="))
+            except ValueError:
+                return False
+    return False
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip() for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags or f"W/{etag}" in tags  # If-None-Match compares weakly
+
+def respond(request: Request, body: Body, media_type: str = "application/json") -> Response:
+    """`body` for this request: 304 if the client has it, gzipped if the client takes that."""
+    gz = body.compressible() and _accepts_gzip(request)
+    # each encoding is its own representation, so it gets its own strong ETag
+    etag = body.etag[:-1] + '-gzip"' if gz else body.etag
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if gz:
+        headers["Content-Encoding"] = "gzip"
+        return Response(body.gzipped(), media_type=media_type, headers=headers)
+    return Response(body.data, media_type=media_type, headers=headers)
+
+def stats() -> dict:
+    return _cache.stats()
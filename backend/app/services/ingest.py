@@ -0,0 +1,144 @@
+# backend/app/services/ingest.py
+from __future__ import annotations
+import csv, logging, os, threading, time, uuid
+from typing import Dict, List, Optional, TextIO
+from sqlalchemy.orm import Session
+
+from . import similar, writes
+from ..db import SessionLocal
+
+log = logging.getLogger(__name__)
+
+MAX_ERRORS = 100
+MAX_DIFF = 1000
+
+class IngestStats:
+    def __init__(self, dry_run: bool = False):
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rejected = 0
+        self.batches = 0
+        self.errors: List[dict] = []
+        self.diff: Optional[List[dict]] = [] if dry_run else None
+
+    def reject(self, line: int, tool_id: str, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"line": line, "tool_id": tool_id, "error": error})
+
+    def as_dict(self) -> dict:
+        out = {"created": self.created, "updated": self.updated, "unchanged": self.unchanged,
+               "rejected": self.rejected, "total_processed": self.processed, "batches": self.batches,
+               "errors": self.errors}
+        if self.diff is not None:
+            out.update(dry_run=True, diff=self.diff)
+        return out
+
+def _write_batch(db: Session, batch: Dict[str, tuple], header: List[str], stats: IngestStats, written_ids: List[str]):
+    rows = {tool_id: fields for tool_id, (_, fields) in batch.items()}
+    if stats.diff is None:
+        written = writes.write_tools(db, rows, header, neighbors=False)
+        # update_neighbors() only needs to know whether there are more than it merges one by one
+        written_ids.extend((written.created + written.updated)[:similar.UPDATE_MAX_ROWS + 1 - len(written_ids)])
+    else:
+        written = writes.diff_tools(db, rows, header)
+        created = set(written.created)
+        for tool_id, (line, _) in batch.items():
+            if len(stats.diff) >= MAX_DIFF:
+                break
+            if tool_id in created:
+                stats.diff.append({"line": line, "tool_id": tool_id, "op": "created"})
+            elif tool_id in written.diff:
+                stats.diff.append({"line": line, "tool_id": tool_id, "op": "updated", "fields": written.diff[tool_id]})
+    for tool_id, error in written.rejected.items():
+        stats.reject(batch[tool_id][0], tool_id, error)
+    stats.created += len(written.created)
+    stats.updated += len(written.updated)
+    stats.unchanged += len(written.unchanged)
+    if written.created or written.updated:
+        stats.batches += 1
+
+def ingest_csv(db: Session, stream: TextIO, batch_size: int = 1000,
+               stats: Optional[IngestStats] = None, dry_run: bool = False) -> IngestStats:
+    """Stream rows from `stream` and upsert them by tool_id, committing every `batch_size` rows.
+    With `dry_run` the stats say what would be written; pass `stats` to watch from another thread."""
+    stats = stats or IngestStats(dry_run)
+    written_ids: List[str] = []
+    reader = csv.DictReader(stream)
+    header = [c for c in (reader.fieldnames or []) if c in writes.WRITABLE]
+    batch: Dict[str, tuple] = {}
+    for r in reader:
+        stats.processed += 1
+        line = reader.line_num
+        tool_id = (r.get("tool_id") or r.get("id") or "").strip()
+        if not tool_id:
+            stats.reject(line, "", "missing tool_id")
+            continue
+        try:
+            fields = writes.coerce_row(r)
+        except ValueError as exc:
+            stats.reject(line, tool_id, str(exc))
+            continue
+        # ON CONFLICT can't touch a row twice per statement: a later line for the same id wins
+        batch[tool_id] = (line, fields)
+        if len(batch) >= batch_size:
+            _write_batch(db, batch, header, stats, written_ids)
+            batch = {}
+    if batch:
+        _write_batch(db, batch, header, stats, written_ids)
+    writes.update_neighbors(db, written_ids)
+    return stats
+
+# ---- background jobs (per process; status is lost on restart) ----
+
+class IngestJob:
+    def __init__(self, filename: str, dry_run: bool = False):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "queued"
+        self.stats = IngestStats(dry_run)
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+
+    def as_dict(self) -> dict:
+        return {"job_id": self.job_id, "filename": self.filename, "status": self.status,
+                "error": self.error, "created_at": self.created_at, "finished_at": self.finished_at,
+                **self.stats.as_dict()}
+
+_jobs: Dict[str, IngestJob] = {}
+_jobs_lock = threading.Lock()
+MAX_JOBS = 100
+
+def create_job(filename: str, dry_run: bool = False) -> IngestJob:
+    job = IngestJob(filename, dry_run)
+    with _jobs_lock:
+        _jobs[job.job_id] = job
+        for old in sorted(_jobs.values(), key=lambda j: j.created_at)[:-MAX_JOBS]:
+            _jobs.pop(old.job_id, None)
+    return job
+
+def get_job(job_id: str) -> IngestJob | None:
+    return _jobs.get(job_id)
+
+def run_job(job: IngestJob, path: str, batch_size: int):
+    """Ingest a spooled-to-disk upload in its own session; removes `path` when done."""
+    job.status = "running"
+    db = SessionLocal()
+    try:
+        with open(path, newline="", encoding="utf-8", errors="ignore") as f:
+            ingest_csv(db, f, batch_size=batch_size, stats=job.stats)
+        job.status = "done"
+    except Exception as exc:
+        log.exception("ingest job %s failed", job.job_id)
+        job.status = "failed"
+        job.error = str(exc)
+    finally:
+        job.finished_at = time.time()
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
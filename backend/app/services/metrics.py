@@ -0,0 +1,255 @@
+# backend/app/services/metrics.py
+"""In-process metrics rendered in the Prometheus text format (no client library, no collector)."""
+from __future__ import annotations
+import bisect, contextvars, math, os, threading, time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}  # labels → [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        out = self.header()
+        for labels, s in items:
+            out += _series_lines(self.name, self.labelnames, labels, self.buckets, s[:-1], s[-1])
+        return out
+
+def _series_lines(name: str, names: Tuple, values: Tuple, buckets: Tuple, counts: List[int], total: float) -> List[str]:
+    out = []
+    running = 0
+    for bound, n in zip(buckets + (math.inf,), counts):
+        running += n
+        le = 'le="%s"' % _num(bound)
+        out.append(f"{name}_bucket{_labels(names, values, le)} {running}")
+    out.append(f"{name}_sum{_labels(names, values)} {_num(total)}")
+    out.append(f"{name}_count{_labels(names, values)} {running}")
+    return out
+
+REGISTRY: List[_Metric] = []
+# callables returning ready-made exposition lines, for values owned elsewhere (pool, caches)
+COLLECTORS: List[Callable[[], List[str]]] = []
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collect in COLLECTORS:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+def gauge_lines(name: str, help: str, samples: Dict[Tuple[Tuple[str, str], ...], float], kind: str = "gauge") -> List[str]:
+    """Exposition lines for one metric; `samples` maps ((label, value), ...) → value."""
+    out = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples.items():
+        names, values = zip(*labels) if labels else ((), ())
+        out.append(f"{name}{_labels(names, values)} {_num(value)}")
+    return out
+
+def histogram_lines(name: str, help: str, buckets: Tuple[float, ...],
+                    samples: Dict[Tuple[Tuple[str, str], ...], Tuple[List[int], float]]) -> List[str]:
+    """Exposition lines for a histogram kept elsewhere; `samples` maps ((label, value), ...) →
+    (per-bucket counts with +Inf last, sum)."""
+    out = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    for labels, (counts, total) in samples.items():
+        names, values = zip(*labels) if labels else ((), ())
+        out += _series_lines(name, names, values, tuple(buckets), counts, total)
+    return out
+
+# ---- HTTP ----
+
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template.",
+                         ("method", "route", "status"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served.", ("method",))
+REQUEST_SQL_STATEMENTS = Histogram("http_request_sql_statements", "SQL statements executed per request.",
+                                   ("route",), buckets=COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram("http_request_sql_duration_seconds", "Time spent in SQL per request.", ("route",))
+
+# ---- SQL ----
+
+SQL_STATEMENTS = Counter("db_statements_total", "SQL statements executed.", ("verb",))
+SQL_LATENCY = Histogram("db_statement_duration_seconds", "SQL statement latency.", ("verb",), buckets=STAGE_BUCKETS)
+
+# ---- recommend() ----
+
+RECOMMEND_STAGE = Histogram("recommend_stage_duration_seconds", "Time per recommend() stage.", ("stage",),
+                            buckets=STAGE_BUCKETS)
+
+# ---- startup ----
+
+def _process_started() -> float:
+    """Unix time this process was started (Linux /proc); elsewhere, when this module was imported."""
+    try:
+        with open("/proc/self/stat") as f:
+            ticks = int(f.read().rsplit(")", 1)[1].split()[19])  # field 22, starttime
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+PROCESS_STARTED = _process_started()
+STARTUP = Gauge("startup_phase_seconds", "Startup phases: import (process start to lifespan), migrate, warmup.",
+                ("phase",))
+TIME_TO_FIRST_REQUEST = Gauge("startup_time_to_first_request_seconds",
+                              "Process start to the end of the first HTTP response.")
+_first_request = [True]
+
+class _SqlTally:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+# per-request SQL tally; the threadpool and run_db() both carry it over from the request's context
+_sql_tally: contextvars.ContextVar[_SqlTally | None] = contextvars.ContextVar("sql_tally", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_metrics_t0")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    SQL_STATEMENTS.inc(verb)
+    SQL_LATENCY.observe(elapsed, verb)
+    tally = _sql_tally.get()
+    if tally is not None:
+        tally.statements += 1
+        tally.seconds += elapsed
+
+def _handle_error(ctx):
+    # a failed statement never reaches after_cursor_execute; drop its start time
+    starts = ctx.connection.info.get("_metrics_t0") if ctx.connection is not None else None
+    if starts:
+        starts.pop()
+
+def instrument_engine(engine):
+    """Count and time every statement on `engine` (a sync Engine, or an AsyncEngine's .sync_engine)."""
+    from sqlalchemy import event
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+class Laps:
+    """Sequential stage timer: lap(name) records the time since the previous lap."""
+    __slots__ = ("histogram", "last")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.histogram.observe(now - self.last, stage)
+        self.last = now
+
+class MetricsMiddleware:
+    """ASGI middleware: latency per route template, in-flight gauge and per-request SQL tallies."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        tally = _SqlTally()
+        token = _sql_tally.set(tally)
+        HTTP_IN_FLIGHT.inc(method)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            HTTP_IN_FLIGHT.dec(method)
+            _sql_tally.reset(token)
+            if _first_request[0]:
+                _first_request[0] = False
+                TIME_TO_FIRST_REQUEST.set(value=time.time() - PROCESS_STARTED)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_LATENCY.observe(elapsed, method, route, status[0])
+            REQUEST_SQL_STATEMENTS.observe(tally.statements, route)
+            REQUEST_SQL_SECONDS.observe(tally.seconds, route)
@@ -0,0 +1,150 @@
+# backend/app/services/optimizer.py
+from __future__ import annotations
+import time
+from typing import List, NamedTuple
+
+import numpy as np
+
+class Solution(NamedTuple):
+    positions: List[int]  # indexes into the arrays passed in, best score first
+    objective: float
+    cost: float
+    proven: bool  # False when the time budget ran out before the search finished
+    candidates: int  # rows left after pruning
+    nodes: int
+
+def _objective(scores: np.ndarray, positions: List[int]) -> float:
+    return round(float(sum(scores[i] for i in positions)), 4)
+
+def _skylines(scores: np.ndarray, prices: np.ndarray, rows: np.ndarray, depth: int) -> np.ndarray:
+    """Rows on the first `depth` price/score skylines of `rows`.
+
+    A row off all of them is beaten (price <= and score >=) by one row of each skyline, i.e.
+    by at least `depth` others.
+    """
+    order = rows[np.lexsort((-scores[rows], prices[rows]))]  # cheapest first, best score first
+    keep = []
+    for _ in range(depth):
+        if not len(order):
+            break
+        s = scores[order]
+        running = np.maximum.accumulate(np.concatenate([[-np.inf], s[:-1]]))
+        front = s > running
+        keep.append(order[front])
+        order = order[~front]
+    return np.concatenate(keep) if keep else rows[:0]
+
+def pareto_prune(scores: np.ndarray, prices: np.ndarray, cats: np.ndarray,
+                 max_count: int, cap: int | None) -> np.ndarray:
+    """Positions that can appear in an optimal stack, ascending: rows beaten on price and score by
+    `max_count` others (or `cap` of their category) are dropped."""
+    rows = np.arange(len(scores))
+    if cap is None:
+        return np.sort(_skylines(scores, prices, rows, max_count))
+    by_cat = rows[np.argsort(cats, kind="stable")]
+    bounds = np.flatnonzero(np.diff(cats[by_cat])) + 1
+    depth = min(cap, max_count)
+    kept = [_skylines(scores, prices, group, depth) for group in np.split(by_cat, bounds)]
+    return np.sort(np.concatenate(kept)) if kept else rows[:0]
+
+def greedy_stack(scores: np.ndarray, prices: np.ndarray, cats: np.ndarray, order: np.ndarray,
+                 budget: float | None, max_count: int, cap: int | None) -> List[int]:
+    """recommend()'s greedy fill over `order`, additionally honouring the per-category cap."""
+    picked: List[int] = []
+    used: dict = {}
+    cost = 0.0
+    for i in order.tolist():
+        if len(picked) >= max_count:
+            break
+        if cap is not None and used.get(cats[i], 0) >= cap:
+            continue
+        next_cost = cost + float(prices[i])
+        if budget is None or next_cost <= budget:
+            picked.append(i)
+            used[cats[i]] = used.get(cats[i], 0) + 1
+            cost = next_cost
+    return picked
+
+def solve_stack(scores: np.ndarray, prices: np.ndarray, cats: np.ndarray, budget: float | None,
+                max_count: int, cap: int | None = None, incumbent: List[int] | None = None,
+                time_budget_ms: float = 15.0) -> Solution:
+    """Pick at most `max_count` rows, at most `cap` per category, with total price <= budget,
+    maximizing the summed score; rows scoring <= 0 are never picked. Branch and bound, exact
+    unless the time budget runs out (see Solution.proven).
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    if max_count <= 0:
+        return Solution([], 0.0, 0.0, True, 0, 0)
+    rows = pareto_prune(scores, prices, cats, max_count, cap)
+    rows = rows[scores[rows] > 0]
+    if budget is not None:
+        rows = rows[prices[rows] <= budget]
+    rows = rows[np.argsort(-scores[rows], kind="stable")]
+    s = scores[rows].astype(np.float64)
+    p = prices[rows].astype(np.float64)
+    c = cats[rows]
+    n = len(rows)
+
+    # Ignoring price, taking the best rows by score under the caps is optimal (a matroid);
+    # when that stack also fits the budget there is nothing left to search.
+    picked = greedy_stack(s, p, c, np.arange(n), None, max_count, cap)
+    cost = float(sum(float(p[i]) for i in picked))
+    if budget is None or cost <= budget:
+        positions = [int(rows[i]) for i in picked]
+        return Solution(positions, _objective(scores, positions), round(cost, 2), True, n, 0)
+
+    # suffix bounds, all O(1) per lookup
+    prefix = np.concatenate([[0.0], np.cumsum(s)])
+    free = np.flatnonzero(p <= 0)
+    free_prefix = np.concatenate([[0.0], np.cumsum(s[free])])
+    first_free = np.searchsorted(free, np.arange(n + 1))  # index into `free` of first free row >= i
+    ratio = np.where(p > 0, s / np.where(p > 0, p, 1.0), 0.0)
+    best_ratio = np.maximum.accumulate(ratio[::-1])[::-1] if n else ratio
+
+    best: List[int] = []
+    best_score = -1.0
+    incumbent = [i for i in incumbent or () if scores[i] > 0]  # dropping those only raises its sum
+    if incumbent:
+        pos_in = {int(r): k for k, r in enumerate(rows)}
+        if all(int(i) in pos_in for i in incumbent):
+            best = [pos_in[int(i)] for i in incumbent]
+            best_score = float(s[best].sum())
+    used: dict = {}
+    chosen: List[int] = []
+    nodes = 0
+    timed_out = False
+
+    def search(start: int, slots: int, cost: float, score: float):
+        nonlocal best, best_score, nodes, timed_out
+        nodes += 1
+        if score > best_score + 1e-9:
+            best, best_score = list(chosen), score
+        if slots == 0 or timed_out:
+            return
+        if nodes & 255 == 0 and time.perf_counter() > deadline:
+            timed_out = True
+            return
+        left = budget - cost
+        for j in range(start, n):
+            count_bound = prefix[min(n, j + slots)] - prefix[j]
+            f0 = first_free[j]
+            free_bound = free_prefix[min(len(free), f0 + slots)] - free_prefix[f0]
+            bound = min(count_bound, free_bound + max(left, 0.0) * best_ratio[j])
+            if score + bound <= best_score + 1e-9:
+                break  # both relaxations only shrink as j grows
+            if cost + p[j] > budget:
+                continue
+            if cap is not None and used.get(c[j], 0) >= cap:
+                continue
+            chosen.append(j)
+            used[c[j]] = used.get(c[j], 0) + 1
+            search(j + 1, slots - 1, cost + float(p[j]), score + float(s[j]))
+            used[c[j]] -= 1
+            chosen.pop()
+            if timed_out:
+                return
+
+    search(0, max_count, 0.0, 0.0)
+    positions = [int(rows[i]) for i in sorted(best)]
+    return Solution(positions, _objective(scores, positions), round(float(p[best].sum()) if best else 0.0, 2),
+                    not timed_out, n, nodes)
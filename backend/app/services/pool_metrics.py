@@ -0,0 +1,88 @@
+# backend/app/services/pool_metrics.py
+from __future__ import annotations
+import bisect, threading, time
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# checkout latency histogram bucket upper bounds, in seconds (plus +Inf)
+BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class PoolMetrics:
+    """Checkout counts and latencies for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.waits = 0  # checkouts that found no idle connection and no overflow left
+            self.timeouts = 0
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+            self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float, waited: bool, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.timeouts += timed_out
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts, "waits": self.waits, "timeouts": self.timeouts,
+                "checkout_ms_avg": round(1000 * self.total_seconds / self.checkouts, 3) if self.checkouts else None,
+                "checkout_ms_max": round(1000 * self.max_seconds, 3),
+                "checkout_ms_buckets": {("+Inf" if b == float("inf") else str(b * 1000)): n
+                                        for b, n in zip(BUCKETS + (float("inf"),), self.buckets)},
+            }
+
+    def histogram(self):
+        """(per-bucket counts, +Inf last; total seconds), for metrics.histogram_lines()."""
+        with self._lock:
+            return list(self.buckets), self.total_seconds
+
+class _TimedPool:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics  # engine.dispose() swaps the pool; the counters carry on
+        return pool
+
+    def connect(self):
+        waited = self.checkedin() == 0 and -1 < self._max_overflow <= self.overflow()
+        t0 = time.perf_counter()
+        try:
+            conn = super().connect()
+        except sa_exc.TimeoutError:
+            self.metrics.observe(time.perf_counter() - t0, waited, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - t0, waited)
+        return conn
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+def pool_stats(engine) -> dict:
+    """Counters plus live gauges for `engine`'s pool (gauges only for fixed-size pools)."""
+    pool = engine.pool
+    out = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update({"size": pool.size(), "in_use": pool.checkedout(), "idle": pool.checkedin(),
+                    "overflow": max(pool.overflow(), 0), "max_overflow": pool._max_overflow,
+                    "timeout_s": pool.timeout()})
+    if isinstance(pool, _TimedPool):
+        out.update(pool.metrics.as_dict())
+    return out
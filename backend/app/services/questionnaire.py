@@ -0,0 +1,88 @@
+# backend/app/services/questionnaire.py
+from __future__ import annotations
+import hashlib, json, logging, os, threading
+from typing import Dict, List, NamedTuple, Tuple
+
+import orjson
+
+log = logging.getLogger(__name__)
+
+QUESTIONNAIRE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "questionnaire_sample.json")
+DEFAULT_BOOST = {"first": 1.30, "step": 0.03, "floor": 1.05}
+
+class AnswerRule(NamedTuple):
+    keys: Tuple[str, ...]  # question id, then legacy aliases, first non-empty answer wins
+    categories: Dict[str, Tuple[str, ...]]  # option → categories to prefer, best first
+
+class CompiledQuestionnaire(NamedTuple):
+    version: str
+    etag: str
+    body: bytes  # the questionnaire, serialized once
+    rules: Tuple[AnswerRule, ...]
+    default_categories: Tuple[str, ...]
+    boost: Dict[str, float]
+
+    def preferred_categories(self, answers: dict) -> List[str]:
+        """Categories the answers point at, best first: mapped answers in question order, then the defaults."""
+        cats: List[str] = []
+        for rule in self.rules:
+            chosen = next((answers[k] for k in rule.keys if answers.get(k)), None) or []
+            if isinstance(chosen, str):
+                chosen = [chosen]
+            for option in chosen:
+                cats.extend(rule.categories.get(option, ()))
+        cats.extend(self.default_categories)
+        return list(dict.fromkeys(c for c in cats if c))
+
+    def boost_map(self, answers: dict) -> Dict[str, float]:
+        """category → multiplier for these answers; categories not in the map get 1.0."""
+        b = self.boost
+        return {c: max(b["floor"], b["first"] - b["step"] * i)
+                for i, c in enumerate(self.preferred_categories(answers or {}))}
+
+def compile_questionnaire(raw: bytes) -> CompiledQuestionnaire:
+    data = json.loads(raw)
+    rules = []
+    for section in data.get("sections", []):
+        for q in section.get("questions", []):
+            if q.get("category_map"):
+                rules.append(AnswerRule((q["id"], *q.get("aliases", [])),
+                                        {str(k): tuple(v) for k, v in q["category_map"].items()}))
+    body = orjson.dumps(data)
+    return CompiledQuestionnaire(
+        version=str(data.get("version", "")),
+        etag='"' + hashlib.sha1(body).hexdigest()[:16] + '"',
+        body=body,
+        rules=tuple(rules),
+        default_categories=tuple(data.get("default_categories", [])),
+        boost={**DEFAULT_BOOST, **{k: float(v) for k, v in (data.get("category_boost") or {}).items()}},
+    )
+
+EMPTY = compile_questionnaire(b'{"sections": []}')
+
+_compiled: Tuple[int, CompiledQuestionnaire] | None = None
+_lock = threading.Lock()
+
+def get_questionnaire() -> CompiledQuestionnaire:
+    """The compiled questionnaire, rebuilt only when the file's mtime changes."""
+    global _compiled
+    try:
+        mtime = os.stat(QUESTIONNAIRE_PATH).st_mtime_ns
+    except OSError:
+        return _compiled[1] if _compiled else EMPTY
+    cached = _compiled
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with _lock:
+        cached = _compiled
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(QUESTIONNAIRE_PATH, "rb") as f:
+                compiled = compile_questionnaire(f.read())
+        except Exception:
+            # half-written or malformed file: keep serving what we had
+            log.exception("could not compile %s", QUESTIONNAIRE_PATH)
+            return cached[1] if cached else EMPTY
+        _compiled = (mtime, compiled)
+        return compiled
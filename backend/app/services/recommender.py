@@ -1,46 +1,199 @@
 # backend/app/services/recommender.py
 from __future__ import annotations
-from typing import Dict, List, Tuple
+from typing import Iterator, List, NamedTuple, Tuple
+import json
+import numpy as np
 from sqlalchemy.orm import Session
 
-from ..models import Tool
-from ..utils.scoring import load_weights, score_row
-
-# Channels → categories to prioritize (not hard requirements)
-CHANNEL_CATEGORY_MAP: Dict[str, List[str]] = {
-    "SEO": ["SEO", "Copy & Content"],
-    "Paid Ads": ["Ads & Creatives", "Image & Design"],
-    "Social Organic": ["Social & Scheduling", "Image & Design", "Video Creation & Editing"],
-    "YouTube/Video": ["Video Creation & Editing", "Voice & Audio", "Image & Design"],
-    "Email": ["CRM, Outreach & Sales Ops", "Copy & Content"],
-    "Cold Outreach": ["CRM, Outreach & Sales Ops", "Automation & Agents"],
-    "Partnerships": ["CRM, Outreach & Sales Ops"],
-    # catch-alls
-    "Research": ["Research & Strategy", "Copy & Content"],
-}
-
-def _preferred_categories(answers: dict) -> List[str]:
-    cats: List[str] = []
-    channels = answers.get("channels") or answers.get("gtm_title") or []
-    if isinstance(channels, str):
-        channels = [channels]
-    for ch in channels:
-        cats.extend(CHANNEL_CATEGORY_MAP.get(ch, []))
-    # Always allow a few general categories
-    cats.extend(["Research & Strategy", "Copy & Content", "Automation & Agents"])
-    # de-dup, preserve order
-    seen = set(); ordered = []
-    for c in cats:
-        if c and c not in seen:
-            ordered.append(c); seen.add(c)
-    return ordered
-
-def _category_boost(category: str, preferred: List[str]) -> float:
-    # Early categories get a slightly higher boost
-    if category in preferred:
-        idx = preferred.index(category)
-        return max(1.05, 1.30 - 0.03 * idx)  # 1.30 → 1.05
-    return 1.0
+from . import catalog, metrics
+from .catalog import ToolRef
+from .optimizer import greedy_stack, solve_stack
+from .questionnaire import get_questionnaire
+from .result_cache import ResultCache
+from .similar import NeighborTable, get_table
+from .terms import normalize_term
+from ..config import get_settings
+from ..utils.scoring import WeightProfile, get_profile, round_array
+
+class Recommendation(NamedTuple):
+    picked: List[ToolRef]
+    alternates: List[ToolRef]
+    cost: float
+    rationale: str
+    solver: dict | None = None  # mode="optimal" only: objective, greedy gap, search stats
+    alternate_for: List[str] | None = None  # per alternate, the pick it is most similar to
+
+class SweepPoint(NamedTuple):
+    budget: float
+    picked: List[ToolRef]
+    cost: float
+    utility: float  # the picks' boosted scores, summed
+
+def _category_boosts(snap: catalog.CatalogSnapshot, answers: dict) -> np.ndarray:
+    """The questionnaire's boost for every category code of the snapshot (1.0 when not preferred)."""
+    boosts = get_questionnaire().boost_map(answers or {})
+    return np.array([boosts.get(c, 1.0) for c in snap.categories], dtype=np.float64)
+
+def _candidate_rows(snap: catalog.CatalogSnapshot, must_integrate_with: List[str],
+                    prefer_self_hostable: bool) -> np.ndarray:
+    mask = np.ones(len(snap), dtype=bool)
+
+    if prefer_self_hostable:
+        # Cheap heuristic: keep tools that expose webhooks or n8n support
+        mask &= snap.flag_mask("n8n", "webhooks")
+
+    miw = [t for t in (normalize_term(m) for m in must_integrate_with or []) if t]
+    if miw:
+        # exact integration names, all required: a posting-list intersection
+        matched = np.zeros(len(snap), dtype=bool)
+        matched[snap.term_rows("integration", miw)] = True
+        if (mask & matched).any():
+            mask &= matched  # if nothing matched, fall back to all
+
+    return np.flatnonzero(mask)
+
+def _rank(positions: np.ndarray, utility: np.ndarray, totals: np.ndarray,
+          limit: int | None = None) -> np.ndarray:
+    """`positions` by utility, then score, both descending; stable, like sorted().
+
+    With `limit`, only the head of that ranking (at least `limit` long) is returned.
+    """
+    if limit is not None and limit < len(positions):
+        u = -utility[positions]
+        kth = np.partition(u, limit - 1)[limit - 1]
+        positions = positions[u <= kth]  # the head, plus anything tied with its last entry
+    return positions[np.lexsort((-totals[positions], -utility[positions]))]
+
+def _greedy_fill(order: np.ndarray, prices: np.ndarray, budget: float | None,
+                 max_count: int) -> Tuple[List[int], float]:
+    """Walk `order`, taking each tool that still fits the budget, until max_count are picked.
+
+    Jumps straight to the next tool that fits rather than stepping through every row.
+    """
+    if budget is None:
+        picked = order[:max(max_count, 0)].tolist()
+        return picked, float(sum(float(prices[i]) for i in picked))
+    ordered = prices[order]
+    picked: List[int] = []
+    cost = 0.0
+    k = 0
+    while len(picked) < max_count:
+        fits = np.flatnonzero(cost + ordered[k:] <= budget)
+        if not len(fits):
+            break
+        k += int(fits[0])
+        picked.append(int(order[k]))
+        cost = cost + float(ordered[k])
+        k += 1
+    return picked, cost
+
+def _top_unpicked(totals: np.ndarray, picked: List[int], k: int) -> List[int]:
+    """First `k` positions of a stable descending sort of `totals`, skipping `picked`."""
+    m = len(picked) + k
+    top = np.arange(len(totals))
+    if m < len(totals):
+        kth = np.partition(-totals, m - 1)[m - 1]
+        top = np.flatnonzero(-totals <= kth)  # the m best, plus anything tied with the last
+    top = top[np.argsort(-totals[top], kind="stable")]
+    skip = set(picked)
+    return [i for i in top.tolist() if i not in skip][:k]
+
+def _alternates(snap: catalog.CatalogSnapshot, rows: np.ndarray, prices: np.ndarray, picked_pos: List[int],
+                cost: float, budget: float | None, neighbors: NeighborTable) -> Tuple[List[int], List[str]]:
+    """For each pick, its most similar candidate that isn't in the stack and could take its place
+    within the budget: a walk down the pick's precomputed neighbor list."""
+    taken = set(picked_pos)
+    out, of = [], []
+    for i in picked_pos:
+        pick = snap.refs[rows[i]].tool_id
+        for tool_id, _ in neighbors.of(pick):
+            row = snap.index.get(tool_id)
+            if row is None:
+                continue
+            j = int(np.searchsorted(rows, row))  # rows are sorted positions
+            if j == len(rows) or rows[j] != row or j in taken:
+                continue
+            if budget is not None and cost - float(prices[i]) + float(prices[j]) > budget:
+                continue
+            taken.add(j)
+            out.append(j)
+            of.append(pick)
+            break
+    return out, of
+
+def _assemble(
+    snap: catalog.CatalogSnapshot,
+    rows: np.ndarray,
+    totals: np.ndarray,
+    budget_monthly: float | None,
+    max_tool_count: int,
+    mode: str,
+    max_per_category: int | None,
+    time_budget_ms: float | None,
+    laps: metrics.Laps | None = None,
+    neighbors: NeighborTable | None = None,
+) -> Recommendation:
+    """Pick the stack from candidate `rows` given their boosted scores (`totals`, aligned with rows)."""
+    prices = snap.price[rows]
+
+    # Assemble within budget (utility-per-dollar, then raw score)
+    utility = totals / np.where(prices == 0, 1.0, prices)
+    eligible = np.arange(len(rows))
+    if budget_monthly is not None and (prices >= 0).all():
+        # a tool that alone exceeds the budget can never be added
+        eligible = eligible[prices <= budget_monthly]
+    solver = None
+    if mode == "optimal":
+        order = _rank(eligible, utility, totals)
+        # exact: best total score under budget, count and per-category cap
+        cats = snap.cat_codes[rows]
+        greedy_pos = greedy_stack(totals, prices, cats, order, budget_monthly, max_tool_count, max_per_category)
+        sol = solve_stack(totals, prices, cats, budget_monthly, max_tool_count, max_per_category,
+                          incumbent=greedy_pos,
+                          time_budget_ms=time_budget_ms or get_settings().OPTIMIZER_TIME_BUDGET_MS)
+        picked_pos = sol.positions
+        cost = float(sum(float(prices[i]) for i in picked_pos))
+        greedy_objective = round(float(sum(float(totals[i]) for i in greedy_pos)), 4)
+        solver = {
+            "objective": sol.objective,
+            "greedy_objective": greedy_objective,
+            "greedy_gap": round(sol.objective - greedy_objective, 4),
+            "greedy_gap_pct": round(100.0 * (sol.objective - greedy_objective) / sol.objective, 2) if sol.objective else 0.0,
+            "proven_optimal": sol.proven,
+            "candidates": sol.candidates,
+            "nodes": sol.nodes,
+        }
+    else:
+        # the stack usually fills from the head of the ranking: sort only that, unless it runs dry
+        order = _rank(eligible, utility, totals, limit=max(4 * max_tool_count, 32))
+        picked_pos, cost = _greedy_fill(order, prices, budget_monthly, max_tool_count)
+        if len(picked_pos) < max_tool_count and len(order) < len(eligible):
+            order = _rank(eligible, utility, totals)
+            picked_pos, cost = _greedy_fill(order, prices, budget_monthly, max_tool_count)
+
+    if not picked_pos:
+        # If budget prevented everything, pick the single best free/cheapest tool
+        i = int(np.lexsort((prices, -totals))[0])
+        picked_pos = [i]
+        cost = float(prices[i])
+
+    if laps:
+        laps.lap("assemble")
+
+    # 5) Alternates = each pick's closest similar tool; top-scoring not picked (2) without neighbor lists
+    picked = [snap.refs[rows[i]] for i in picked_pos]
+    alternate_pos, alternate_for = _alternates(snap, rows, prices, picked_pos, cost, budget_monthly,
+                                               neighbors) if neighbors else ([], None)
+    if not alternate_pos:
+        alternate_pos, alternate_for = _top_unpicked(totals, picked_pos, 2), None
+    alternates = [snap.refs[rows[i]] for i in alternate_pos]
+    if mode == "optimal":
+        rationale = "Highest total weighted utility (with category boosts) that fits the budget and tool count."
+    else:
+        rationale = "Ranked by weighted utility with category boosts and budget-awareness."
+    if laps:
+        laps.lap("alternates")
+    return Recommendation(picked, alternates, round(cost, 2), rationale, solver, alternate_for)
 
 def recommend(
     db: Session,
@@ -48,63 +201,158 @@ def recommend(
     budget_monthly: float | None,
     must_integrate_with: List[str],
     prefer_self_hostable: bool,
-    max_tool_count: int = 8
-) -> Tuple[List[Tool], List[Tool], float, str]:
+    max_tool_count: int = 8,
+    profile: WeightProfile | None = None,
+    mode: str = "greedy",
+    max_per_category: int | None = None,
+    time_budget_ms: float | None = None,
+    snapshot: catalog.CatalogSnapshot | None = None,
+    neighbors: NeighborTable | None = None,
+) -> Recommendation:
 
-    weights = load_weights()  # uses backend/data/scoring_weights_default.json
+    profile = profile or get_profile()  # backend/data/scoring_weights_<profile>.json
+    laps = metrics.Laps(metrics.RECOMMEND_STAGE)
 
-    # 1) START from all tools
-    q = db.query(Tool)
+    # 1) START from the in-memory catalog snapshot
+    snap = snapshot if snapshot is not None else catalog.get_snapshot(db)
+    neighbors = neighbors if neighbors is not None else get_table(db)
+    laps.lap("load")
 
     # 2) Hard filters
-    if prefer_self_hostable:
-        # Cheap heuristic: keep tools that expose webhooks or n8n support
-        q = q.filter((Tool.n8n == True) | (Tool.webhooks == True))  # noqa: E712
+    rows = _candidate_rows(snap, must_integrate_with, prefer_self_hostable)
+    laps.lap("filter")
+    if not len(rows):
+        return Recommendation([], [], 0.0, "No tools matched the constraints.")
 
-    tools = q.all()
+    # 3) Compute scores with category boosts
+    boosts = _category_boosts(snap, answers)
+    totals = round_array(snap.profile_scores(profile)[rows] * boosts[snap.cat_codes[rows]], 4)
+    laps.lap("score")
 
-    if must_integrate_with:
-        miw = [m.lower() for m in must_integrate_with if m]
-        filtered = []
-        for t in tools:
-            blob = (t.integrations_csv or "").lower()
-            if any(m in blob for m in miw):
-                filtered.append(t)
-        tools = filtered or tools  # if nothing matched, fall back to all
+    # 4) + 5) Stack and alternates
+    return _assemble(snap, rows, totals, budget_monthly, max_tool_count, mode, max_per_category, time_budget_ms,
+                     laps, neighbors)
 
-    if not tools:
-        return [], [], 0.0, "No tools matched the constraints."
+def recommend_batch(snap: catalog.CatalogSnapshot, requests: List[dict], chunk_size: int = 64,
+                    neighbors: NeighborTable | None = None) -> Iterator[Recommendation]:
+    """recommend() for many requests (dicts of its keyword arguments, minus db) over one snapshot,
+    scored a chunk at a time in one array expression."""
+    for start in range(0, len(requests), chunk_size):
+        chunk = requests[start:start + chunk_size]
+        boosts = np.stack([_category_boosts(snap, r.get("answers")) for r in chunk])  # requests × categories
+        base = np.stack([snap.profile_scores(r.get("profile") or get_profile()) for r in chunk])
+        totals = round_array(base * boosts[:, snap.cat_codes], 4)  # requests × tools
+        for i, r in enumerate(chunk):
+            rows = _candidate_rows(snap, r.get("must_integrate_with") or [], bool(r.get("prefer_self_hostable")))
+            if not len(rows):
+                yield Recommendation([], [], 0.0, "No tools matched the constraints.")
+                continue
+            yield _assemble(snap, rows, totals[i, rows], r.get("budget_monthly"), r.get("max_tool_count", 8),
+                            r.get("mode", "greedy"), r.get("max_per_category"), r.get("time_budget_ms"),
+                            neighbors=neighbors)
 
-    # 3) Compute scores with category boosts
-    preferred = _preferred_categories(answers or {})
-    scored: List[tuple[float, float, Tool]] = []
-    for t in tools:
-        base = score_row(t, weights)  # uses numeric fields already on row
-        boost = _category_boost(t.category or "", preferred)
-        total = round(base * boost, 4)
-        price = float(t.price_low_usd or 0.0)
-        scored.append((total, price, t))
-
-    # 4) Assemble within budget (utility-per-dollar, then raw score)
-    picked: List[Tool] = []
-    cost = 0.0
-    for total, price, t in sorted(scored, key=lambda x: (-(x[0] / (x[1] or 1.0)), -x[0])):
-        if len(picked) >= max_tool_count:
-            break
-        next_cost = cost + (price or 0.0)
-        if (budget_monthly is None) or (next_cost <= budget_monthly):
-            picked.append(t)
-            cost = next_cost
+def sweep(
+    db: Session,
+    budgets: List[float],
+    answers: dict,
+    must_integrate_with: List[str],
+    prefer_self_hostable: bool,
+    max_tool_count: int = 8,
+    profile: WeightProfile | None = None,
+    snapshot: catalog.CatalogSnapshot | None = None,
+) -> List[SweepPoint]:
+    """The greedy recommend() stack at each of `budgets`, from one load, one scoring pass and one sort."""
+    profile = profile or get_profile()
+    snap = snapshot if snapshot is not None else catalog.get_snapshot(db)
+    rows = _candidate_rows(snap, must_integrate_with, prefer_self_hostable)
+    if not len(rows):
+        return [SweepPoint(b, [], 0.0, 0.0) for b in budgets]
+    boosts = _category_boosts(snap, answers)
+    totals = round_array(snap.profile_scores(profile)[rows] * boosts[snap.cat_codes[rows]], 4)
+    prices = snap.price[rows]
+    utility = totals / np.where(prices == 0, 1.0, prices)
+    positions = np.arange(len(rows))
+    limit = max(4 * max_tool_count, 32)
+    order = _rank(positions, utility, totals, limit=limit)
+    out = []
+    for budget in budgets:
+        picked_pos, cost = _greedy_fill(order, prices, budget, max_tool_count)
+        while len(picked_pos) < max_tool_count and len(order) < len(rows):
+            # the walk ran off the ranked head: rank further (kept for the budgets that follow)
+            limit *= 8
+            order = _rank(positions, utility, totals, limit=limit)
+            picked_pos, cost = _greedy_fill(order, prices, budget, max_tool_count)
+        if not picked_pos:
+            # as in _assemble: the best tool, cheapest among equals
+            best = np.flatnonzero(totals == totals.max())
+            i = int(best[np.argmin(prices[best])])
+            picked_pos, cost = [i], float(prices[i])
+        out.append(SweepPoint(budget, [snap.refs[rows[i]] for i in picked_pos], round(cost, 2),
+                              round(float(sum(float(totals[i]) for i in picked_pos)), 4)))
+    return out
 
-    if not picked:
-        # If budget prevented everything, pick the single best free/cheapest tool
-        t = sorted(scored, key=lambda x: (-x[0], x[1]))[0][2]
-        picked = [t]
-        cost = float(t.price_low_usd or 0.0)
+_cache = ResultCache(get_settings().RECOMMEND_CACHE_SIZE)
 
-    # 5) Alternates = top-scoring not picked (2)
-    picked_ids = {p.tool_id for p in picked}
-    alternates = [t for _, __, t in sorted(scored, key=lambda x: -x[0]) if t.tool_id not in picked_ids][:2]
+def request_key(
+    answers: dict,
+    budget_monthly: float | None,
+    must_integrate_with: List[str],
+    prefer_self_hostable: bool,
+    max_tool_count: int,
+    profile: WeightProfile,
+    mode: str = "greedy",
+    max_per_category: int | None = None,
+    time_budget_ms: float | None = None,
+) -> str:
+    """Canonical form of a request: equal keys always produce the same recommendation."""
+    miw = sorted({t for t in (normalize_term(m) for m in must_integrate_with or []) if t})
+    return json.dumps({
+        "answers": answers or {},  # list order matters (it ranks preferred categories), key order doesn't
+        "budget_monthly": None if budget_monthly is None else float(budget_monthly),
+        "must_integrate_with": miw,
+        "prefer_self_hostable": bool(prefer_self_hostable),
+        "max_tool_count": int(max_tool_count),
+        "weights_version": profile.version,
+        "questionnaire": get_questionnaire().etag,  # category boosts come from it
+        "mode": mode,
+        "max_per_category": max_per_category,
+        "time_budget_ms": time_budget_ms,
+    }, sort_keys=True, separators=(",", ":"), default=str)
+
+class Inputs(NamedTuple):
+    """What recommend_cached() reads from the database, loaded in one go by load_inputs()."""
+    version: int
+    snapshot: catalog.CatalogSnapshot
+    neighbors: NeighborTable
+
+def load_inputs(db: Session) -> Inputs:
+    # the version is taken first (after noticing other processes' writes) so stale inputs aren't cached
+    catalog.sync(db)
+    version = catalog.version()
+    return Inputs(version, catalog.get_snapshot(db), get_table(db))
+
+def recommend_cached(
+    inputs: Inputs,
+    answers: dict,
+    budget_monthly: float | None,
+    must_integrate_with: List[str],
+    prefer_self_hostable: bool,
+    max_tool_count: int = 8,
+    profile: WeightProfile | None = None,
+    mode: str = "greedy",
+    max_per_category: int | None = None,
+    time_budget_ms: float | None = None,
+) -> Recommendation:
+    """recommend() behind the result cache, from load_inputs(); callers must not mutate the returned lists."""
+    profile = profile or get_profile()
+    key = request_key(answers, budget_monthly, must_integrate_with, prefer_self_hostable, max_tool_count, profile,
+                      mode, max_per_category, time_budget_ms)
+    return _cache.get_or_compute(key, lambda: recommend(
+        db=None, answers=answers, budget_monthly=budget_monthly, must_integrate_with=must_integrate_with,
+        prefer_self_hostable=prefer_self_hostable, max_tool_count=max_tool_count, profile=profile,
+        mode=mode, max_per_category=max_per_category, time_budget_ms=time_budget_ms, snapshot=inputs.snapshot,
+        neighbors=inputs.neighbors,
+    ), inputs.version)
 
-    rationale = "Ranked by weighted utility with category boosts and budget-awareness."
-    return picked, alternates, round(cost, 2), rationale
+def cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,65 @@
+# backend/app/services/reindex.py
+from __future__ import annotations
+import numpy as np
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+from . import catalog, changes
+from .facets import rebuild_facets
+from .similar import rebuild_neighbors
+from .terms import rebuild_terms
+from ..models import Tool
+from ..utils.scoring import SCORE_FIELDS, WeightProfile, get_profile, score_columns
+
+_tools = Tool.__table__
+
+def reindex_scores(db: Session, profile: WeightProfile | None = None, batch_size: int = 1000) -> dict:
+    """Recompute Tool.total_score for the whole catalog, one UPDATE and commit per batch of changed rows."""
+    profile = profile or get_profile()
+    cols = [_tools.c.tool_id, *[_tools.c[k] for k in SCORE_FIELDS], _tools.c.total_score, _tools.c.score_version]
+    last_id = None
+    updated = 0
+    unchanged = 0
+    batches = 0
+    versions = []
+    while True:
+        q = select(*cols).order_by(_tools.c.tool_id).limit(batch_size)
+        if last_id is not None:
+            q = q.where(_tools.c.tool_id > last_id)
+        rows = db.execute(q).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        scores = np.array([[float(v or 0) for v in r[1:1 + len(SCORE_FIELDS)]] for r in rows], dtype=np.float64)
+        totals = {r.tool_id: float(t) for r, t in zip(rows, score_columns(scores, profile.weights))
+                  if r.total_score != float(t) or r.score_version != profile.version}
+        unchanged += len(rows) - len(totals)
+        if not totals:
+            continue
+        changes.record(db, list(totals))
+        db.execute(
+            update(_tools)
+            .where(_tools.c.tool_id.in_(list(totals)))
+            # a rescore is not a re-verification: keep last_verified_at out of onupdate
+            .values(total_score=case(totals, value=_tools.c.tool_id), score_version=profile.version,
+                    last_verified_at=_tools.c.last_verified_at)
+        )
+        versions.append(catalog.bump(db))
+        db.commit()
+        updated += len(totals)
+        batches += 1
+    if versions:
+        catalog.invalidate(versions)
+    return {"updated": updated, "unchanged": unchanged, "batches": batches, "weights_version": profile.version}
+
+def reindex_catalog(db: Session, profile: WeightProfile | None = None, batch_size: int = 1000) -> dict:
+    """Full rebuild of everything derived from the tools table: scores, term index, facet tallies and
+    similar-tool lists."""
+    out = reindex_scores(db, profile, batch_size=batch_size)
+    out["terms"] = rebuild_terms(db, batch_size=batch_size)
+    out["facets"] = rebuild_facets(db)
+    out["neighbors"] = rebuild_neighbors(db)
+    version = catalog.bump(db)  # the terms the snapshot carries were rebuilt too
+    db.commit()
+    catalog.invalidate([version])
+    return out
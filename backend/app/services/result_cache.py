@@ -0,0 +1,86 @@
+# backend/app/services/result_cache.py
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from . import catalog
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+class ResultCache:
+    """LRU of computed results, dropped when catalog.version() moves; concurrent misses for a key
+    share one computation."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._version = catalog.version()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], version: Optional[int] = None) -> Any:
+        """`version` is the catalog version `compute`'s inputs were read at, when they were read
+        beforehand; a result older than the current version is computed but not cached."""
+        current = catalog.version()
+        if version is None:
+            version = current
+        elif version != current:
+            with self._lock:
+                self.misses += 1
+            return compute()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = compute()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # a write that landed mid-computation makes this result stale: serve it, don't keep it
+                if flight.error is None and self.max_size > 0 and catalog.version() == version == self._version:
+                    self._entries[key] = flight.result
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+            flight.event.set()
+        return flight.result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits,
+                    "misses": self.misses, "coalesced": self.coalesced,
+                    "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                    "catalog_version": self._version}
@@ -0,0 +1,119 @@
+# backend/app/services/search.py
+from __future__ import annotations
+import logging, re
+from typing import List, Tuple
+from sqlalchemy import Float, Integer, func, literal_column, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from ..models import Tool
+
+log = logging.getLogger(__name__)
+
+# Set by ensure_search_index(); until then (or on other dialects) q falls back to ILIKE.
+_backend: str | None = None
+_trigram = False
+
+# SQLite: external-content FTS5 table over tools, kept in sync by triggers so every write
+# path (ORM, Core bulk statements, raw SQL) updates it without application code. It is keyed on
+# the implicit rowid (tools has a String primary key), which VACUUM may renumber: startup
+# rebuilds it, so restart the service after a VACUUM.
+_SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tools_fts USING fts5(
+        name, description_short, description_long, tags_csv,
+        content='tools', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS tools_fts_ai AFTER INSERT ON tools BEGIN
+        INSERT INTO tools_fts(rowid, name, description_short, description_long, tags_csv)
+        VALUES (new.rowid, new.name, new.description_short, new.description_long, new.tags_csv);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tools_fts_ad AFTER DELETE ON tools BEGIN
+        INSERT INTO tools_fts(tools_fts, rowid, name, description_short, description_long, tags_csv)
+        VALUES ('delete', old.rowid, old.name, old.description_short, old.description_long, old.tags_csv);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tools_fts_au
+    AFTER UPDATE OF name, description_short, description_long, tags_csv ON tools BEGIN
+        INSERT INTO tools_fts(tools_fts, rowid, name, description_short, description_long, tags_csv)
+        VALUES ('delete', old.rowid, old.name, old.description_short, old.description_long, old.tags_csv);
+        INSERT INTO tools_fts(rowid, name, description_short, description_long, tags_csv)
+        VALUES (new.rowid, new.name, new.description_short, new.description_long, new.tags_csv);
+    END""",
+]
+
+# Postgres: a stored generated tsvector (maintained by the database on every write) + GIN.
+_PG_DDL = [
+    """ALTER TABLE tools ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description_short, '')), 'B') ||
+        setweight(to_tsvector('english', replace(coalesce(tags_csv, ''), ',', ' ')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description_long, '')), 'C')) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_tools_search_vector ON tools USING gin (search_vector)",
+]
+_PG_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_tools_name_trgm ON tools USING gin (name gin_trgm_ops)",
+]
+
+def ensure_search_index(engine: Engine):
+    global _backend, _trigram
+    dialect = engine.dialect.name
+    try:
+        if dialect == "sqlite":
+            with engine.begin() as conn:
+                for ddl in _SQLITE_DDL:
+                    conn.exec_driver_sql(ddl)
+                # also fills a new index, and re-keys one a VACUUM left pointing at old rowids
+                conn.exec_driver_sql("INSERT INTO tools_fts(tools_fts) VALUES ('rebuild')")
+            _backend = "fts5"
+        elif dialect == "postgresql":
+            with engine.begin() as conn:
+                for ddl in _PG_DDL:
+                    conn.exec_driver_sql(ddl)
+            _backend = "tsvector"
+            try:
+                with engine.begin() as conn:
+                    for ddl in _PG_TRGM_DDL:
+                        conn.exec_driver_sql(ddl)
+                _trigram = True
+            except Exception:
+                log.warning("pg_trgm unavailable; typo-tolerant name search disabled")
+    except Exception:
+        log.exception("full-text index unavailable; /tools?q= falls back to ILIKE")
+        _backend = None
+
+def _tokens(q: str) -> List[str]:
+    return re.findall(r"\w+", q.lower())
+
+def ilike_filter(query: Query, q: str) -> Query:
+    like = f"%{q.lower()}%"
+    return query.filter(Tool.name.ilike(like) | Tool.description_short.ilike(like))
+
+def apply_search(query: Query, q: str) -> Tuple[Query, list]:
+    """Restrict a Tool query to matches for `q`; returns (query, order_by clauses, best first).
+
+    Every word must match (as a prefix, so partially typed words work); on Postgres with
+    pg_trgm a name within trigram distance also matches, to absorb typos.
+    """
+    tokens = _tokens(q)
+    if _backend == "fts5" and tokens:
+        match = " ".join(f'"{t}"*' for t in tokens)
+        # bm25 column weights: name, description_short, description_long, tags_csv
+        fts = (
+            text("SELECT rowid AS rid, bm25(tools_fts, 10.0, 4.0, 1.0, 6.0) AS rank "
+                 "FROM tools_fts WHERE tools_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(rid=Integer, rank=Float)
+            .subquery("fts")
+        )
+        query = query.join(fts, fts.c.rid == literal_column("tools.rowid"))
+        return query, [fts.c.rank.asc()]  # bm25: lower is better
+    if _backend == "tsvector" and tokens:
+        tsq = func.to_tsquery("english", " & ".join(f"{t}:*" for t in tokens))
+        vector = literal_column("tools.search_vector")
+        cond = vector.op("@@")(tsq)
+        rank = func.ts_rank_cd(vector, tsq)
+        if _trigram:
+            cond = cond | Tool.name.op("%")(q)
+            rank = rank + func.similarity(Tool.name, q)
+        return query.filter(cond), [rank.desc()]
+    return ilike_filter(query, q), []
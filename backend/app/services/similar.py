@@ -0,0 +1,385 @@
+# backend/app/services/similar.py
+"""Top-k similar tools, precomputed into tool_neighbors and kept current by the write pipeline.
+
+Similarity is a WEIGHTS-weighted sum of score closeness, same category, tag/integration cosine and
+description TF-IDF cosine, over feature-hashed vectors.
+"""
+from __future__ import annotations
+import re, threading, zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import catalog
+from .terms import split_terms
+from ..models import Tool, ToolNeighbor
+from ..utils.scoring import SCORE_FIELDS
+
+K = 10  # neighbors stored per tool
+WEIGHTS = {"scores": 0.2, "category": 0.3, "terms": 0.25, "text": 0.25}
+TERM_DIM = 64
+TEXT_DIM = 256
+BLOCK_CELLS = 1 << 22  # similarities per matrix product (32 MB), so memory stays flat as the catalog grows
+UPDATE_MAX_ROWS = catalog.PATCH_MAX_ROWS  # written tools update() takes; larger writes rebuild instead
+STOPWORDS = frozenset("a an and are as at be by for from in is it its of on or that the this to with you your".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_COLUMNS = [Tool.tool_id, Tool.category, *[getattr(Tool, k) for k in SCORE_FIELDS], Tool.tags_csv,
+            Tool.integrations_csv, Tool.description_short, Tool.description_long]
+_neighbors = ToolNeighbor.__table__
+
+def _bucket(token: str, dim: int) -> int:
+    return zlib.crc32(token.encode()) % dim  # stable across processes, unlike hash()
+
+def _features(rows: Sequence, buckets: Dict[str, int]) -> tuple:
+    """(ids, categories, term bits, log term frequencies of the text, raw scores) of `rows`;
+    `buckets` caches each word's text bucket (-1 for ignored words) across calls."""
+    n = len(rows)
+    terms = np.zeros((n, TERM_DIM), dtype=np.float32)
+    scores = np.empty((n, len(SCORE_FIELDS)), dtype=np.float32)
+    flat: List[int] = []  # row * TEXT_DIM + bucket, one per word
+    for i, r in enumerate(rows):
+        for kind, field in (("tag", r.tags_csv), ("integration", r.integrations_csv)):
+            for term in split_terms(field):
+                terms[i, _bucket(f"{kind}:{term}", TERM_DIM)] = 1.0
+        base = i * TEXT_DIM
+        for w in _TOKEN.findall(f"{r.description_short or ''} {r.description_long or ''}".lower()):
+            b = buckets.get(w)
+            if b is None:
+                b = buckets[w] = -1 if len(w) < 2 or w in STOPWORDS else _bucket(w, TEXT_DIM)
+            if b >= 0:
+                flat.append(base + b)
+        scores[i] = [float(getattr(r, k) or 0) for k in SCORE_FIELDS]
+    tf = np.bincount(np.array(flat, dtype=np.int64), minlength=n * TEXT_DIM).reshape(n, TEXT_DIM)
+    text = np.where(tf > 0, 1.0 + np.log(np.maximum(tf, 1)), 0.0).astype(np.float32)
+    return [r.tool_id for r in rows], [r.category or "" for r in rows], terms, text, scores
+
+def _unit_rows(m: np.ndarray):
+    """Scale the rows of `m` to unit length, in place."""
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    m /= np.where(norms == 0, 1.0, norms)
+
+class Vectors:
+    """Per-tool feature rows; sims() of two rows is their similarity.
+
+    Rows are [terms, text, scores] scaled so that a dot product gives the terms, text and the
+    cross part of the scores term; `sq` holds the rest of the scores term and `cats` the category.
+    """
+
+    def __init__(self, ids: List[str], matrix: np.ndarray, sq: np.ndarray, cats: List[str], idf: np.ndarray):
+        self.ids = ids
+        self.index = {t: i for i, t in enumerate(ids)}
+        self.matrix = matrix
+        self.sq = sq
+        self.cats = cats
+        self.idf = idf
+        vocab = {c: i for i, c in enumerate(dict.fromkeys(c for c in cats if c))}
+        self.cat_codes = np.array([vocab.get(c, -1) for c in cats], dtype=np.int32)
+        self._vocab = vocab
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence, idf: Optional[np.ndarray] = None) -> "Vectors":
+        """Feature rows for `rows` (tool_id, category, scores, lists, descriptions); the IDF is
+        taken from these rows unless given."""
+        return cls._from_features(*_features(rows, {}), idf)
+
+    @classmethod
+    def _from_features(cls, ids: List[str], cats: List[str], terms: np.ndarray, text: np.ndarray,
+                       scores: np.ndarray, idf: Optional[np.ndarray]) -> "Vectors":
+        n = len(ids)
+        if idf is None:
+            df = np.count_nonzero(text, axis=0)
+            idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        scores = np.clip(scores / 5.0, 0.0, 1.0)
+        w = WEIGHTS["scores"] / len(SCORE_FIELDS)
+        # filled in place, part by part: temporaries the size of the catalog would double the peak
+        matrix = np.empty((n, TERM_DIM + TEXT_DIM + len(SCORE_FIELDS)), dtype=np.float32)
+        term_part, text_part = matrix[:, :TERM_DIM], matrix[:, TERM_DIM:TERM_DIM + TEXT_DIM]
+        np.copyto(term_part, terms)
+        _unit_rows(term_part)
+        term_part *= np.sqrt(WEIGHTS["terms"])
+        np.multiply(text, idf, out=text_part)
+        _unit_rows(text_part)
+        text_part *= np.sqrt(WEIGHTS["text"])
+        np.multiply(scores, np.sqrt(2 * w), out=matrix[:, TERM_DIM + TEXT_DIM:])
+        return cls(ids, matrix, w * np.einsum("ij,ij->i", scores, scores), cats, idf)
+
+    @classmethod
+    def load(cls, db: Session, chunk_rows: int = 2000) -> "Vectors":
+        """Every tool's features, read through a server-side cursor a chunk at a time, so only the
+        feature arrays (not the descriptions) are held for the whole catalog."""
+        result = db.execute(select(*_COLUMNS).order_by(Tool.tool_id).execution_options(yield_per=chunk_rows))
+        buckets: Dict[str, int] = {}
+        parts = [_features(rows, buckets) for rows in result.partitions()]
+        if not parts:
+            return cls.from_rows([])
+        return cls._from_features([i for p in parts for i in p[0]], [c for p in parts for c in p[1]],
+                                  *[np.concatenate([p[k] for p in parts]) for k in (2, 3, 4)], None)
+
+    def sims(self, matrix: np.ndarray, sq: np.ndarray, cats: Iterable[str]) -> np.ndarray:
+        """Similarity of each given feature row (len(sq) × D) to every row here."""
+        codes = np.array([self._vocab.get(c, -2) if c else -2 for c in cats], dtype=np.int32)
+        out = matrix @ self.matrix.T
+        out -= sq[:, None]
+        out -= self.sq[None, :]
+        out += WEIGHTS["scores"]
+        np.add(out, WEIGHTS["category"], out=out, where=codes[:, None] == self.cat_codes[None, :])
+        return out
+
+    def sims_of(self, positions: np.ndarray) -> np.ndarray:
+        """sims() for rows of this matrix, with each row's own entry set to -inf."""
+        out = self.sims(self.matrix[positions], self.sq[positions], [self.cats[i] for i in positions])
+        out[np.arange(len(positions)), positions] = -np.inf
+        return out
+
+    def patched(self, other: "Vectors") -> "Vectors":
+        """Copy with the rows of `other` (computed with this IDF) updated in place or appended."""
+        ids, cats = list(self.ids), list(self.cats)
+        matrix, sq = self.matrix.copy(), self.sq.copy()
+        appended = []
+        for j, tool_id in enumerate(other.ids):
+            i = self.index.get(tool_id)
+            if i is None:
+                appended.append(j)
+                continue
+            matrix[i], sq[i], cats[i] = other.matrix[j], other.sq[j], other.cats[j]
+        if appended:
+            ids.extend(other.ids[j] for j in appended)
+            cats.extend(other.cats[j] for j in appended)
+            matrix = np.vstack([matrix, other.matrix[appended]])
+            sq = np.concatenate([sq, other.sq[appended]])
+        return Vectors(ids, matrix, sq, cats, self.idf)
+
+    def without(self, tool_ids: Iterable[str]) -> "Vectors":
+        drop = set(tool_ids)
+        keep = [i for i, t in enumerate(self.ids) if t not in drop]
+        return Vectors([self.ids[i] for i in keep], self.matrix[keep], self.sq[keep], [self.cats[i] for i in keep],
+                       self.idf)
+
+def _top(sims: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per row of `sims`: positions and scores of its best K entries, best first."""
+    k = min(K, sims.shape[1] - 1)
+    if k <= 0:
+        return np.empty((len(sims), 0), dtype=np.int64), np.empty((len(sims), 0), dtype=sims.dtype)
+    part = np.argpartition(sims, -k, axis=1)[:, -k:]
+    scores = np.take_along_axis(sims, part, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+def _blocks(positions: Sequence[int], n: int) -> Iterable[np.ndarray]:
+    """`positions` in chunks whose similarity matrix against `n` tools stays within BLOCK_CELLS."""
+    size = max(1, BLOCK_CELLS // max(n, 1))
+    for start in range(0, len(positions), size):
+        yield np.asarray(positions[start:start + size])
+
+def _rows(owner: str, entries: Iterable[Tuple[str, float]]) -> List[dict]:
+    return [{"tool_id": owner, "rank": r, "neighbor_id": n, "score": round(float(s), 4)}
+            for r, (n, s) in enumerate(entries)]
+
+class NeighborTable:
+    """tool_neighbors in memory: tool_id → [(neighbor_id, score), ...], best first."""
+
+    def __init__(self, lists: Dict[str, Tuple[Tuple[str, float], ...]], version: int):
+        self.lists = lists
+        self.version = version
+
+    def __len__(self):
+        return len(self.lists)
+
+    def of(self, tool_id: str) -> Tuple[Tuple[str, float], ...]:
+        return self.lists.get(tool_id, ())
+
+    @classmethod
+    def load(cls, db: Session, version: int, tool_ids: Optional[List[str]] = None) -> "NeighborTable":
+        q = select(ToolNeighbor.tool_id, ToolNeighbor.neighbor_id, ToolNeighbor.score)
+        lists: Dict[str, list] = {t: [] for t in tool_ids or ()}
+        chunks = [tool_ids[i:i + 500] for i in range(0, len(tool_ids), 500)] if tool_ids is not None else [None]
+        for chunk in chunks:
+            stmt = q if chunk is None else q.where(ToolNeighbor.tool_id.in_(chunk))
+            for owner, neighbor, score in db.execute(stmt.order_by(ToolNeighbor.tool_id, ToolNeighbor.rank)):
+                lists.setdefault(owner, []).append((neighbor, score))
+        return cls({t: tuple(v) for t, v in lists.items()}, version)
+
+    def patched(self, other: "NeighborTable", version: int) -> "NeighborTable":
+        lists = dict(self.lists)
+        lists.update(other.lists)
+        return NeighborTable({t: v for t, v in lists.items() if v}, version)
+
+_lock = threading.Lock()
+_table: Optional[NeighborTable] = None
+_vectors: Optional[Tuple[int, Vectors]] = None  # (catalog version, vectors) for update()
+
+def get_table(db: Session) -> NeighborTable:
+    """The neighbor lists as of the current catalog version, loaded once per version."""
+    global _table
+    catalog.sync(db)
+    version = catalog.version()
+    table = _table
+    if table is not None and table.version == version:
+        return table
+    table = NeighborTable.load(db, version)
+    with _lock:
+        _table = table
+    return table
+
+def rebuild_neighbors(db: Session) -> int:
+    """Recompute every tool's list from scratch; returns the number of rows written."""
+    vec = Vectors.load(db)
+    db.execute(delete(ToolNeighbor))
+    written = 0
+    for positions in _blocks(np.arange(len(vec)), len(vec)):
+        top, scores = _top(vec.sims_of(positions))
+        rows = [r for i, p in enumerate(positions)
+                for r in _rows(vec.ids[p], zip((vec.ids[j] for j in top[i]), scores[i]))]
+        if rows:
+            db.execute(insert(_neighbors), rows)
+        written += len(rows)
+    version = catalog.bump(db)
+    db.commit()
+    catalog.invalidate([version])
+    return written
+
+def ensure_neighbors(engine: Engine):
+    """Build the table for a catalog written before tool_neighbors existed, or never rebuilt."""
+    with Session(engine) as db:
+        if db.scalar(select(ToolNeighbor.tool_id).limit(1)) is None and db.scalar(select(Tool.tool_id).offset(1).limit(1)):
+            rebuild_neighbors(db)
+
+def _working_vectors(db: Session) -> Optional[Vectors]:
+    pending = db.info.get("similar_vectors")
+    if pending is not None:
+        return pending
+    cached = _vectors
+    if cached is not None and cached[0] == catalog.version():
+        return cached[1]
+    return None
+
+def update(db: Session, tool_ids: List[str]):
+    """Bring tool_neighbors along with freshly written `tool_ids` (in the caller's transaction).
+    Does nothing while the table is empty: the caller rebuilds it instead."""
+    table = get_table(db)
+    if not len(table) or not tool_ids:
+        return
+    vec = _working_vectors(db)
+    if vec is None:
+        # loaded inside this transaction, so it already holds the written rows: all count as changed
+        vec = Vectors.load(db)
+        fresh = Vectors.from_rows([], vec.idf)
+        changed = list(tool_ids)
+    else:
+        fresh = Vectors.from_rows(db.execute(select(*_COLUMNS).where(Tool.tool_id.in_(tool_ids))).all(), vec.idf)
+        changed = [t for j, t in enumerate(fresh.ids)
+                   if t not in vec.index or vec.cats[vec.index[t]] != fresh.cats[j]
+                   or not np.array_equal(vec.matrix[vec.index[t]], fresh.matrix[j])]
+    vec = vec.patched(fresh)
+    db.info["similar_vectors"] = vec
+    if not changed:
+        return
+    R = np.array([vec.index[t] for t in changed])
+    sims = vec.sims_of(R)  # |R| × n, symmetric: column j is j's score for each written tool
+    lists: Dict[str, List[Tuple[str, float]]] = {}
+    top, scores = _top(sims)
+    for i, p in enumerate(R):
+        lists[vec.ids[p]] = [(vec.ids[j], float(s)) for j, s in zip(top[i], scores[i])]
+
+    in_r = set(changed)
+    touched = sorted(db.info.get("similar_owners", ()))  # committed by an earlier attempt of this write
+    if touched:
+        table = table.patched(NeighborTable.load(db, table.version, touched), table.version)
+    referrers = set()
+    for i in range(0, len(changed), 500):
+        referrers.update(db.execute(select(ToolNeighbor.tool_id)
+                                    .where(ToolNeighbor.neighbor_id.in_(changed[i:i + 500]))).scalars())
+    size = min(K, len(vec) - 1)
+    floors = np.array([l[-1][1] if len(l) >= size and l else -np.inf for l in map(table.of, vec.ids)])
+    best = sims.max(axis=0)
+    candidates = set(np.flatnonzero(best > floors).tolist()) | {vec.index[t] for t in referrers if t in vec.index}
+    recompute = []
+    for j in sorted(candidates):
+        owner = vec.ids[j]
+        if owner in in_r:
+            continue
+        current = table.of(owner)
+        full = len(current) >= size
+        dropped = owner in referrers
+        known = [(n, s) for n, s in current if n not in in_r]
+        col = sims[:, j]
+        cands = [(vec.ids[R[i]], float(col[i])) for i in np.argsort(-col, kind="stable")[:K]]
+        merged = sorted(known + cands, key=lambda e: -e[1])[:K]
+        if dropped and full and (not known or len(known) + sum(s >= known[-1][1] for _, s in cands) < K):
+            recompute.append(j)  # a list lost a member and the merge can't tell what comes next
+            continue
+        if [(n, round(s, 4)) for n, s in merged] != [(n, round(s, 4)) for n, s in current]:
+            lists[owner] = merged
+    for positions in _blocks(recompute, len(vec)):
+        top, scores = _top(vec.sims_of(positions))
+        for i, p in enumerate(positions):
+            lists[vec.ids[p]] = [(vec.ids[j], float(s)) for j, s in zip(top[i], scores[i])]
+
+    owners = list(lists)
+    for i in range(0, len(owners), 500):
+        db.execute(delete(ToolNeighbor).where(ToolNeighbor.tool_id.in_(owners[i:i + 500])))
+    rows = [r for owner, entries in lists.items() for r in _rows(owner, entries)]
+    if rows:
+        db.execute(insert(_neighbors), rows)
+    db.info.setdefault("similar_owners", set()).update(owners)
+
+def remove(db: Session, tool_ids: List[str]):
+    """Take tools that are about to be deleted out of tool_neighbors (in the caller's transaction):
+    their own lists go, and every list they were in is recomputed without them."""
+    table = get_table(db)
+    if not len(table) or not tool_ids:
+        return
+    vec = _working_vectors(db)
+    vec = (vec or Vectors.load(db)).without(tool_ids)
+    db.info["similar_vectors"] = vec
+    gone = set(tool_ids)
+    referrers = set()
+    for i in range(0, len(tool_ids), 500):
+        referrers.update(db.execute(select(ToolNeighbor.tool_id)
+                                    .where(ToolNeighbor.neighbor_id.in_(tool_ids[i:i + 500]))).scalars())
+    owners = list(tool_ids) + sorted(referrers - gone)
+    for i in range(0, len(owners), 500):
+        db.execute(delete(ToolNeighbor).where(ToolNeighbor.tool_id.in_(owners[i:i + 500])))
+    positions = [vec.index[t] for t in owners if t in vec.index]
+    for chunk in _blocks(positions, len(vec)):
+        top, scores = _top(vec.sims_of(chunk))
+        rows = [r for i, p in enumerate(chunk) for r in _rows(vec.ids[p], zip((vec.ids[j] for j in top[i]), scores[i]))]
+        if rows:
+            db.execute(insert(_neighbors), rows)
+    db.info.setdefault("similar_owners", set()).update(owners)
+
+def committed(db: Session):
+    """After each commit of a write: what update() prepared is now the state to build on."""
+    if "similar_vectors" in db.info:
+        db.info["similar_committed"] = db.info["similar_vectors"]
+
+def discard(db: Session):
+    """After a rollback: go back to the vectors as of the last commit of this write."""
+    db.info.pop("similar_vectors", None)
+    if "similar_committed" in db.info:
+        db.info["similar_vectors"] = db.info["similar_committed"]
+
+def refresh(db: Session, since: int):
+    """After write_tools() committed and catalog.refresh() bumped the version from `since`:
+    keep the vectors update() built on, and patch the rewritten lists into the cached table."""
+    global _table, _vectors
+    db.info.pop("similar_vectors", None)
+    vec = db.info.pop("similar_committed", None)
+    owners = sorted(db.info.pop("similar_owners", ()))
+    if catalog.version() == since:
+        return
+    lists = NeighborTable.load(db, since + 1, owners) if owners else None
+    with _lock:
+        _vectors = (since + 1, vec) if vec is not None else None
+        table = _table
+        if table is not None and table.version == since:
+            _table = table.patched(lists, since + 1) if lists is not None else NeighborTable(table.lists, since + 1)
+        else:
+            _table = None
@@ -0,0 +1,232 @@
+# backend/app/services/snapshot_file.py
+"""Binary catalog snapshot that several worker processes map read-only (CATALOG_SNAPSHOT_PATH).
+
+Layout: magic, header length, JSON header (counts, vocabularies, array directory), then
+64-byte-aligned numpy arrays read in place from the mapping.
+"""
+from __future__ import annotations
+import json, mmap, os, struct
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from . import terms as term_index
+from .catalog import CatalogSnapshot, ToolRef
+
+MAGIC = b"TSCAT001"
+ALIGN = 64
+
+def _strings(name: str, values: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+    encoded = [(v or "").encode() for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    out = {f"{name}.offsets": offsets, f"{name}.data": np.frombuffer(b"".join(encoded), dtype=np.uint8)}
+    nulls = np.array([v is None for v in values], dtype=np.bool_)
+    if nulls.any():
+        out[f"{name}.nulls"] = nulls
+    return out
+
+def _term_arrays(kind: str, row_terms: Sequence[Sequence[str]]) -> Dict[str, np.ndarray]:
+    vocab = sorted({t for values in row_terms for t in values})
+    ids = {t: i for i, t in enumerate(vocab)}
+    lengths = np.fromiter((len(values) for values in row_terms), dtype=np.int64, count=len(row_terms))
+    row_offsets = np.zeros(len(row_terms) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=row_offsets[1:])
+    flat = np.fromiter((ids[t] for values in row_terms for t in values), dtype=np.int32, count=int(row_offsets[-1]))
+    owner = np.repeat(np.arange(len(row_terms), dtype=np.int32), lengths)
+    order = np.lexsort((owner, flat))  # by term, then row
+    post_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=len(vocab)), out=post_offsets[1:])
+    prefix = f"terms.{kind}"
+    return {**_strings(f"{prefix}.vocab", vocab), f"{prefix}.row_offsets": row_offsets,
+            f"{prefix}.row_terms": flat, f"{prefix}.post_offsets": post_offsets,
+            f"{prefix}.post_rows": owner[order]}
+
+def dump(snap: CatalogSnapshot, path: str, generation: int):
+    """Write `snap` to `path`, atomically replacing what is there (readers keep their old mapping)."""
+    refs = list(snap.refs)
+    ids = [r.tool_id for r in refs]
+    arrays: Dict[str, np.ndarray] = {
+        "cat_codes": snap.cat_codes, "price": snap.price, "scores": snap.scores, "flags": snap.flags,
+        "totals": snap.totals(),
+        "ref_price": np.array([np.nan if r.price_low_usd is None else r.price_low_usd for r in refs], dtype=np.float64),
+        "id_order": np.argsort(np.array(ids, dtype=object), kind="stable").astype(np.int32),
+        **{f"codes.{f}": c for f, c in snap.codes.items()},
+        **_strings("tool_id", ids), **_strings("name", [r.name for r in refs]),
+        **_strings("category", [r.category for r in refs]),
+    }
+    for kind in term_index.KINDS:
+        arrays.update(_term_arrays(kind, snap.row_terms[kind]))
+    directory, offset = {}, 0
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a)
+        arrays[name] = a
+        directory[name] = [offset, a.dtype.str, list(a.shape)]
+        offset += -(-a.nbytes // ALIGN) * ALIGN
+    header = json.dumps({"generation": generation, "rows": len(refs), "categories": snap.categories,
+                         "vocab": snap.vocab, "arrays": directory}).encode()
+    base = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, a in arrays.items():
+            f.seek(base + directory[name][0])
+            f.write(a.tobytes())
+        f.truncate(base + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def read_generation(path: str) -> Optional[int]:
+    """The generation recorded in the file at `path`, without mapping it; None if absent or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(MAGIC) + 8)
+            if head[:len(MAGIC)] != MAGIC:
+                return None
+            return json.loads(f.read(struct.unpack("<Q", head[len(MAGIC):])[0]))["generation"]
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+class _Strings:
+    __slots__ = ("mm", "base", "offsets", "nulls")
+
+    def __init__(self, mm, base: int, offsets: np.ndarray, nulls: Optional[np.ndarray]):
+        self.mm, self.base, self.offsets, self.nulls = mm, base, offsets, nulls
+
+    def raw(self, i: int) -> bytes:
+        return self.mm[self.base + int(self.offsets[i]):self.base + int(self.offsets[i + 1])]
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        return self.raw(i).decode()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+class _Refs(Sequence):
+    """snapshot.refs, decoded per access."""
+
+    def __init__(self, ids: _Strings, names: _Strings, categories: _Strings, price: np.ndarray, totals: np.ndarray):
+        self.ids, self.names, self.categories, self.price, self.totals = ids, names, categories, price, totals
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        p, t = float(self.price[i]), float(self.totals[i])
+        return ToolRef(self.ids[i], self.names[i], self.categories[i],
+                       None if p != p else p, None if t != t else t)
+
+class _IdIndex:
+    """snapshot.index (tool_id → row) as a binary search over id_order."""
+
+    def __init__(self, ids: _Strings, order: np.ndarray):
+        self.ids, self.order = ids, order
+
+    def get(self, tool_id: str, default=None):
+        key, lo, hi = tool_id.encode(), 0, len(self.order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids.raw(int(self.order[mid])).decode() < tool_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.order) and self.ids.raw(int(self.order[lo])) == key:
+            return int(self.order[lo])
+        return default
+
+    def __contains__(self, tool_id) -> bool:
+        return self.get(tool_id) is not None
+
+    def __getitem__(self, tool_id: str) -> int:
+        i = self.get(tool_id)
+        if i is None:
+            raise KeyError(tool_id)
+        return i
+
+class _RowTerms(Sequence):
+    def __init__(self, vocab: _Strings, offsets: np.ndarray, ids: np.ndarray):
+        self.vocab, self.offsets, self.ids = vocab, offsets, ids
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return tuple(self.vocab[int(t)] for t in self.ids[self.offsets[i]:self.offsets[i + 1]])
+
+class _Postings:
+    """term → sorted row positions, looked up by binary search in the sorted term table."""
+
+    def __init__(self, vocab: _Strings, offsets: np.ndarray, rows: np.ndarray):
+        self.vocab, self.offsets, self.rows = vocab, offsets, rows
+
+    def get(self, term: str, default=None):
+        lo, hi = 0, len(self.vocab)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.vocab[mid] < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.vocab) and self.vocab[lo] == term:
+            return self.rows[self.offsets[lo]:self.offsets[lo + 1]]
+        return default
+
+    def items(self):
+        return ((self.vocab[i], self.rows[self.offsets[i]:self.offsets[i + 1]]) for i in range(len(self.vocab)))
+
+class MappedSnapshot(CatalogSnapshot):
+    """A CatalogSnapshot whose columns live in a read-only mapping of a dump() file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        size = struct.unpack("<Q", mm[len(MAGIC):len(MAGIC) + 8])[0]
+        meta = json.loads(mm[len(MAGIC) + 8:len(MAGIC) + 8 + size])
+        base = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+        a: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in meta["arrays"].items():
+            count = int(np.prod(shape)) if shape else 1
+            a[name] = np.frombuffer(mm, dtype=np.dtype(dtype), count=count, offset=base + offset).reshape(shape)
+
+        def strings(name):
+            data = meta["arrays"][f"{name}.data"][0]
+            return _Strings(mm, base + data, a[f"{name}.offsets"], a.get(f"{name}.nulls"))
+
+        self._mm = mm
+        self.path = path
+        self.generation = meta["generation"]
+        ids = strings("tool_id")
+        self.refs = _Refs(ids, strings("name"), strings("category"), a["ref_price"], a["totals"])
+        self.index = _IdIndex(ids, a["id_order"])
+        self.categories = meta["categories"]
+        self.cat_codes, self.price, self.scores, self.flags = a["cat_codes"], a["price"], a["scores"], a["flags"]
+        self.vocab = meta["vocab"]
+        self.codes = {f: a[f"codes.{f}"] for f in self.vocab}
+        self.row_terms, self._postings = {}, {}
+        for kind in term_index.KINDS:
+            p = f"terms.{kind}"
+            vocab = strings(f"{p}.vocab")
+            self.row_terms[kind] = _RowTerms(vocab, a[f"{p}.row_offsets"], a[f"{p}.row_terms"])
+            self._postings[kind] = _Postings(vocab, a[f"{p}.post_offsets"], a[f"{p}.post_rows"])
+        self._base_cache = {"totals": a["totals"]}
+
+    def materialized(self) -> CatalogSnapshot:
+        """An in-memory copy, for patched() and re-dumping."""
+        return CatalogSnapshot(
+            list(self.refs), list(self.categories), self.cat_codes.copy(), self.price.copy(), self.scores.copy(),
+            self.flags.copy(), {kind: list(values) for kind, values in self.row_terms.items()},
+            {kind: {t: rows.copy() for t, rows in p.items()} for kind, p in self._postings.items()},
+            vocab={f: list(v) for f, v in self.vocab.items()}, codes={f: c.copy() for f, c in self.codes.items()})
+
+    def patched(self, rows) -> CatalogSnapshot:
+        return self.materialized().patched(rows)
+
+def load(path: str) -> MappedSnapshot:
+    return MappedSnapshot(path)
@@ -0,0 +1,91 @@
+# backend/app/services/terms.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models import Tool, ToolTerm
+
+# Tool list column → ToolTerm.kind
+TERM_FIELDS: Dict[str, str] = {
+    "integrations_csv": "integration",
+    "tags_csv": "tag",
+    "best_use_cases_csv": "use_case",
+    "buyer_personas_csv": "persona",
+    "ideal_industries_csv": "industry",
+}
+KINDS = list(TERM_FIELDS.values())
+
+def normalize_term(value: str | None) -> str:
+    return " ".join((value or "").lower().split())
+
+def split_terms(csv_value: str | None) -> Tuple[str, ...]:
+    """'Slack, Google  Sheets,slack' → ('slack', 'google sheets')."""
+    out: List[str] = []
+    for part in (csv_value or "").split(","):
+        term = normalize_term(part)
+        if term and term not in out:
+            out.append(term)
+    return tuple(out)
+
+def tool_terms(obj) -> Dict[str, Tuple[str, ...]]:
+    return {kind: split_terms(getattr(obj, field, None)) for field, kind in TERM_FIELDS.items()}
+
+def _term_rows(objs: Iterable) -> List[dict]:
+    rows = []
+    for obj in objs:
+        for kind, values in tool_terms(obj).items():
+            rows.extend({"tool_id": obj.tool_id, "kind": kind, "term": v} for v in values)
+    return rows
+
+def sync_terms(db: Session, tools: Iterable[Tool]):
+    """Replace the ToolTerm rows of `tools` (in the caller's transaction)."""
+    tools = list(tools)
+    if not tools:
+        return
+    db.flush()  # parents first, for databases that enforce the FK
+    ids = [t.tool_id for t in tools]
+    for i in range(0, len(ids), 500):
+        db.execute(delete(ToolTerm).where(ToolTerm.tool_id.in_(ids[i:i + 500])))
+    rows = _term_rows(tools)
+    if rows:
+        db.execute(insert(ToolTerm), rows)
+
+def refresh_terms(db: Session, tool_ids: List[str]):
+    """sync_terms() for rows written with Core statements: re-reads their list fields by id."""
+    cols = [Tool.tool_id, *[getattr(Tool, f) for f in TERM_FIELDS]]
+    for i in range(0, len(tool_ids), 500):
+        sync_terms(db, db.execute(select(*cols).where(Tool.tool_id.in_(tool_ids[i:i + 500]))).all())
+
+def rebuild_terms(db: Session, batch_size: int = 1000) -> int:
+    """Re-tokenize the whole catalog, e.g. for rows written before tool_terms existed."""
+    db.execute(delete(ToolTerm))
+    cols = [Tool.tool_id, *[getattr(Tool, f) for f in TERM_FIELDS]]
+    last_id = None
+    written = 0
+    while True:
+        q = select(*cols).order_by(Tool.tool_id).limit(batch_size)
+        if last_id is not None:
+            q = q.where(Tool.tool_id > last_id)
+        batch = db.execute(q).all()
+        if not batch:
+            break
+        rows = _term_rows(batch)
+        if rows:
+            db.execute(insert(ToolTerm), rows)
+        written += len(rows)
+        last_id = batch[-1].tool_id
+    db.commit()
+    return written
+
+def ensure_terms(engine: Engine):
+    """Backfill the term index for a catalog written before tool_terms existed."""
+    from .catalog import bump  # catalog imports this module
+    with Session(engine) as db:
+        if db.scalar(select(ToolTerm.tool_id).limit(1)) is None and db.scalar(select(Tool.tool_id).limit(1)):
+            bump(db)  # workers that already loaded the catalog reload it with the terms
+            rebuild_terms(db)
+
+def load_terms(db: Session) -> Iterable[Tuple[str, str, str]]:
+    return db.execute(select(ToolTerm.tool_id, ToolTerm.kind, ToolTerm.term)).all()
@@ -0,0 +1,71 @@
+# backend/app/services/warmup.py
+"""Startup warm-up: load what the first requests would otherwise pay for, then report ready."""
+from __future__ import annotations
+import asyncio, logging, time
+from typing import Dict
+
+from . import catalog, metrics, similar, terms
+from .questionnaire import get_questionnaire
+from ..db import SessionLocal
+from ..utils.scoring import UnknownProfile, get_profile, list_profiles
+
+log = logging.getLogger(__name__)
+
+RETRY_SECONDS = 5.0
+
+class State:
+    ready = False
+    error: str | None = None
+    phases: Dict[str, float] = {}  # phase → seconds
+
+state = State()
+
+def warm_up() -> Dict[str, float]:
+    """Weight profiles, the compiled questionnaire, the catalog snapshot with its postings and
+    per-profile scores, and the similar-tool lists. Returns seconds per phase."""
+    phases = {}
+    t0 = time.perf_counter()
+    profiles = []
+    for name in dict.fromkeys(["default", *list_profiles()]):
+        try:
+            profiles.append(get_profile(name))
+        except UnknownProfile:
+            pass
+    phases["weights"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    get_questionnaire()
+    phases["questionnaire"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    try:
+        snap = catalog.get_snapshot(db)
+        for kind in terms.KINDS:
+            snap.postings(kind)
+        for profile in profiles:
+            snap.profile_scores(profile)
+        phases["catalog"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        similar.get_table(db)
+        phases["neighbors"] = time.perf_counter() - t0
+    finally:
+        db.close()
+    return phases
+
+async def run():
+    """Warm up off the event loop, retrying until it succeeds (e.g. the database is still starting)."""
+    t0 = time.perf_counter()
+    while True:
+        try:
+            state.phases = await asyncio.to_thread(warm_up)
+            break
+        except Exception as exc:
+            state.error = str(exc)
+            log.exception("warm-up failed; retrying in %ss", RETRY_SECONDS)
+            await asyncio.sleep(RETRY_SECONDS)
+    metrics.STARTUP.set("warmup", value=time.perf_counter() - t0)
+    state.error = None
+    state.ready = True
+    log.info("ready: %s", ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in state.phases.items()))
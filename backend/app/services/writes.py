@@ -0,0 +1,298 @@
+# backend/app/services/writes.py
+"""The one way tools get written (POST /tools, /tools/ingest, seed) or deleted, derived state included."""
+from __future__ import annotations
+import hashlib
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import orjson
+from slugify import slugify
+from sqlalchemy import Boolean, Float, Integer, delete, func, select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from . import catalog, changes, facets, similar, terms
+from ..models import Tool, ToolTerm
+from ..utils.scoring import SCORE_FIELDS, WeightProfile, get_profile, score_columns
+
+_tools = Tool.__table__
+
+# computed here or by the database; never taken from the caller
+DERIVED = ["total_score", "score_version", "content_hash", "last_verified_at"]
+WRITABLE = [c.name for c in _tools.columns if c.name != "tool_id" and c.name not in DERIVED]
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+_state = [_tools.c.tool_id, _tools.c.name, *[_tools.c[f] for f in facets.FACET_FIELDS + catalog.FLAG_FIELDS + SCORE_FIELDS]]
+
+def _coerce(column, value):
+    if isinstance(column.type, Boolean):
+        return value if isinstance(value, bool) else str(value or "").strip().lower() in TRUE_VALUES
+    if value is None or value == "":
+        return None
+    if isinstance(column.type, Float):
+        return float(value)
+    if isinstance(column.type, Integer):
+        return int(value)
+    return value
+
+def coerce_row(raw: dict) -> dict:
+    """Column values for the writable fields present in `raw` (CSV strings or JSON values).
+
+    Unknown keys and derived columns are dropped. Raises ValueError naming the bad field.
+    """
+    out = {}
+    for k in WRITABLE:
+        if k in raw:
+            try:
+                out[k] = _coerce(_tools.c[k], raw[k])
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{k}: {exc}") from None
+    return out
+
+def content_hash(values: dict, columns: List[str]) -> str:
+    """Canonical hash of a coerced row as written to `columns` (a column it lacks counts as NULL).
+
+    The column names are part of it: the same values written to a different set of columns may
+    not leave the row as it was.
+    """
+    return hashlib.blake2b(orjson.dumps([[c, values.get(c)] for c in columns]), digest_size=16).hexdigest()
+
+class Written(NamedTuple):
+    created: List[str]
+    updated: List[str]
+    rejected: Dict[str, str]  # tool_id → reason
+    totals: Dict[str, Optional[float]]
+    unchanged: List[str]  # skipped: same content and score version as stored
+    diff: Optional[Dict[str, dict]] = None  # diff_tools() only: tool_id → {column: [old, new]} per update
+
+def _upsert_statement(dialect: str, columns: List[str]):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    stmt = insert(_tools)
+    # only the given columns are overwritten; a derived slug is for new rows only
+    set_ = {c: stmt.excluded[c] for c in columns + ["total_score", "score_version", "content_hash"]}
+    set_["last_verified_at"] = func.now()
+    return stmt.on_conflict_do_update(index_elements=[_tools.c.tool_id], set_=set_)
+
+def _write(db: Session, rows: Dict[str, dict], columns: List[str], profile: WeightProfile,
+           hashes: Dict[str, str], neighbors: bool) -> Written:
+    ids = list(rows)
+    before = {}
+    for i in range(0, len(ids), 500):
+        for r in db.execute(select(*_state).where(_tools.c.tool_id.in_(ids[i:i + 500]))):
+            before[r.tool_id] = dict(r._mapping)
+    out, merged, rejected = [], [], {}
+    for tool_id, values in rows.items():
+        if tool_id not in before and not values.get("name"):
+            rejected[tool_id] = "name is required for new tools"
+            continue
+        row = {c: values.get(c) for c in columns}
+        row["tool_id"] = tool_id
+        # NOT NULL is checked on the insert half of an upsert too, even when the row exists
+        row["name"] = values.get("name") or before.get(tool_id, {}).get("name")
+        row["slug"] = values.get("slug") or slugify(values.get("name") or tool_id)
+        row["content_hash"] = hashes[tool_id]
+        out.append(row)
+        merged.append({**before.get(tool_id, {}), **row})
+    if not out:
+        return Written([], [], rejected, {}, [])
+    scores = np.array([[float(m.get(k) or 0) for k in SCORE_FIELDS] for m in merged], dtype=np.float64)
+    for row, total in zip(out, score_columns(scores, profile.weights)):
+        row["total_score"] = float(total)
+        row["score_version"] = profile.version
+    written = [r["tool_id"] for r in out]
+    changes.record(db, written)
+    stmt = _upsert_statement(db.get_bind().dialect.name, columns)
+    if stmt is not None:
+        db.execute(stmt, out)
+    else:
+        for row in out:
+            db.merge(Tool(**row))
+        db.flush()  # the session doesn't autoflush; the reads below must see these rows
+    terms.refresh_terms(db, written)
+    facets.apply(db, [k for i in written if i in before for k in facets.tool_keys(before[i])],
+                 [k for m in merged for k in facets.tool_keys(m)])
+    if neighbors:
+        similar.update(db, written)
+    return Written([i for i in written if i not in before], [i for i in written if i in before], rejected,
+                   {r["tool_id"]: r["total_score"] for r in out}, [])
+
+def _write_committed(db: Session, rows: Dict[str, dict], columns: List[str], profile: WeightProfile,
+                     hashes: Dict[str, str], neighbors: bool, versions: List[int]) -> Written:
+    try:
+        written = _write(db, rows, columns, profile, hashes, neighbors)
+        version = catalog.bump(db) if written.created or written.updated else None
+        db.commit()
+        if version is not None:
+            versions.append(version)
+        similar.committed(db)
+        return written
+    except (IntegrityError, DataError, ValueError, TypeError) as exc:
+        db.rollback()
+        similar.discard(db)
+        if len(rows) == 1:
+            return Written([], [], {next(iter(rows)): _reason(exc)}, {}, [])
+    except Exception:
+        # anything else (the database is gone, say) isn't the rows' fault: retrying them one by one won't help
+        db.rollback()
+        similar.discard(db)
+        raise
+    # a bad row (e.g. duplicate slug) shouldn't sink its neighbours: retry one by one
+    out = Written([], [], {}, {}, [])
+    for tool_id, values in rows.items():
+        one = _write_committed(db, {tool_id: values}, columns, profile, hashes, neighbors, versions)
+        out.created.extend(one.created)
+        out.updated.extend(one.updated)
+        out.rejected.update(one.rejected)
+        out.totals.update(one.totals)
+    return out
+
+def _reason(exc: Exception) -> str:
+    """Why a row was refused, for the client: no driver text."""
+    if isinstance(exc, IntegrityError):
+        return "slug is already used by another tool" if "slug" in str(exc.orig) else "conflicts with a stored tool"
+    if isinstance(exc, DataError):
+        return "a value doesn't fit its column"
+    return f"invalid value: {exc}"
+
+def _columns(rows: Dict[str, dict], columns: Optional[Iterable[str]]) -> List[str]:
+    if columns is None:
+        columns = {k for values in rows.values() for k in values}
+    return [c for c in WRITABLE if c in set(columns)]
+
+def _unchanged(db: Session, hashes: Dict[str, str], profile: WeightProfile) -> Dict[str, Optional[float]]:
+    """Stored totals of the tools whose content hash and score version match: one lookup per 500 ids."""
+    ids = list(hashes)
+    out = {}
+    for i in range(0, len(ids), 500):
+        for r in db.execute(select(_tools.c.tool_id, _tools.c.content_hash, _tools.c.total_score)
+                            .where(_tools.c.tool_id.in_(ids[i:i + 500]), _tools.c.score_version == profile.version)):
+            if r.content_hash == hashes[r.tool_id]:
+                out[r.tool_id] = r.total_score
+    return out
+
+def write_tools(db: Session, rows: Dict[str, dict], columns: Optional[Iterable[str]] = None,
+                profile: Optional[WeightProfile] = None, neighbors: bool = True) -> Written:
+    """Upsert coerced `rows` (tool_id → column values) and commit.
+
+    Existing tools only get `columns` overwritten (default: all the rows carry). Rows resent as
+    stored come back in `unchanged`, rows the database refuses in `rejected`. With
+    `neighbors=False` the caller passes the written ids to update_neighbors() afterwards.
+    """
+    columns = _columns(rows, columns)
+    profile = profile or get_profile()
+    hashes = {tool_id: content_hash(values, columns) for tool_id, values in rows.items()}
+    same = _unchanged(db, hashes, profile)
+    rows = {tool_id: values for tool_id, values in rows.items() if tool_id not in same}
+    if not rows:
+        return Written([], [], {}, dict(same), list(same))
+    catalog.sync(db, max_age=0)  # similar.update() builds on what this process cached
+    since = catalog.version()
+    versions: List[int] = []
+    inline = neighbors and len(rows) <= similar.UPDATE_MAX_ROWS and len(similar.get_table(db)) > 0
+    try:
+        written = _write_committed(db, rows, columns, profile, hashes, inline, versions)
+        catalog.refresh(db, written.created + written.updated, versions)
+    except Exception:
+        if versions:
+            catalog.invalidate(versions)  # rows committed before the failure
+        raise
+    finally:
+        similar.refresh(db, since)
+    if neighbors and not inline:
+        update_neighbors(db, written.created + written.updated)
+    return written._replace(totals={**same, **written.totals}, unchanged=list(same))
+
+def update_neighbors(db: Session, tool_ids: List[str]):
+    """Bring tool_neighbors along with tools written with neighbors=False, and commit: incrementally
+    for up to similar.UPDATE_MAX_ROWS of them, past that (or while the table is empty, e.g. on the
+    first write to a new database) with one rebuild."""
+    if not tool_ids:
+        return
+    if len(tool_ids) > similar.UPDATE_MAX_ROWS or not len(similar.get_table(db)):
+        similar.rebuild_neighbors(db)
+        return
+    catalog.sync(db, max_age=0)
+    since = catalog.version()
+    try:
+        similar.update(db, tool_ids)
+        version = catalog.bump(db)
+        db.commit()
+        similar.committed(db)
+        catalog.patch([], [version])  # nothing in the snapshot changed, but the cached lists did
+    except Exception:
+        db.rollback()
+        similar.discard(db)
+        raise
+    finally:
+        similar.refresh(db, since)
+
+def diff_tools(db: Session, rows: Dict[str, dict], columns: Optional[Iterable[str]] = None,
+               profile: Optional[WeightProfile] = None) -> Written:
+    """What write_tools() would do with `rows`, without writing; `diff` maps each update to its
+    changed columns as [old, new]."""
+    columns = _columns(rows, columns)
+    profile = profile or get_profile()
+    hashes = {tool_id: content_hash(values, columns) for tool_id, values in rows.items()}
+    same = _unchanged(db, hashes, profile)
+    ids = [i for i in rows if i not in same]
+    stored = {}
+    for i in range(0, len(ids), 500):
+        for r in db.execute(select(_tools.c.tool_id, _tools.c.score_version, *[_tools.c[c] for c in columns])
+                            .where(_tools.c.tool_id.in_(ids[i:i + 500]))):
+            stored[r.tool_id] = r._mapping
+    created, updated, rejected, diff = [], [], {}, {}
+    for tool_id in ids:
+        values, old = rows[tool_id], stored.get(tool_id)
+        if old is None:
+            if values.get("name"):
+                created.append(tool_id)
+            else:
+                rejected[tool_id] = "name is required for new tools"
+            continue
+        # the name and slug _write() would store
+        new = {**values, "slug": values.get("slug") or slugify(values.get("name") or tool_id)}
+        if "name" in columns:
+            new["name"] = values.get("name") or old["name"]
+        fields = {c: [old[c], new.get(c)] for c in columns if old[c] != new.get(c)}
+        if old["score_version"] != profile.version:
+            fields["score_version"] = [old["score_version"], profile.version]
+        updated.append(tool_id)
+        diff[tool_id] = fields
+    return Written(created, updated, rejected, {}, list(same), diff)
+
+def delete_tools(db: Session, tool_ids: Iterable[str]) -> List[str]:
+    """Delete tools with their terms, facet tallies and similar-tool lists, and commit; returns the ids
+    that existed. The change log keeps a tombstone for each."""
+    ids = list(dict.fromkeys(tool_ids))
+    before = {}
+    for i in range(0, len(ids), 500):
+        for r in db.execute(select(*_state).where(_tools.c.tool_id.in_(ids[i:i + 500]))):
+            before[r.tool_id] = dict(r._mapping)
+    ids = [i for i in ids if i in before]
+    if not ids:
+        return []
+    catalog.sync(db, max_age=0)
+    since = catalog.version()
+    try:
+        changes.record(db, ids, deleted=True)
+        similar.remove(db, ids)
+        for i in range(0, len(ids), 500):
+            db.execute(delete(ToolTerm).where(ToolTerm.tool_id.in_(ids[i:i + 500])))
+            db.execute(delete(_tools).where(_tools.c.tool_id.in_(ids[i:i + 500])))
+        facets.apply(db, [k for i in ids for k in facets.tool_keys(before[i])], [])
+        version = catalog.bump(db)
+        db.commit()
+        similar.committed(db)
+        catalog.invalidate([version])  # the snapshot patches rows in place or appends them, never removes
+    except Exception:
+        db.rollback()
+        similar.discard(db)
+        raise
+    finally:
+        similar.refresh(db, since)
+    return ids
@@ -1,4 +1,6 @@
-import json, os
+import hashlib, json, os, re, threading
+from typing import NamedTuple
+import numpy as np
 
 DEFAULT_WEIGHTS = {
     "accuracy_score": 1.0,
@@ -10,13 +12,81 @@ DEFAULT_WEIGHTS = {
     "longevity_score": 0.9,
 }
 
-def load_weights():
-    path = os.path.join(os.path.dirname(__file__), "..", "data", "scoring_weights_default.json")
+SCORE_FIELDS = list(DEFAULT_WEIGHTS.keys())
+
+# backend/data, where scoring_weights_<profile>.json live
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+PROFILE_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+class WeightProfile(NamedTuple):
+    name: str
+    version: str
+    weights: dict
+
+class UnknownProfile(KeyError):
+    pass
+
+def _version(name: str, weights: dict, explicit=None) -> str:
+    if explicit is None:
+        explicit = hashlib.sha1(json.dumps(weights, sort_keys=True).encode()).hexdigest()[:10]
+    return f"{name}@{explicit}"
+
+BUILTIN_PROFILE = WeightProfile("default", _version("default", DEFAULT_WEIGHTS, "builtin"), DEFAULT_WEIGHTS)
+
+_profiles: dict[str, tuple[int, WeightProfile]] = {}
+_profiles_lock = threading.Lock()
+
+def profile_path(name: str) -> str:
+    if not PROFILE_NAME.fullmatch(name or ""):
+        raise UnknownProfile(name)
+    return os.path.join(DATA_DIR, f"scoring_weights_{name}.json")
+
+def list_profiles() -> list[str]:
+    names = []
+    for fn in sorted(os.listdir(DATA_DIR)):
+        m = re.fullmatch(r"scoring_weights_(.+)\.json", fn)
+        if m and PROFILE_NAME.fullmatch(m.group(1)):
+            names.append(m.group(1))
+    return names
+
+def get_profile(name: str = "default") -> WeightProfile:
+    """Weights for `name`, parsed once and re-read only when the file's mtime changes.
+
+    A profile file is either a flat {field: multiplier} map or
+    {"version": ..., "weights": {...}}; without an explicit version the content hash is used.
+    """
+    path = profile_path(name)
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return DEFAULT_WEIGHTS
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        if name == "default":
+            return BUILTIN_PROFILE
+        raise UnknownProfile(name)
+    cached = _profiles.get(name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with _profiles_lock:
+        cached = _profiles.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            weights = data.get("weights", data) if isinstance(data, dict) else None
+            weights = {str(k): float(v) for k, v in weights.items()}
+        except Exception:
+            # half-written or malformed file: keep serving what we had
+            if cached:
+                return cached[1]
+            if name == "default":
+                return BUILTIN_PROFILE
+            raise UnknownProfile(name)
+        profile = WeightProfile(name, _version(name, weights, data.get("version") if "weights" in data else None), weights)
+        _profiles[name] = (mtime, profile)
+        return profile
+
+def load_weights(name: str = "default"):
+    return get_profile(name).weights
 
 def score_row(row, weights=None):
     w = weights or DEFAULT_WEIGHTS
@@ -24,3 +94,43 @@ def score_row(row, weights=None):
     for k, mult in w.items():
         total += float(getattr(row, k, 0) or 0) * float(mult)
     return round(total, 3)
+
+def _two_product(a: np.ndarray, b: float):
+    """(p, e) with p = fl(a * b) and p + e == a * b exactly (Dekker)."""
+    p = a * b
+    c = 134217729.0 * a  # 2**27 + 1
+    ah = c - (c - a)
+    al = a - ah
+    c = 134217729.0 * b
+    bh = c - (c - b)
+    bl = b - bh
+    e = ((ah * bh - p) + ah * bl + al * bh) + al * bl
+    return p, e
+
+def round_array(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Vectorized equivalent of the builtin round() applied element-wise.
+
+    round() rounds the exact value of each float, half to even. Scaling by 10**ndigits is
+    inexact, so on a .5 boundary the (exactly computed) scaling error decides the direction;
+    huge values fall back to round().
+    """
+    scale = 10.0 ** ndigits
+    with np.errstate(invalid="ignore", over="ignore"):  # inf/nan go through round() below
+        scaled, err = _two_product(values, scale)
+        floor = np.floor(scaled)
+        tie = scaled - floor == 0.5
+        k = np.where(tie & (err > 0), floor + 1, np.where(tie & (err < 0), floor, np.rint(scaled)))
+        out = k / scale
+    for i in np.flatnonzero(~(np.abs(scaled) < 1e9)):
+        out.flat[i] = round(float(values.flat[i]), ndigits)
+    return out
+
+def score_columns(scores: np.ndarray, weights=None) -> np.ndarray:
+    """score_row() over a (rows x SCORE_FIELDS) matrix; keys outside SCORE_FIELDS count as 0."""
+    w = weights or DEFAULT_WEIGHTS
+    total = np.zeros(scores.shape[0], dtype=np.float64)
+    for k, mult in w.items():
+        if k in SCORE_FIELDS:
+            # same multiply-then-add order as score_row, so the sums are bit-identical
+            total = total + scores[:, SCORE_FIELDS.index(k)] * float(mult)
+    return round_array(total, 3)
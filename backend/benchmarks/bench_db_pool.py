@@ -0,0 +1,95 @@
+"""Sync vs async DB mode under concurrent load, against a uvicorn server on a synthetic SQLite catalog.
+
+    python -m backend.benchmarks.bench_db_pool [--rows 20000] [--concurrency 64] [--seconds 10]
+
+Each mode gets a fresh server process (DB_ASYNC=0, then DB_ASYNC=1) on the same database file;
+the request mix is keyset-paged and filtered GET /tools, GET /tools/{id} and POST /recommend.
+"""
+import argparse, http.client, json, os, random, statistics, tempfile, threading, time
+from urllib.parse import quote_plus
+
+from . import synthetic
+from .bench_suite import get_json, serve
+
+CATEGORIES = [c for c, _ in synthetic.CATEGORIES]
+
+def _seed(path: str, rows: int):
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from ..app.db import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    synthetic.load_catalog(db, rows, seed=7)
+    db.close()
+
+def _request(rnd: random.Random, rows: int):
+    kind = rnd.random()
+    if kind < 0.4:
+        return "GET", f"/tools?page_size=20&count=none&category={quote_plus(rnd.choice(CATEGORIES))}", None
+    if kind < 0.8:
+        return "GET", f"/tools/syn-{rnd.randrange(rows):06d}", None
+    body = {"answers": {"channels": rnd.sample(["SEO", "Paid Ads", "Email", "Research"], 2)},
+            "budget_monthly": rnd.choice([None, 50, 100, 500]), "max_tool_count": rnd.choice([3, 5, 8])}
+    return "POST", "/recommend", json.dumps(body)
+
+def _load(port: int, rows: int, concurrency: int, seconds: float) -> dict:
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def worker(seed: int):
+        rnd = random.Random(seed)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local = []
+        while time.perf_counter() < stop:
+            method, path, body = _request(rnd, rows)
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    raise RuntimeError(resp.status)
+                local.append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ms = sorted(1000 * s for s in latencies) or [0.0]
+    pct = lambda p: round(ms[min(len(ms) - 1, int(p * len(ms)))], 1)
+    return {"requests": len(latencies), "errors": errors[0], "rps": round(len(latencies) / seconds, 1),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "mean_ms": round(statistics.fmean(ms), 1)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--pool-size", type=int, default=5)
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_db_pool.db")
+    _seed(path, args.rows)
+    print(f"{args.rows} rows, {args.concurrency} clients, {args.seconds:.0f}s per mode, pool_size={args.pool_size}")
+    print(f"{'mode':<8}{'req/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'errors':>8}{'waits':>8}{'checkout avg/max ms':>22}")
+    for async_mode in (False, True):
+        with serve(path, args.port, DB_ASYNC=int(async_mode), DB_POOL_SIZE=args.pool_size):
+            _load(args.port, args.rows, 4, 1.0)  # warm the catalog snapshot and caches
+            r = _load(args.port, args.rows, args.concurrency, args.seconds)
+            pool = get_json(args.port, "/admin/pool")["async" if async_mode else "sync"]
+        mode = "async" if async_mode else "sync"
+        print(f"{mode:<8}{r['rps']:>9}{r['p50_ms']:>8}{r['p95_ms']:>8}{r['p99_ms']:>8}{r['errors']:>8}"
+              f"{pool.get('waits', 0):>8}{str(pool.get('checkout_ms_avg')) + ' / ' + str(pool.get('checkout_ms_max')):>22}")
+
+if __name__ == "__main__":
+    main()
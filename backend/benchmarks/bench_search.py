@@ -0,0 +1,73 @@
+"""GET /tools?q= — FTS5 index vs the old ILIKE scan on a synthetic SQLite catalog.
+
+    python -m backend.benchmarks.bench_search [--rows 100000] [--repeat 5]
+"""
+import argparse, os, random, statistics, tempfile, time
+
+WORDS = ("research writing video voice image design seo ads social email crm outreach sales support "
+         "analytics automation agents workflow chat assistant content copy podcast editing scheduling "
+         "landing pages transcription translation meeting notes coding data insights campaign").split()
+SYLLABLES = "ka lo mi ne ru sa ti vo ze pa qu ri xo ly da fe gi ho ju be".split()
+# a long, Zipf-weighted tail of filler words so that domain terms are selective, as in real copy
+FILLER = sorted({a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES})[:4000]
+FILLER_WEIGHTS = [1 / (i + 1) for i in range(len(FILLER))]
+QUERIES = ["research", "video editing", "seo", "email outreach", "transcri", "automation agents", "tool 4242"]
+
+def _text(rnd, k):
+    words = rnd.choices(FILLER, weights=FILLER_WEIGHTS, k=k)
+    words[rnd.randrange(k)] = rnd.choice(WORDS)
+    return " ".join(words)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from sqlalchemy import insert
+    from ..app.db import SessionLocal, init_db
+    from ..app.models import Tool
+    from ..app.routes.tools import _tools_page
+    from ..app.services import search
+
+    init_db()
+    rnd = random.Random(42)
+    db = SessionLocal()
+    batch = []
+    for i in range(args.rows):
+        batch.append({
+            "tool_id": f"tool-{i}", "name": f"Tool {i} {rnd.choice(WORDS).title()}", "slug": f"tool-{i}",
+            "description_short": _text(rnd, 8),
+            "description_long": _text(rnd, 40),
+            "tags_csv": ",".join(rnd.sample(WORDS, 3)), "total_score": rnd.uniform(10, 40),
+        })
+        if len(batch) == 5000:
+            db.execute(insert(Tool), batch); batch = []
+    if batch:
+        db.execute(insert(Tool), batch)
+    db.commit()
+
+    def run(q):
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            out = _tools_page(db, q=q, category=None, min_score=None, tags=None, persona=None, industry=None,
+                              page=1, page_size=20, cursor=None, count="cached", fields=None)
+            timings.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(timings), out["total"]
+
+    fts_backend = search._backend
+    print(f"{args.rows} rows, median of {args.repeat} (ms, count + first page of 20)")
+    print(f"{'query':<20}{'ilike':>10}{'hits':>8}{fts_backend or 'fts':>10}{'hits':>8}")
+    for q in QUERIES:
+        search._backend = None
+        slow, slow_hits = run(q)
+        search._backend = fts_backend
+        fast, fast_hits = run(q)
+        print(f"{q:<20}{slow:>10.1f}{slow_hits:>8}{fast:>10.1f}{fast_hits:>8}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
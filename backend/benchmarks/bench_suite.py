@@ -0,0 +1,219 @@
+"""Endpoint benchmarks on synthetic SQLite catalogs, saved as JSON and compared run-over-run.
+
+    python -m backend.benchmarks.bench_suite [--sizes 1000,10000,100000] [--requests 300]
+        [--concurrency 4] [--out bench_results.json] [--baseline previous.json] [--tolerance 0.2]
+
+For every catalog size a database is built once (see synthetic.py). Each endpoint then gets a fresh
+uvicorn server, so the reported peak RSS is that endpoint's alone. The result and response caches
+are off: repeated requests measure the work, not a cache hit.
+
+  recommend   POST /recommend, questionnaire-derived payloads
+  list_tools  GET /tools filter/search/keyset mix
+  get_tool    GET /tools/{tool_id}
+  ingest      POST /tools/ingest, 1,000-row uploads (half updates, half new tools); runs last
+With --baseline, metrics that got worse by more than --tolerance are listed and the exit code is 1.
+"""
+import argparse, http.client, json, os, platform, random, shutil, statistics, subprocess, sys, tempfile
+import threading, time, uuid
+from contextlib import contextmanager
+
+from . import synthetic
+
+INGEST_ROWS = 1000
+# metric → True when higher is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True, "peak_rss_mb": False}
+
+def _peak_rss_mb(pid: int):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None  # not Linux
+
+def get_json(port: int, path: str) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", path)
+    return json.loads(conn.getresponse().read())
+
+@contextmanager
+def serve(db_path: str, port: int, **env):
+    """A uvicorn server on `db_path` for the duration of the block; yields its process."""
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", PORT=str(port), **{k: str(v) for k, v in env.items()})
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port),
+                             "--log-level", "warning"], env=env)
+    try:
+        for _ in range(600):
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                conn.request("GET", "/ready")
+                if conn.getresponse().status == 200:  # migrated and warmed up
+                    break
+                time.sleep(0.1)
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("server did not start")
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def _multipart(name: str, filename: str, payload: bytes):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n").encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+def run_load(port: int, requests: list, concurrency: int) -> dict:
+    """Replay (method, path, body, content_type) tuples over `concurrency` keep-alive connections."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    queue = list(enumerate(requests))
+
+    def worker():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+        while True:
+            with lock:
+                if not queue:
+                    break
+                _, (method, path, body, ctype) = queue.pop()
+            t0 = time.perf_counter()
+            conn.request(method, path, body=body, headers={"Content-Type": ctype} if ctype else {})
+            resp = conn.getresponse()
+            resp.read()
+            elapsed = time.perf_counter() - t0
+            with lock:
+                (latencies if resp.status < 400 else errors).append(elapsed if resp.status < 400 else resp.status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    ms = sorted(1000 * s for s in latencies) or [0.0]
+    pct = lambda p: round(ms[min(len(ms) - 1, int(p * len(ms)))], 2)
+    return {"requests": len(latencies), "errors": len(errors), "rps": round(len(latencies) / wall, 1),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "mean_ms": round(statistics.fmean(ms), 2)}
+
+def _scenarios(size: int, n: int, seed: int):
+    rnd = random.Random(seed + 3)
+    recommend = [("POST", "/recommend", json.dumps(p), "application/json")
+                 for p in synthetic.recommend_requests(n, seed)]
+    list_tools = [("GET", path, None, None) for path in synthetic.list_requests(n, seed)]
+    get_tool = [("GET", f"/tools/syn-{rnd.randrange(size):06d}", None, None) for _ in range(n)]
+    uploads = []
+    rows = list(synthetic.generate_tools(size + INGEST_ROWS * 4, seed))
+    for k in range(4):
+        updates = rnd.sample(rows[:size], min(size, INGEST_ROWS // 2))
+        new = rows[size + k * INGEST_ROWS:size + k * INGEST_ROWS + INGEST_ROWS // 2]
+        body, ctype = _multipart("csv_file", "tools.csv", synthetic.tools_csv(updates + new))
+        uploads.append(("POST", f"/tools/ingest?batch_size={INGEST_ROWS}", body, ctype))
+    # ingest writes, so it goes last
+    return [("recommend", recommend), ("list_tools", list_tools), ("get_tool", get_tool), ("ingest", uploads)]
+
+def build(path: str, size: int, seed: int):
+    """Child-process entry point: the app binds DATABASE_URL at import time."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from ..app.db import SessionLocal, init_db
+    init_db()
+    db = SessionLocal()
+    synthetic.load_catalog(db, size, seed)
+    db.close()
+
+def run(args) -> dict:
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        for size in args.sizes:
+            path = os.path.join(workdir, f"catalog_{size}.db")
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-m", "backend.benchmarks.bench_suite", "--build", path,
+                            "--sizes", str(size), "--seed", str(args.seed)], check=True)
+            print(f"{size} tools: catalog built in {time.perf_counter() - t0:.1f}s")
+            results[str(size)] = {}
+            for name, requests in _scenarios(size, args.requests, args.seed):
+                with serve(path, args.port, RECOMMEND_CACHE_SIZE=0, HTTP_CACHE_SIZE=0) as proc:
+                    warm = requests[:5] if name != "ingest" else []
+                    run_load(args.port, warm, 1)
+                    r = run_load(args.port, requests, args.concurrency if name != "ingest" else 1)
+                    r["peak_rss_mb"] = _peak_rss_mb(proc.pid)
+                if name == "ingest":
+                    r["rows_per_s"] = round(r["rps"] * INGEST_ROWS, 1)
+                results[str(size)][name] = r
+                print(f"  {name:<11} p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  p99 {r['p99_ms']:>8} ms"
+                      f"  {r['rps']:>8} req/s  rss {r['peak_rss_mb']} MiB  errors {r['errors']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def _meta(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    import numpy, sqlalchemy
+    return {"commit": commit or None, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "numpy": numpy.__version__, "sqlalchemy": sqlalchemy.__version__, "seed": args.seed,
+            "requests": args.requests, "concurrency": args.concurrency}
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics in `current` worse than `baseline` by more than `tolerance` (a fraction)."""
+    regressions = []
+    for size, endpoints in current["results"].items():
+        for endpoint, now in endpoints.items():
+            before = baseline.get("results", {}).get(size, {}).get(endpoint)
+            if not before:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                a, b = before.get(metric), now.get(metric)
+                if not a or b is None:
+                    continue
+                change = (b - a) / a
+                if (-change if higher_is_better else change) > tolerance:
+                    regressions.append({"size": size, "endpoint": endpoint, "metric": metric,
+                                        "baseline": a, "current": b, "change_pct": round(100 * change, 1)})
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--requests", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--baseline")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    ap.add_argument("--build", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+    if args.build:
+        build(args.build, args.sizes[0], args.seed)
+        return
+
+    current = {"meta": _meta(args), "results": run(args)}
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"results written to {args.out}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        print(f"compared with {args.baseline} ({baseline.get('meta', {}).get('commit')}): "
+              f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        for r in regressions:
+            print(f"  {r['size']:>7} {r['endpoint']:<11} {r['metric']:<12} {r['baseline']} → {r['current']}"
+                  f" ({r['change_pct']:+}%)")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
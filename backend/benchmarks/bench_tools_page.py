@@ -0,0 +1,95 @@
+"""GET /tools with 1,000-row pages — ORM rows + json vs projected rows + orjson, full and sparse fieldsets.
+
+    python -m backend.benchmarks.bench_tools_page [--rows 20000] [--page-size 1000] [--repeat 10]
+
+"before" is the previous implementation: every column hydrated into Tool objects, a hand-built
+dict per row, FastAPI's jsonable_encoder and json.dumps. Memory is the tracemalloc peak of one page.
+"""
+import argparse, json, os, random, statistics, tempfile, time, tracemalloc
+
+GRID_FIELDS = "tool_id,name,category,price_low_usd,total_score"
+
+def _seed(rows: int):
+    from sqlalchemy import insert
+    from ..app.db import SessionLocal, init_db
+    from ..app.models import Tool
+
+    init_db()
+    rnd = random.Random(11)
+    words = "research writing video voice seo ads email crm automation agents workflow chat".split()
+    text = lambda k: " ".join(rnd.choices(words, k=k))
+    db = SessionLocal()
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "tool_id": f"tool-{i}", "name": f"Tool {i}", "slug": f"tool-{i}", "category": rnd.choice(words),
+            "homepage_url": f"https://tool-{i}.example.com", "description_short": text(12),
+            "description_long": text(150), "tags_csv": ",".join(rnd.sample(words, 4)),
+            "integrations_csv": ",".join(rnd.sample(words, 5)), "price_low_usd": rnd.choice([0, 9, 29, 99]),
+            "total_score": round(rnd.uniform(10, 40), 3), "score_notes": text(30),
+            "best_use_cases_csv": ",".join(rnd.sample(words, 4)), "buyer_personas_csv": ",".join(rnd.sample(words, 3)),
+            "reviewer_citations_csv": ",".join(text(8) for _ in range(4)),
+            "reviewer_urls_csv": ",".join(f"https://reviews.example.com/{i}/{k}" for k in range(4)),
+        })
+        if len(batch) == 5000:
+            db.execute(insert(Tool), batch); batch = []
+    if batch:
+        db.execute(insert(Tool), batch)
+    db.commit()
+    db.close()
+
+def _measure(fn, repeat: int):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        body = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2**20, len(body)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--page-size", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_tools_page.db')}"
+    from fastapi.encoders import jsonable_encoder
+    from ..app.db import SessionLocal
+    from ..app.models import Tool
+    from ..app.routes.tools import _tools_page, tool_to_dict
+    from ..app.services.http_cache import json_bytes
+
+    _seed(args.rows)
+    db = SessionLocal()
+
+    def before():
+        items = (db.query(Tool).order_by(Tool.total_score.desc().nulls_last(), Tool.tool_id.desc())
+                 .limit(args.page_size).all())
+        out = {"total": None, "page": 1, "page_size": args.page_size, "items": [tool_to_dict(t) for t in items]}
+        db.expunge_all()
+        return json.dumps(jsonable_encoder(out)).encode()
+
+    def after(fields=None):
+        def run():
+            # the page as rendered on an HTTP cache miss
+            return json_bytes(_tools_page(db, q=None, category=None, min_score=None, tags=None, persona=None,
+                                          industry=None, page=1, page_size=args.page_size, cursor=None,
+                                          count="none", fields=fields))
+        return run
+
+    print(f"{args.rows} rows, one page of {args.page_size}, median of {args.repeat}")
+    print(f"{'variant':<34}{'ms':>8}{'peak MiB':>10}{'body KiB':>10}")
+    for label, fn in (("before (ORM + json)", before), ("projected + orjson, all fields", after()),
+                      (f"projected + orjson, fields={len(GRID_FIELDS.split(','))}", after(GRID_FIELDS))):
+        ms, mib, size = _measure(fn, args.repeat)
+        print(f"{label:<34}{ms:>8.1f}{mib:>10.1f}{size / 1024:>10.0f}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
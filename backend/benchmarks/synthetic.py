@@ -0,0 +1,185 @@
+"""Deterministic synthetic catalogs and request mixes for the benchmarks.
+
+The same (n, seed) always yields the same tools and the same requests, so runs are comparable.
+Rows follow the Tool model (the template CSV's columns plus the persona/use-case/industry lists);
+requests are sampled from the questionnaire's own questions and options.
+"""
+import csv, io, json, math, os, random
+from typing import Dict, Iterator, List
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+TEMPLATE_CSV = os.path.join(DATA_DIR, "ai_tools_schema_template.csv")
+QUESTIONNAIRE_JSON = os.path.join(DATA_DIR, "questionnaire_sample.json")
+
+# (category, relative frequency): a few crowded categories and a long tail, as in real directories
+CATEGORIES = [
+    ("Copy & Content", 14), ("Automation & Agents", 11), ("Image & Design", 10), ("Research & Strategy", 8),
+    ("Video Creation & Editing", 8), ("CRM, Outreach & Sales Ops", 7), ("SEO", 6), ("Support & CX", 6),
+    ("Social & Scheduling", 5), ("Voice & Audio", 5), ("Ads & Creatives", 4), ("Analytics & Reporting", 3),
+    ("Dev & Data", 3), ("Legal & Finance", 1),
+]
+# integration popularity (probability a tool lists it)
+INTEGRATIONS = [
+    ("Zapier", 0.55), ("Slack", 0.45), ("Make", 0.35), ("Google Sheets", 0.3), ("Notion", 0.25),
+    ("HubSpot", 0.18), ("Salesforce", 0.12), ("Shopify", 0.1), ("WordPress", 0.1), ("Airtable", 0.09),
+    ("Intercom", 0.06), ("Stripe", 0.06), ("Webflow", 0.05), ("Discord", 0.05), ("Pipedrive", 0.04),
+    ("Linear", 0.03), ("Figma", 0.03), ("Zendesk", 0.03), ("Mailchimp", 0.03), ("n8n", 0.03),
+]
+# pricing model → (probability, price_low sampler)
+PRICING = [
+    ("free", 0.08), ("freemium", 0.32), ("per_user", 0.32), ("flat", 0.18), ("usage", 0.07), ("enterprise", 0.03),
+]
+TAGS = ("llm chat writing seo onpage briefs research qa video t2v editing voice tts image design ads creatives "
+        "social scheduler crm outreach email support helpdesk analytics dashboards workflows agents scraping "
+        "transcription translation meetings notes landing-pages forms surveys").split()
+USE_CASES = ["blog posts", "ad creatives", "cold email", "lead research", "support deflection", "product videos",
+             "podcast editing", "social calendar", "keyword research", "workflow automation", "market research"]
+PERSONAS = ["founder", "marketer", "sales", "support", "agency", "creator", "developer", "operations"]
+INDUSTRIES = ["saas", "ecommerce", "agency", "education", "healthcare", "finance", "real estate", "media"]
+SCORE_FIELDS = ["accuracy_score", "speed_score", "cost_efficiency_score", "integrations_score",
+                "data_control_score", "learning_curve_score", "longevity_score"]
+SYLLABLES = "ai ly fy io ra ze no va qu ko mi lo tra flo gen syn dex bot hub ops".split()
+
+def template_columns() -> List[str]:
+    with open(TEMPLATE_CSV, newline="") as f:
+        return next(csv.reader(f))
+
+def _price(rnd: random.Random, model: str):
+    if model == "free":
+        return 0.0, 0.0
+    if model == "freemium":
+        high = round(math.exp(rnd.gauss(math.log(25), 0.7)), 0)
+        return 0.0, max(high, 5.0)
+    if model == "enterprise":
+        low = round(math.exp(rnd.gauss(math.log(500), 0.6)), -1)
+        return low, low * 4
+    low = round(math.exp(rnd.gauss(math.log(29), 0.9)), 0) - 0.01 * rnd.choice([0, 1])  # $29 and $28.99 styles
+    return max(low, 4.99), round(max(low, 4.99) * rnd.choice([2, 3, 4, 5]), 2)
+
+def _score(rnd: random.Random, mean: float) -> float:
+    return round(min(5.0, max(1.0, rnd.gauss(mean, 0.45))), 1)
+
+def generate_tools(n: int, seed: int = 0) -> Iterator[Dict]:
+    """`n` tool rows (dicts keyed by Tool column), deterministic in (n, seed) and prefix-stable in n."""
+    rnd = random.Random(seed)
+    cats, cat_weights = zip(*CATEGORIES)
+    models, model_weights = zip(*PRICING)
+    for i in range(n):
+        name = "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 3))).title() + f" {i}"
+        tool_id = f"syn-{i:06d}"
+        category = rnd.choices(cats, weights=cat_weights)[0]
+        model = rnd.choices(models, weights=model_weights)[0]
+        low, high = _price(rnd, model)
+        integrations = [name_ for name_, p in INTEGRATIONS if rnd.random() < p]
+        quality = rnd.gauss(3.7, 0.35)  # tools good on one axis tend to be good on others
+        tags = rnd.sample(TAGS, rnd.randint(2, 5))
+        yield {
+            "tool_id": tool_id, "name": name, "slug": tool_id,
+            "homepage_url": f"https://{tool_id}.example.com",
+            "description_short": f"{category} tool for {' and '.join(tags[:2])}",
+            "description_long": " ".join(rnd.choices(TAGS + USE_CASES, k=rnd.randint(20, 60))),
+            "category": category, "subcategory": tags[0], "tags_csv": ",".join(tags),
+            "pricing_model": model, "price_low_usd": low, "price_high_usd": high,
+            "free_tier": model in ("free", "freemium"), "trial_days": rnd.choice([0, 0, 7, 14, 30]),
+            "plan_notes": "",
+            "api_available": rnd.random() < 0.55, "zapier": "Zapier" in integrations, "make": "Make" in integrations,
+            "n8n": "n8n" in integrations or rnd.random() < 0.1, "webhooks": rnd.random() < 0.35,
+            "integrations_csv": ",".join(integrations),
+            "gdpr": rnd.random() < 0.6, "soc2": rnd.random() < 0.3, "hipaa": rnd.random() < 0.05,
+            "oauth": rnd.random() < 0.5, "sso": rnd.random() < 0.25, "rbac": rnd.random() < 0.3,
+            **{k: _score(rnd, quality) for k in SCORE_FIELDS},
+            "total_score": 0.0,
+            "best_use_cases_csv": ",".join(rnd.sample(USE_CASES, rnd.randint(1, 3))),
+            "buyer_personas_csv": ",".join(rnd.sample(PERSONAS, rnd.randint(1, 3))),
+            "ideal_industries_csv": ",".join(rnd.sample(INDUSTRIES, rnd.randint(1, 3))),
+            "reviewer_urls_csv": f"https://reviews.example.com/{tool_id}",
+        }
+
+def tools_csv(rows: List[Dict]) -> bytes:
+    """Rows as an upload for POST /tools/ingest, in the template's column layout."""
+    cols = template_columns()
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=cols, extrasaction="ignore")
+    w.writeheader()
+    w.writerows(rows)
+    return buf.getvalue().encode()
+
+def load_catalog(db, n: int, seed: int = 0, batch_size: int = 5000):
+    """Bulk-insert a synthetic catalog, then build its term index, facet tallies, similar-tool lists
+    and total scores."""
+    from sqlalchemy import insert
+    from ..app.models import Tool
+    from ..app.services import facets, reindex, similar, terms
+
+    batch = []
+    for row in generate_tools(n, seed):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.execute(insert(Tool), batch); batch = []
+    if batch:
+        db.execute(insert(Tool), batch)
+    db.commit()
+    terms.rebuild_terms(db)
+    facets.rebuild_facets(db)
+    similar.rebuild_neighbors(db)
+    reindex.reindex_scores(db)
+
+def _questions() -> Dict[str, dict]:
+    with open(QUESTIONNAIRE_JSON) as f:
+        data = json.load(f)
+    return {q["id"]: q for s in data.get("sections", []) for q in s.get("questions", [])}
+
+def answer_sets(n: int, seed: int = 0) -> Iterator[Dict]:
+    """Questionnaire answers: one choice per single_select, a few per multi_select, a budget and integrations."""
+    rnd = random.Random(seed)
+    questions = _questions()
+    integrations = [name for name, _ in INTEGRATIONS]
+    for _ in range(n):
+        answers = {}
+        for qid, q in questions.items():
+            options = q.get("options") or []
+            if q["type"] == "single_select" and options:
+                answers[qid] = rnd.choice(options)
+            elif q["type"] == "multi_select" and options:
+                answers[qid] = rnd.sample(options, rnd.randint(1, min(3, len(options))))
+            elif q["type"] == "numeric":
+                answers[qid] = rnd.choice([0, 25, 50, 100, 150, 250, 500, 1000, 2500])
+            elif q["type"] == "text":
+                answers[qid] = ", ".join(rnd.sample(integrations[:8], rnd.choice([0, 0, 1, 1, 2])))
+        yield answers
+
+def recommend_requests(n: int, seed: int = 0) -> List[Dict]:
+    """POST /recommend payloads built the way the frontend maps questionnaire answers."""
+    rnd = random.Random(seed + 1)
+    out = []
+    for answers in answer_sets(n, seed):
+        out.append({
+            "answers": answers,
+            "budget_monthly": answers.get("budget_monthly"),
+            "must_integrate_with": [s.strip() for s in (answers.get("must_integrations") or "").split(",") if s.strip()],
+            "prefer_self_hostable": answers.get("data_privacy") == "Self-host",
+            "max_tool_count": rnd.choice([3, 5, 8, 8]),
+            "mode": "optimal" if rnd.random() < 0.2 else "greedy",
+        })
+    return out
+
+def list_requests(n: int, seed: int = 0) -> List[str]:
+    """GET /tools query strings: filters, search, and first/next keyset pages."""
+    from urllib.parse import urlencode
+    rnd = random.Random(seed + 2)
+    cats = [c for c, _ in CATEGORIES]
+    out = []
+    for _ in range(n):
+        kind = rnd.random()
+        if kind < 0.35:
+            params = {"category": rnd.choice(cats), "page_size": 20}
+        elif kind < 0.55:
+            params = {"q": rnd.choice(TAGS), "page_size": 20}
+        elif kind < 0.7:
+            params = {"tags": rnd.choice(TAGS), "min_score": rnd.choice([20, 25, 28]), "page_size": 20}
+        elif kind < 0.85:
+            params = {"cursor": "", "page_size": 50, "fields": "tool_id,name,category,price_low_usd,total_score"}
+        else:
+            params = {"page": rnd.randint(1, 20), "page_size": 20, "persona": rnd.choice(PERSONAS)}
+        out.append("/tools?" + urlencode(params))
+    return out
@@ -0,0 +1,34 @@
+# backend/tests/conftest.py
+"""The tests run against a throwaway SQLite database, migrated once per session."""
+import os, tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="toolstack_tests_"), "test.db")
+
+import pytest
+
+from backend.app.db import SessionLocal, init_db
+from backend.app.models import Tool
+from backend.app.services import writes
+from backend.benchmarks.synthetic import generate_tools
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+
+@pytest.fixture
+def db():
+    """A session on an empty catalog."""
+    with SessionLocal() as s:
+        writes.delete_tools(s, [t for (t,) in s.query(Tool.tool_id)])
+        yield s
+
+def write(db, rows, columns=None):
+    """Write raw rows (as in a CSV upload or a JSON body) through the write pipeline."""
+    return writes.write_tools(db, {r["tool_id"]: writes.coerce_row(r) for r in rows}, columns)
+
+@pytest.fixture
+def catalog(db):
+    """A 300-tool synthetic catalog; returns its rows."""
+    rows = list(generate_tools(300, seed=7))
+    write(db, rows)
+    return rows
@@ -0,0 +1,70 @@
+# backend/tests/test_changes.py
+"""GET /tools/changes: paging with next_since/has_more, and each tool once in its latest state."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from backend.app.main import app
+from backend.app.models import ToolChange
+from backend.app.services import writes
+from conftest import write
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def since(db):
+    """The last seq before the test's writes."""
+    return db.scalar(select(func.max(ToolChange.seq))) or 0
+
+def read(client, since, limit, **params):
+    """Poll until has_more is false; returns the pages."""
+    pages = []
+    while True:
+        page = client.get("/tools/changes", params={"since": since, "limit": limit, **params}).json()
+        pages.append(page)
+        if not page["has_more"]:
+            return pages
+        assert page["next_since"] > since
+        since = page["next_since"]
+
+def tools(db, n):
+    write(db, [{"tool_id": f"c{i}", "name": f"C{i}", "category": "A", "price_low_usd": i} for i in range(n)])
+
+def test_pages(client, db, since):
+    tools(db, 7)
+    pages = read(client, since, 3, fields="tool_id,price_low_usd")
+    assert [len(p["items"]) for p in pages] == [3, 3, 1]
+    assert [p["has_more"] for p in pages] == [True, True, False]
+    items = [i for p in pages for i in p["items"]]
+    assert [p["next_since"] for p in pages] == [items[2]["seq"], items[5]["seq"], items[6]["seq"]]
+    assert [i["op"] for i in items] == ["created"] * 7
+    assert [i["tool"] for i in items] == [{"tool_id": f"c{i}", "price_low_usd": float(i)} for i in range(7)]
+    # caught up: nothing new, and next_since stays put
+    last = pages[-1]["next_since"]
+    assert client.get("/tools/changes", params={"since": last}).json() == {
+        "since": last, "next_since": last, "has_more": False, "items": []}
+
+def test_exact_page_has_no_more(client, db, since):
+    tools(db, 3)
+    (page,) = read(client, since, 3)
+    assert len(page["items"]) == 3 and not page["has_more"]
+
+def test_latest_state_once(client, db, since):
+    tools(db, 4)
+    mid = read(client, since, 100)[-1]["next_since"]
+    write(db, [{"tool_id": "c1", "name": "C1", "category": "A", "price_low_usd": 99}])
+    writes.delete_tools(db, ["c2"])
+    # a reader that saw the creates gets the update and the tombstone
+    items = read(client, mid, 100, fields="tool_id,price_low_usd")[-1]["items"]
+    assert [(i["tool_id"], i["op"], i["tool"]) for i in items] == [
+        ("c1", "updated", {"tool_id": "c1", "price_low_usd": 99.0}), ("c2", "deleted", None)]
+    # one from before them sees each tool once, as it is now
+    items = read(client, since, 100, fields="tool_id,price_low_usd")[-1]["items"]
+    assert sorted((i["tool_id"], i["op"], i["tool"]) for i in items) == [
+        ("c0", "created", {"tool_id": "c0", "price_low_usd": 0.0}),
+        ("c1", "created", {"tool_id": "c1", "price_low_usd": 99.0}), ("c2", "deleted", None),
+        ("c3", "created", {"tool_id": "c3", "price_low_usd": 3.0})]
+    # also when paging (ops are relative to each page's since)
+    assert sorted(i["tool_id"] for p in read(client, since, 1) for i in p["items"]) == ["c0", "c1", "c2", "c3"]
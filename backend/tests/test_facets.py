@@ -0,0 +1,38 @@
+# backend/tests/test_facets.py
+"""The running facet tallies stay equal to a full recount through creates, updates and deletes."""
+from sqlalchemy import update
+
+from backend.app.models import ToolFacet
+from backend.app.services import catalog as catalog_cache, writes
+from backend.app.services.facets import check_facets, from_snapshot, from_tallies, rebuild_facets, snapshot_rows
+from conftest import write
+
+def test_tallies_follow_writes(db, catalog):
+    assert check_facets(db)["ok"]
+    # move tools between categories and pricing models, clear flags, blank a facet
+    changed = [{**r, "category": "Moved", "pricing_model": None, "zapier": False, "free_tier": not r["free_tier"]}
+               for r in catalog[:40]]
+    write(db, changed)
+    assert check_facets(db)["ok"]
+    writes.delete_tools(db, [r["tool_id"] for r in catalog[20:60]])
+    assert check_facets(db)["ok"]
+    write(db, catalog[30:50])  # recreated
+    report = check_facets(db)
+    assert report["ok"] and report["mismatches"] == []
+
+def test_tallies_match_snapshot(db, catalog):
+    snap = catalog_cache.get_snapshot(db)
+    for category in (None, catalog[0]["category"]):
+        assert from_tallies(db, category) == from_snapshot(snap, snapshot_rows(snap, category))
+
+def test_check_reports_drift(db, catalog):
+    key = (catalog[0]["category"], "pricing_model", catalog[0]["pricing_model"])
+    db.execute(update(ToolFacet).where(ToolFacet.category == key[0], ToolFacet.facet == key[1],
+                                       ToolFacet.value == key[2]).values(count=ToolFacet.count + 2))
+    db.commit()
+    report = check_facets(db)
+    assert not report["ok"] and report["mismatched"] == 1
+    (m,) = report["mismatches"]
+    assert (m["category"], m["facet"], m["value"]) == key and m["tally"] == m["actual"] + 2
+    rebuild_facets(db)
+    assert check_facets(db)["ok"]
@@ -0,0 +1,61 @@
+# backend/tests/test_optimizer.py
+"""solve_stack() against brute force over every subset, on small random instances."""
+import itertools, random
+
+import numpy as np
+import pytest
+
+from backend.app.services.optimizer import pareto_prune, solve_stack
+
+def brute_force(scores, prices, cats, budget, max_count, cap):
+    best = 0.0
+    for k in range(1, max_count + 1):
+        for combo in itertools.combinations(range(len(scores)), k):
+            if budget is not None and sum(prices[i] for i in combo) > budget:
+                continue
+            if cap is not None and max(np.bincount(cats[list(combo)])) > cap:
+                continue
+            best = max(best, sum(scores[i] for i in combo))
+    return round(float(best), 4)
+
+def instance(seed):
+    rnd = random.Random(seed)
+    n = rnd.randint(1, 11)
+    scores = np.array([round(rnd.uniform(5, 30), 1) for _ in range(n)])
+    prices = np.array([rnd.choice([0.0, 9.0, 19.0, 29.0, 49.0, 99.0, rnd.uniform(1, 150)]) for _ in range(n)])
+    cats = np.array([rnd.randrange(3) for _ in range(n)], dtype=np.int32)
+    return scores, prices, cats, rnd
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_brute_force(seed):
+    scores, prices, cats, rnd = instance(seed)
+    budget = rnd.choice([None, 0.0, 30.0, 75.0, 150.0, rnd.uniform(0, 300)])
+    max_count = rnd.randint(1, 5)
+    cap = rnd.choice([None, 1, 2])
+    sol = solve_stack(scores, prices, cats, budget, max_count, cap, time_budget_ms=10_000)
+    assert sol.proven
+    assert sol.objective == brute_force(scores, prices, cats, budget, max_count, cap)
+    # and the stack itself is feasible
+    assert len(sol.positions) == len(set(sol.positions)) <= max_count
+    assert budget is None or sum(prices[i] for i in sol.positions) <= budget
+    assert cap is None or not sol.positions or max(np.bincount(cats[sol.positions])) <= cap
+
+@pytest.mark.parametrize("seed", range(50))
+def test_pruning_keeps_an_optimal_stack(seed):
+    scores, prices, cats, rnd = instance(seed)
+    budget, max_count, cap = rnd.uniform(0, 200), rnd.randint(1, 4), rnd.choice([None, 1, 2])
+    kept = pareto_prune(scores, prices, cats, max_count, cap)
+    full = brute_force(scores, prices, cats, budget, max_count, cap)
+    assert brute_force(scores[kept], prices[kept], cats[kept], budget, max_count, cap) == full
+
+@pytest.mark.parametrize("seed", range(200))
+def test_never_picks_non_positive_scores(seed):
+    scores, prices, cats, rnd = instance(seed)
+    scores = np.array([round(rnd.uniform(-20, 30), 1) if rnd.random() < 0.4 else s for s in scores])
+    scores[rnd.randrange(len(scores))] = 0.0
+    budget = rnd.choice([None, 30.0, 75.0, rnd.uniform(0, 300)])
+    max_count, cap = rnd.randint(1, 5), rnd.choice([None, 1, 2])
+    incumbent = [i for i in range(len(scores)) if prices[i] == 0][:max_count] if cap is None else None
+    sol = solve_stack(scores, prices, cats, budget, max_count, cap, incumbent=incumbent, time_budget_ms=10_000)
+    assert sol.objective == brute_force(scores, prices, cats, budget, max_count, cap)
+    assert all(scores[i] > 0 for i in sol.positions)
@@ -0,0 +1,111 @@
+# backend/tests/test_recommender.py
+"""recommend() against the row-at-a-time loop it replaced (score_row per tool, sorted(), greedy fill), and /recommend's
+input checks."""
+import itertools, math, random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+from backend.app.models import Tool
+from backend.app.services.questionnaire import get_questionnaire
+from backend.app.routes.recommend import parse_request
+from backend.app.services.recommender import recommend
+from backend.app.services.similar import NeighborTable
+from backend.app.services.terms import normalize_term, split_terms
+from backend.app.utils.scoring import get_profile, round_array, score_row
+from backend.benchmarks.synthetic import answer_sets
+
+NO_NEIGHBORS = NeighborTable({}, 0)  # alternates: the top-scoring tools not picked, as before
+
+def reference(db, answers, budget, must_integrate_with, prefer_self_hostable, max_tool_count):
+    tools = db.query(Tool).all()
+    if prefer_self_hostable:
+        tools = [t for t in tools if t.n8n or t.webhooks]
+    miw = [normalize_term(m) for m in must_integrate_with if normalize_term(m)]
+    if miw:
+        tools = [t for t in tools if set(miw) <= set(split_terms(t.integrations_csv))] or tools
+    boosts = get_questionnaire().boost_map(answers)
+    weights = get_profile().weights
+    scored = []
+    for t in tools:
+        total = round(score_row(t, weights) * boosts.get(t.category or "", 1.0), 4)
+        scored.append((total, float(t.price_low_usd or 0.0), t))
+    picked, cost = [], 0.0
+    for total, price, t in sorted(scored, key=lambda x: (-(x[0] / (x[1] or 1.0)), -x[0])):
+        if len(picked) >= max_tool_count:
+            break
+        if budget is None or cost + price <= budget:
+            picked.append(t)
+            cost += price
+    if not picked:
+        t = sorted(scored, key=lambda x: (-x[0], x[1]))[0][2]
+        picked, cost = [t], float(t.price_low_usd or 0.0)
+    ids = {t.tool_id for t in picked}
+    alternates = [t for _, __, t in sorted(scored, key=lambda x: -x[0]) if t.tool_id not in ids][:2]
+    return [t.tool_id for t in picked], [t.tool_id for t in alternates], round(cost, 2)
+
+@pytest.mark.parametrize("budget", [None, 0.0, 25.0, 120.0, 1000.0])
+@pytest.mark.parametrize("max_tool_count", [1, 3, 8])
+def test_matches_reference(db, catalog, budget, max_tool_count):
+    for answers in answer_sets(4, seed=budget or 1):
+        for miw, self_hostable in (([], False), (["Slack"], False), (["slack", "Zapier"], True), (["nothing"], False)):
+            rec = recommend(db, answers, budget, miw, self_hostable, max_tool_count, neighbors=NO_NEIGHBORS)
+            got = ([r.tool_id for r in rec.picked], [r.tool_id for r in rec.alternates], rec.cost)
+            assert got == reference(db, answers, budget, miw, self_hostable, max_tool_count)
+
+def test_ties_keep_catalog_order(db):
+    from conftest import write
+    # same score and price: the order the tools were written in decides, for picks and alternates
+    order = random.Random(3).sample(range(40), 40)
+    write(db, [{"tool_id": f"t{i:02d}", "name": f"T{i}", "category": "Other", "price_low_usd": 10,
+                "accuracy_score": 3, "speed_score": 3} for i in order])
+    rec = recommend(db, {}, None, [], False, 3, neighbors=NO_NEIGHBORS)
+    assert [r.tool_id for r in rec.picked] == [f"t{i:02d}" for i in order[:3]]
+    assert [r.tool_id for r in rec.alternates] == [f"t{i:02d}" for i in order[3:5]]
+    assert rec == recommend(db, {}, None, [], False, 3, neighbors=NO_NEIGHBORS)
+
+def test_utility_ties_prefer_higher_score(db):
+    from conftest import write
+    # score per dollar ties at 0.2; the higher score goes first, whatever the catalog order
+    write(db, [{"tool_id": tool_id, "name": tool_id, "category": "Other", "price_low_usd": price,
+                "accuracy_score": score} for tool_id, price, score in (("a", 10, 2), ("b", 5, 1), ("c", 20, 4))])
+    rec = recommend(db, {}, None, [], False, 3, neighbors=NO_NEIGHBORS)
+    assert [r.tool_id for r in rec.picked] == ["c", "a", "b"]
+
+def test_round_array_matches_round():
+    rnd = random.Random(0)
+    values = [rnd.uniform(-100, 100) for _ in range(5000)]
+    values += [k / 1000 + 0.0005 for k in range(-3000, 3000)]  # ties at the 4th digit, as stored
+    values += [2.675, 0.125, 0.375, -0.5, 1e15 + 0.5, 1e300, -0.0, math.inf, -math.inf]
+    for ndigits in (0, 2, 3, 4):
+        got = round_array(np.array(values), ndigits)
+        assert got.tolist() == [round(v, ndigits) for v in values]
+    assert math.isnan(round_array(np.array([math.nan]), 4)[0])
+
+def test_batch_matches_one_by_one(db, catalog):
+    from backend.app.services import catalog as catalog_cache
+    from backend.app.services.recommender import recommend_batch
+    requests = [{"answers": answers, "budget_monthly": budget, "must_integrate_with": miw,
+                 "prefer_self_hostable": self_hostable, "max_tool_count": count, "mode": mode,
+                 "time_budget_ms": 10_000}
+                for answers, budget, miw, self_hostable, count, mode in zip(
+                    answer_sets(70, seed=5), itertools.cycle([None, 0.0, 40.0, 300.0, 75.0]),
+                    itertools.cycle([[], ["Slack"], [], ["Zapier", "n8n"]]), itertools.cycle([False, False, True]),
+                    itertools.cycle([1, 8, 3, 5, 2, 4, 6]), itertools.cycle(["greedy", "greedy", "optimal"]))]
+    snap = catalog_cache.get_snapshot(db)
+    batch = list(recommend_batch(snap, requests, chunk_size=16, neighbors=NO_NEIGHBORS))
+    single = [recommend(db, neighbors=NO_NEIGHBORS, snapshot=snap, **r) for r in requests]
+    assert batch == single
+
+@pytest.mark.parametrize("field, value", [("budget_monthly", "100$"), ("budget_monthly", "nan"),
+                                          ("budget_monthly", True), ("max_tool_count", "three"),
+                                          ("max_per_category", []), ("time_budget_ms", "inf")])
+def test_bad_numbers_are_400s(field, value):
+    r = TestClient(app).post("/recommend", json={"answers": {}, field: value})
+    assert r.status_code == 400 and r.json() == {"detail": f"{field} must be a number."}
+
+def test_numbers_are_coerced():
+    kwargs = parse_request({"budget_monthly": "100", "max_tool_count": None, "max_per_category": "2"})
+    assert (kwargs["budget_monthly"], kwargs["max_tool_count"], kwargs["max_per_category"]) == (100.0, 8, 2)
@@ -0,0 +1,38 @@
+# backend/tests/test_reindex.py
+"""reindex_scores() rewrites, and logs, only the tools whose total or score version changes."""
+import numpy as np
+from sqlalchemy import event, func, select
+
+from backend.app.db import engine
+from backend.app.models import Tool, ToolChange
+from backend.app.services import writes
+from backend.app.services.reindex import reindex_scores
+from backend.app.utils.scoring import SCORE_FIELDS, get_profile, score_columns
+from conftest import write
+
+def seq(db):
+    return db.scalar(select(func.max(ToolChange.seq)))
+
+def test_rescore_matches_the_write_path(db, catalog):
+    base = get_profile()
+    weights = {**base.weights, "accuracy_score": 3 * base.weights["accuracy_score"]}
+    profile = base._replace(version="test@1", weights=weights)
+    statements = []
+    listen = lambda conn, cursor, sql, params, context, many: statements.append(" ".join(sql.split()[:2]))
+    event.listen(engine, "before_cursor_execute", listen)
+    try:
+        out = reindex_scores(db, profile, batch_size=128)
+    finally:
+        event.remove(engine, "before_cursor_execute", listen)
+    assert out["updated"] == len(catalog) and out["batches"] == 3
+    assert statements.count("UPDATE tools") == 3  # one per batch
+    scores = np.array([[float(writes.coerce_row(r).get(k) or 0) for k in SCORE_FIELDS] for r in catalog])
+    expected = {r["tool_id"]: (float(t), "test@1") for r, t in zip(catalog, score_columns(scores, weights))}
+    assert {i: (t, v) for i, t, v in db.query(Tool.tool_id, Tool.total_score, Tool.score_version)} == expected
+
+def test_second_run_writes_nothing(db, catalog):
+    reindex_scores(db)
+    before = seq(db)
+    out = reindex_scores(db)
+    assert (out["updated"], out["unchanged"], out["batches"]) == (0, len(catalog), 0)
+    assert seq(db) == before
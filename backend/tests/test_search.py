@@ -0,0 +1,20 @@
+# backend/tests/test_search.py
+"""The FTS5 index follows tools across a renumbering of their rowids (what a VACUUM may do) once rebuilt."""
+from sqlalchemy import text
+
+from backend.app.db import engine
+from backend.app.models import Tool
+from backend.app.services import search
+
+def matches(db, q):
+    return sorted(t for (t,) in search.apply_search(db.query(Tool.tool_id), q)[0])
+
+def test_startup_rebuild_rekeys_the_index(db, catalog):
+    q = catalog[0]["name"].split()[0]
+    expected = matches(db, q)
+    assert catalog[0]["tool_id"] in expected
+    db.execute(text("UPDATE tools SET rowid = rowid + 100000"))  # fires none of the index triggers
+    db.commit()
+    assert matches(db, q) != expected
+    search.ensure_search_index(engine)
+    assert matches(db, q) == expected
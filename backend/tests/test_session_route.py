@@ -0,0 +1,57 @@
+# backend/tests/test_session_route.py
+"""With DB_ASYNC, a session_route body stays on a threadpool worker; only run_db() work goes through the
+async driver, on the event loop."""
+import threading
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from backend.app import db as app_db
+from backend.app.models import Tool
+from backend.benchmarks.synthetic import generate_tools
+from conftest import write
+
+def get_db():
+    with app_db.SessionLocal() as s:
+        yield s
+
+def count_tools(seen):
+    app = FastAPI()
+
+    def load(s):
+        seen["load"] = threading.current_thread(), s.get_bind().url.drivername
+        return s.scalar(select(func.count()).select_from(Tool))
+
+    @app.get("/count")
+    @app_db.session_route
+    def route(db: Session = Depends(get_db)):
+        seen["body"] = threading.current_thread()
+        return {"count": app_db.run_db(db, load)}
+
+    with TestClient(app) as c:
+        return c.get("/count").json()["count"]
+
+def test_sync_mode_runs_load_in_the_body(db, monkeypatch):
+    monkeypatch.setattr(app_db.settings, "DB_ASYNC", False)
+    write(db, list(generate_tools(3, seed=1)))
+    seen = {}
+    assert count_tools(seen) == 3
+    assert seen["load"] == (seen["body"], "sqlite")
+
+def test_async_mode_runs_only_load_on_the_loop(db, monkeypatch):
+    write(db, list(generate_tools(3, seed=1)))
+    async_engine = create_async_engine(app_db.async_url(app_db.DATABASE_URL))
+    monkeypatch.setattr(app_db.settings, "DB_ASYNC", True)
+    monkeypatch.setattr(app_db, "AsyncSessionLocal", async_sessionmaker(async_engine))
+    seen = {}
+    try:
+        assert count_tools(seen) == 3
+    finally:
+        async_engine.sync_engine.dispose()
+    load_thread, driver = seen["load"]
+    assert driver == "sqlite+aiosqlite"
+    assert load_thread is not seen["body"]
+    assert not seen["body"].name.startswith("asyncio")  # the body ran in the threadpool
@@ -0,0 +1,34 @@
+# backend/tests/test_similar.py
+"""tool_neighbors is built without an /admin/reindex: by the first writes and at startup."""
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, select
+
+from backend.app.db import engine
+from backend.app.main import app
+from backend.app.models import ToolNeighbor
+from backend.app.services import similar
+from backend.benchmarks.synthetic import generate_tools
+from conftest import write
+
+def similar_ids(tool_id):
+    r = TestClient(app).get(f"/tools/{tool_id}/similar")
+    assert r.status_code == 200
+    return [t["tool_id"] for t in r.json()["items"]]
+
+def test_first_writes_build_the_table(db):
+    rows = list(generate_tools(20, seed=3))
+    write(db, rows[:1])  # a lone tool has no neighbors
+    assert similar_ids(rows[0]["tool_id"]) == []
+    write(db, rows[1:])
+    assert len(similar_ids(rows[0]["tool_id"])) == similar.K
+    # later writes update it in place
+    write(db, [{**rows[5], "description_long": rows[0]["description_long"], "tags_csv": rows[0]["tags_csv"],
+                "category": rows[0]["category"]}])
+    assert rows[5]["tool_id"] in similar_ids(rows[0]["tool_id"])
+
+def test_startup_fills_an_empty_table(db, catalog):
+    db.execute(delete(ToolNeighbor))
+    db.commit()
+    similar.ensure_neighbors(engine)
+    assert db.scalar(select(func.count()).select_from(ToolNeighbor)) == len(catalog) * similar.K
+    assert len(similar_ids(catalog[0]["tool_id"])) == similar.K
@@ -0,0 +1,54 @@
+# backend/tests/test_tools_paging.py
+"""Keyset pages of GET /tools: (total_score DESC NULLS LAST, tool_id DESC), with unscored rows last."""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from backend.app.models import Tool
+from backend.app.routes.tools import _decode_cursor, _tools_page
+from conftest import write
+
+@pytest.fixture
+def tools(db):
+    """30 tools in two categories, scores tied in threes, a third of them unscored (as written before
+    total_score existed)."""
+    write(db, [{"tool_id": f"t{i:02d}", "name": f"T{i}", "category": "A" if i % 2 else "B",
+                "accuracy_score": i // 3 % 4} for i in range(30)])
+    db.execute(update(Tool).where(Tool.tool_id.in_([f"t{i:02d}" for i in range(0, 30, 3)])).values(total_score=None))
+    db.commit()
+    rows = db.query(Tool.tool_id, Tool.category, Tool.total_score).all()
+    rows.sort(key=lambda r: r.tool_id, reverse=True)
+    rows.sort(key=lambda r: -r.total_score if r.total_score is not None else float("inf"))
+    return rows
+
+def walk(db, page_size, cursor="", **filters):
+    args = dict(q=None, category=None, min_score=None, tags=None, persona=None, industry=None, page=1,
+                page_size=page_size, count="none", fields="tool_id")
+    args.update(filters)
+    out = []
+    while cursor is not None:
+        page = _tools_page(db, **{**args, "cursor": cursor})
+        assert len(page["items"]) <= page_size
+        out += [t["tool_id"] for t in page["items"]]
+        assert len(out) <= 30, "the walk went past the end"
+        cursor = page["next_cursor"]
+    return out
+
+@pytest.mark.parametrize("page_size", [1, 2, 4, 7, 20, 30, 31])
+def test_cursor_walk_crosses_null_scores(db, tools, page_size):
+    assert walk(db, page_size) == [r.tool_id for r in tools]
+
+def test_cursor_walk_with_filter(db, tools):
+    assert walk(db, 3, category="A") == [r.tool_id for r in tools if r.category == "A"]
+
+def test_offset_page_hands_over_to_cursor(db, tools):
+    args = dict(q=None, category=None, min_score=None, tags=None, persona=None, industry=None, page_size=5,
+                cursor=None, count="none", fields="tool_id")
+    pages = [_tools_page(db, page=p, **args) for p in (1, 2)]
+    assert [t["tool_id"] for p in pages for t in p["items"]] == [r.tool_id for r in tools[:10]]
+    assert walk(db, 4, cursor=pages[1]["next_cursor"]) == [r.tool_id for r in tools[10:]]
+
+def test_bad_cursor(db):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
@@ -0,0 +1,76 @@
+# backend/tests/test_writes.py
+"""Content-hash change detection: rewriting a tool as it is stored is skipped."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import OperationalError
+
+from backend.app.main import app
+from backend.app.models import Tool, ToolChange
+from backend.app.services import catalog as catalog_cache, writes
+from backend.app.utils.scoring import get_profile
+from conftest import write
+
+def changes(db):
+    return db.scalar(select(func.max(ToolChange.seq)))
+
+def hashes(rows, columns=None):
+    """Content hashes as write_tools() computes them."""
+    coerced = {r["tool_id"]: writes.coerce_row(r) for r in rows}
+    columns = writes._columns(coerced, columns)
+    return {tool_id: writes.content_hash(values, columns) for tool_id, values in coerced.items()}
+
+def test_rewrite_is_skipped(db, catalog):
+    seq, version = changes(db), catalog_cache.version()
+    written = write(db, catalog)
+    assert (written.created, written.updated, written.rejected) == ([], [], {})
+    assert sorted(written.unchanged) == sorted(r["tool_id"] for r in catalog)
+    assert written.totals == dict(db.query(Tool.tool_id, Tool.total_score).all())  # still reported
+    assert changes(db) == seq and catalog_cache.version() == version  # not logged, caches kept
+
+def test_only_changed_rows_are_written(db, catalog):
+    seq = changes(db)
+    rows = [dict(r) for r in catalog[:10]]
+    rows[3]["price_low_usd"] = 12345
+    written = write(db, rows)
+    assert written.updated == [rows[3]["tool_id"]] and len(written.unchanged) == 9
+    assert db.scalars(select(ToolChange.tool_id).where(ToolChange.seq > seq)).all() == [rows[3]["tool_id"]]
+    # the dry run agrees, and names the column
+    assert writes.diff_tools(db, {r["tool_id"]: writes.coerce_row(r) for r in rows}).diff == {}
+    rows[3]["price_low_usd"] = 1
+    dry = writes.diff_tools(db, {r["tool_id"]: writes.coerce_row(r) for r in rows})
+    assert dry.updated == [rows[3]["tool_id"]] and dry.diff == {rows[3]["tool_id"]: {"price_low_usd": [12345.0, 1.0]}}
+
+def test_unchanged_lookup(db, catalog):
+    stored = hashes(catalog[:5])
+    profile = get_profile()
+    totals = dict(db.query(Tool.tool_id, Tool.total_score).all())
+    assert writes._unchanged(db, stored, profile) == {i: totals[i] for i in stored}
+    # another set of columns, another score version, a row from before hashes: all rewritten
+    assert writes._unchanged(db, hashes(catalog[:5], ["name", "category"]), profile) == {}
+    assert writes._unchanged(db, stored, profile._replace(version="other@1")) == {}
+    legacy = catalog[0]["tool_id"]
+    db.execute(update(Tool).where(Tool.tool_id == legacy).values(content_hash=None))
+    db.commit()
+    assert legacy not in writes._unchanged(db, stored, profile)
+    assert write(db, catalog[:5]).updated == [legacy]  # and the rewrite stamps it again
+    assert legacy in writes._unchanged(db, stored, profile)
+
+def test_refused_rows_are_rejected_alone(db, catalog):
+    taken = catalog[0]["slug"]
+    rows = [{"tool_id": "new-a", "name": "New A", "slug": taken}, {"tool_id": "new-b", "name": "New B"}]
+    written = write(db, rows)
+    assert written.created == ["new-b"] and written.rejected == {"new-a": "slug is already used by another tool"}
+    # POST /tools derives the slug from the name
+    r = TestClient(app).post("/tools", json={"tool_id": "new-c", "name": taken, "category": "CRM"})
+    assert r.status_code == 409 and r.json() == {"detail": "slug is already used by another tool"}
+
+def test_database_errors_are_raised_without_row_retries(db, monkeypatch):
+    calls = []
+    def down(db, rows, *args):
+        calls.append(len(rows))
+        raise OperationalError("INSERT", {}, Exception("database is gone"))
+    monkeypatch.setattr(writes, "_write", down)
+    with pytest.raises(OperationalError):
+        write(db, [{"tool_id": f"t{i}", "name": f"T{i}"} for i in range(5)])
+    assert calls == [5]